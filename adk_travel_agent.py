@@ -1,23 +1,100 @@
+"""Travel booking agent built with Google ADK and traced with Monocle.
+
+Importing this module is cheap: the agents, session service, runner and Monocle telemetry are only
+built on first use. build_app() builds an explicit TravelApp; get_app() builds the default one from
+the environment once and sets up telemetry. Module attributes such as root_agent and runner resolve
+to the default app, so `from adk_travel_agent import root_agent` keeps working.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
 import datetime
+import json
+import sys
+import threading
 import time
 import asyncio
 import logging
 import os
-from uuid import UUID
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any, AsyncIterator, ClassVar, Iterable, Iterator, Optional, TextIO, Union
 from zoneinfo import ZoneInfo
 
-from google.adk.agents import LlmAgent, SequentialAgent
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from google.genai import types
+from session_ids import generate_session_id
 
-from monocle_apptrace import setup_monocle_telemetry
-setup_monocle_telemetry(workflow_name = 'adk_travel_agent', monocle_exporters_list = 'file,okahu')
+if TYPE_CHECKING:
+    from google.adk.agents import SequentialAgent
+    from google.adk.runners import Runner
+    from google.adk.sessions import BaseSessionService
+    from booking_backends import BookingBackend
+    from response_cache import ResponseCache
+    from tool_idempotency import ToolIdempotencyCache
+    from context_policy import ContextPolicy
+    from token_usage import TokenUsageTracker
+    from request_router import RequestRouter
+    from template_summary import TemplateSummarizer
+    from telemetry import SampledBatchSpanProcessor
+    from pipeline_metrics import PipelineMetrics
+    from model_cassette import ModelCassette
 
-os.environ["GOOGLE_GENAI_USE_VERTEXAI"] = "FALSE"  # Set to TRUE to use Vertex AI
 MAX_OUTPUT_TOKENS = int(os.getenv("MAX_OUTPUT_TOKENS", "1000"))
 # Set env model as gemini-2.5-flash-lite by default
 GOOGLE_GENAI_MODEL = os.getenv("GOOGLE_GENAI_MODEL", "gemini-2.5-flash-lite")
+# "sequential" runs flight -> hotel -> summary, "parallel" books flight and hotel concurrently
+PIPELINE_MODES = ("sequential", "parallel")
+ADK_PIPELINE_MODE = os.getenv("ADK_PIPELINE_MODE", "sequential").lower()
+# Maximum number of requests in flight when running a batch
+ADK_BATCH_CONCURRENCY = int(os.getenv("ADK_BATCH_CONCURRENCY", "8"))
+# Session store caps so a long-running worker doesn't keep every session forever, 0 disables a cap
+ADK_SESSION_MAX_SESSIONS = int(os.getenv("ADK_SESSION_MAX_SESSIONS", "10000"))
+ADK_SESSION_MAX_BYTES = int(os.getenv("ADK_SESSION_MAX_BYTES", str(256 * 1024 * 1024)))
+ADK_SESSION_TTL_SECONDS = float(os.getenv("ADK_SESSION_TTL_SECONDS", "3600"))
+# Path of a SQLite database to persist sessions across restarts and share them between processes
+ADK_SESSION_DB = os.getenv("ADK_SESSION_DB")
+# Opt-in cache of model responses: "memory", or "disk" to also keep them in ADK_RESPONSE_CACHE_DIR
+ADK_RESPONSE_CACHE = os.getenv("ADK_RESPONSE_CACHE", "").lower()
+ADK_RESPONSE_CACHE_DIR = os.getenv("ADK_RESPONSE_CACHE_DIR", ".adk_response_cache")
+ADK_RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("ADK_RESPONSE_CACHE_TTL_SECONDS", "3600"))
+ADK_RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("ADK_RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+# Inventory service to book through, e.g. fake_booking_server.py. Unset runs the booking functions below in a thread pool
+ADK_BOOKING_URL = os.getenv("ADK_BOOKING_URL")
+ADK_BOOKING_MAX_CONCURRENCY = int(os.getenv("ADK_BOOKING_MAX_CONCURRENCY", "16"))
+ADK_BOOKING_TIMEOUT_SECONDS = float(os.getenv("ADK_BOOKING_TIMEOUT_SECONDS", "10"))
+ADK_BOOKING_RETRIES = int(os.getenv("ADK_BOOKING_RETRIES", "2"))
+# Repeated identical booking calls in a session return the first result instead of booking again, "off" disables
+ADK_TOOL_IDEMPOTENCY = os.getenv("ADK_TOOL_IDEMPOTENCY", "on").lower()
+ADK_TOOL_IDEMPOTENCY_TTL_SECONDS = float(os.getenv("ADK_TOOL_IDEMPOTENCY_TTL_SECONDS", "3600"))
+# What each agent sends to the model: "full" history, "last_n", "own" or "state", for all agents or per agent,
+# e.g. "adk_flight_booking_agent=own,adk_hotel_booking_agent=own,adk_trip_summary_agent=state"
+ADK_CONTEXT_POLICY = os.getenv("ADK_CONTEXT_POLICY", "")
+ADK_CONTEXT_LAST_N = int(os.getenv("ADK_CONTEXT_LAST_N", "6"))
+# Model prices in USD per million tokens for the cost in token accounting, defaults are gemini-2.5-flash-lite
+ADK_INPUT_PRICE_PER_MTOK = float(os.getenv("ADK_INPUT_PRICE_PER_MTOK", "0.10"))
+ADK_OUTPUT_PRICE_PER_MTOK = float(os.getenv("ADK_OUTPUT_PRICE_PER_MTOK", "0.40"))
+# Per-agent model overrides, e.g. "adk_trip_summary_agent=gemini-2.0-flash-lite"
+ADK_AGENT_MODELS = os.getenv("ADK_AGENT_MODELS", "")
+# Per-agent GenerateContentConfig fields as JSON, e.g. '{"adk_trip_summary_agent": {"max_output_tokens": 120}}'
+ADK_AGENT_CONFIGS = os.getenv("ADK_AGENT_CONFIGS", "")
+# "rules" skips the booking agents a request doesn't mention, see request_router.py
+ADK_ROUTER = os.getenv("ADK_ROUTER", "").lower()
+# "template" builds the trip summary from the booking results and calls the model only when they're incomplete
+ADK_SUMMARIZER = os.getenv("ADK_SUMMARIZER", "").lower()
+# Tracing: "full" exports every span, "sampled" keeps failed and slow turns plus ADK_TELEMETRY_SAMPLE_RATE of the
+# rest and exports them in batches off the request path, "off" disables tracing. See telemetry.py
+ADK_TELEMETRY = os.getenv("ADK_TELEMETRY", "full").lower()
+# Comma-separated Monocle exporters (file, okahu, console, ...) plus "ndjson" for compressed span segments
+ADK_TELEMETRY_EXPORTERS = os.getenv("ADK_TELEMETRY_EXPORTERS", "file,okahu")
+ADK_TELEMETRY_SAMPLE_RATE = float(os.getenv("ADK_TELEMETRY_SAMPLE_RATE", "0.1"))
+ADK_TELEMETRY_SLOW_TURN_MS = float(os.getenv("ADK_TELEMETRY_SLOW_TURN_MS", "2000"))
+ADK_TELEMETRY_QUEUE_SIZE = int(os.getenv("ADK_TELEMETRY_QUEUE_SIZE", "2048"))
+# Where the "ndjson" exporter writes gzip NDJSON segments, and when it starts a new one. See trace_files.py
+ADK_TRACE_DIR = os.getenv("ADK_TRACE_DIR", ".monocle")
+ADK_TRACE_SEGMENT_MB = float(os.getenv("ADK_TRACE_SEGMENT_MB", "64"))
+ADK_TRACE_SEGMENT_SECONDS = float(os.getenv("ADK_TRACE_SEGMENT_SECONDS", "3600"))
+# Model responses recorded from a live run, see model_cassette.py. ADK_CASSETTE_MODE is "replay", "record" or "off"
+ADK_CASSETTE = os.getenv("ADK_CASSETTE")
+ADK_CASSETTE_MODE = os.getenv("ADK_CASSETTE_MODE", "replay").lower()
 
 def adk_book_flight(from_airport: str, to_airport: str) -> dict:
     """Books a flight from one airport to another.
@@ -52,68 +129,389 @@ def adk_book_hotel(hotel_name: str, city: str) -> dict:
         "message": f"Successfully booked a stay at {hotel_name} in {city}."
     }
 
-contentConfig: types.GenerateContentConfig = types.GenerateContentConfig(max_output_tokens=MAX_OUTPUT_TOKENS)
-flight_booking_agent = LlmAgent(
-    name="adk_flight_booking_agent",
-    model=GOOGLE_GENAI_MODEL,
-    description= "Agent to book flights based on user queries.",
-    instruction= "You are a helpful agent who can assist users in booking flights. You only handle flight booking. Just handle that part from what the user says, ignore other parts of the requests.",
-    generate_content_config=contentConfig,
-    tools=[adk_book_flight]  # Define flight booking tools here
-)
-
-hotel_booking_agent = LlmAgent(
-    name="adk_hotel_booking_agent",
-    model=GOOGLE_GENAI_MODEL,
-    description= "Agent to book hotels based on user queries.",
-    instruction= "You are a helpful agent who can assist users in booking hotels. You only handle hotel booking. Book hotel if the user explicitly asks, just handle that part from what the user says, ignore other parts of the requests. NOTE: Marriott is only available on odd dates. Otherwise Hilton is the primary option unless user states specific hotel criteria and you can go ahead and book that instead.",
-    generate_content_config=contentConfig,
-    tools=[adk_book_hotel]  # Define hotel booking tools here
-)
-
-trip_summary_agent = LlmAgent(
-    name="adk_trip_summary_agent",
-    model=GOOGLE_GENAI_MODEL,
-    description= "Summarize the travel details from hotel bookings and flight bookings agents.",
-    instruction= "Summarize the travel details from hotel bookings and flight bookings agents. Be concise in response and provide a single sentence summary.",
-    generate_content_config=contentConfig,
-    output_key="booking_summary"
-)
-
-root_agent = SequentialAgent(
-    name="adk_supervisor_agent",
-    description=
-        """
-            You are the supervisor agent that coordinates the flight booking and hotel booking.
-            You must provide a consolidated summary back to the full coordination of the user's request.
-        """
-    ,
-    sub_agents=[flight_booking_agent, hotel_booking_agent, trip_summary_agent],
-)
-
-session_service = InMemorySessionService()
+def merge_callbacks(*sources: Optional[dict]) -> dict[str, list]:
+    """Combines callback keyword arguments, ADK runs each list in order until one returns a value."""
+    merged = {}
+    for source in sources:
+        for name, callback in (source or {}).items():
+            merged.setdefault(name, []).append(callback)
+    return merged
+
+def build_root_agent(mode: str = ADK_PIPELINE_MODE, model=GOOGLE_GENAI_MODEL,
+                     response_cache: Optional[ResponseCache] = None,
+                     booking_backend: Optional[BookingBackend] = None,
+                     tool_idempotency: Optional[ToolIdempotencyCache] = None,
+                     context_policies: Optional[dict[str, ContextPolicy]] = None,
+                     token_usage: Optional[TokenUsageTracker] = None,
+                     agent_models: Optional[dict[str, Any]] = None,
+                     agent_configs: Optional[dict[str, dict]] = None,
+                     router: Optional[RequestRouter] = None,
+                     summarizer: Optional[TemplateSummarizer] = None,
+                     metrics: Optional[PipelineMetrics] = None,
+                     cassette: Optional[ModelCassette] = None) -> SequentialAgent:
+    """Builds the supervisor agent and its sub-agents.
+
+    Args:
+        mode (str): "sequential" books the flight, then the hotel, then summarizes.
+            "parallel" books the flight and hotel concurrently and then summarizes.
+        model: Model name or BaseLlm instance used by every LlmAgent.
+        response_cache (ResponseCache): serves repeated model calls of every LlmAgent, None to always call the model.
+        booking_backend (BookingBackend): backend the booking tools await, None to call
+            adk_book_flight and adk_book_hotel directly on the event loop.
+        tool_idempotency (ToolIdempotencyCache): dedupes repeated booking calls within a turn, None to run every call.
+        context_policies (dict): ContextPolicy by agent name, "*" for the rest, None sends every agent the full history.
+        token_usage (TokenUsageTracker): accounts tokens, latency and cost of every model call.
+        agent_models (dict): model name or BaseLlm by agent name, overriding `model`, e.g. a faster summary model.
+        agent_configs (dict): GenerateContentConfig fields by agent name, applied on top of the shared config.
+        router (RequestRouter): skips the booking agents a request doesn't need, None to run every agent.
+        summarizer (TemplateSummarizer): answers for the summary agent from the booking results, None to always
+            call the summary model.
+        metrics (PipelineMetrics): records latency, model calls, tokens and errors of every agent and tool.
+        cassette (ModelCassette): records the responses of every model call, or replays them instead of calling the model.
+
+    Returns:
+        SequentialAgent: the root agent named adk_supervisor_agent.
+    """
+    if mode not in PIPELINE_MODES:
+        raise ValueError(f"Unknown pipeline mode {mode!r}, expected one of {PIPELINE_MODES}.")
+    from google.adk.agents import LlmAgent, ParallelAgent, SequentialAgent
+    from google.genai import types
+    import fake_llm  # noqa: F401 - registers the offline fake-* models, e.g. GOOGLE_GENAI_MODEL=fake-travel
+
+    from context_policy import record_tool_result
+
+    contentConfig = types.GenerateContentConfig(max_output_tokens=MAX_OUTPUT_TOKENS)
+
+    def model_for(agent_name: str):
+        return (agent_models or {}).get(agent_name, model)
+
+    def config_for(agent_name: str) -> types.GenerateContentConfig:
+        overrides = (agent_configs or {}).get(agent_name)
+        if not overrides:
+            return contentConfig
+        if isinstance(overrides, types.GenerateContentConfig):
+            overrides = overrides.model_dump(exclude_none=True)
+        return types.GenerateContentConfig.model_validate({**contentConfig.model_dump(exclude_none=True), **overrides})
+
+    def model_callbacks(agent_name: str) -> dict:
+        # Trim first so the cassette and cache keys and the token counts reflect what is sent, count only calls
+        # the cassette and cache didn't answer. A templated summary skips the model, so it comes before everything else.
+        # A replayed response skips the later callbacks, so the cassette comes before the cache, which would otherwise
+        # note a miss it never stores.
+        policy = (context_policies.get(agent_name) or context_policies.get("*")) if context_policies else None
+        return merge_callbacks(summarizer and agent_name == "adk_trip_summary_agent" and summarizer.callbacks(),
+                               policy and {"before_model_callback": policy.before_model_callback},
+                               cassette and cassette.callbacks(),
+                               response_cache and response_cache.callbacks(),
+                               token_usage and token_usage.callbacks(),
+                               metrics and metrics.model_callbacks())
+
+    # Time tool calls before an idempotent replay can answer them, and booking agents only once the router let them run
+    agent_callbacks = metrics.agent_callbacks() if metrics else {}
+    booking_agent_callbacks = merge_callbacks(router and {"before_agent_callback": router.before_agent_callback},
+                                              agent_callbacks)
+    # Tool results go to session state only for the state policy and the template summary, which read them
+    records_tool_results = summarizer is not None or any(policy.mode == "state" for policy in (context_policies or {}).values())
+    tool_callbacks = merge_callbacks(metrics and metrics.tool_callbacks(),
+                                     tool_idempotency and tool_idempotency.callbacks(),
+                                     records_tool_results and {"after_tool_callback": record_tool_result})
+    if booking_backend is not None:
+        from booking_backends import booking_tools
+        book_flight, book_hotel = booking_tools(booking_backend, adk_book_flight, adk_book_hotel)
+    else:
+        book_flight, book_hotel = adk_book_flight, adk_book_hotel
+
+    flight_booking_agent = LlmAgent(
+        name="adk_flight_booking_agent",
+        model=model_for("adk_flight_booking_agent"),
+        description= "Agent to book flights based on user queries.",
+        instruction= "You are a helpful agent who can assist users in booking flights. You only handle flight booking. Just handle that part from what the user says, ignore other parts of the requests.",
+        generate_content_config=config_for("adk_flight_booking_agent"),
+        tools=[book_flight],  # Define flight booking tools here
+        **model_callbacks("adk_flight_booking_agent"),
+        **booking_agent_callbacks,
+        **tool_callbacks
+    )
+
+    hotel_booking_agent = LlmAgent(
+        name="adk_hotel_booking_agent",
+        model=model_for("adk_hotel_booking_agent"),
+        description= "Agent to book hotels based on user queries.",
+        instruction= "You are a helpful agent who can assist users in booking hotels. You only handle hotel booking. Book hotel if the user explicitly asks, just handle that part from what the user says, ignore other parts of the requests. NOTE: Marriott is only available on odd dates. Otherwise Hilton is the primary option unless user states specific hotel criteria and you can go ahead and book that instead.",
+        generate_content_config=config_for("adk_hotel_booking_agent"),
+        tools=[book_hotel],  # Define hotel booking tools here
+        **model_callbacks("adk_hotel_booking_agent"),
+        **booking_agent_callbacks,
+        **tool_callbacks
+    )
+
+    trip_summary_agent = LlmAgent(
+        name="adk_trip_summary_agent",
+        model=model_for("adk_trip_summary_agent"),
+        description= "Summarize the travel details from hotel bookings and flight bookings agents.",
+        instruction= "Summarize the travel details from hotel bookings and flight bookings agents. Be concise in response and provide a single sentence summary.",
+        generate_content_config=config_for("adk_trip_summary_agent"),
+        output_key="booking_summary",
+        **model_callbacks("adk_trip_summary_agent"),
+        **agent_callbacks
+    )
+
+    if mode == "parallel":
+        # The booking agents don't depend on each other, so run them on isolated branches at the same time.
+        # The summary agent runs on the root branch and therefore sees the events of both booking branches.
+        booking_stage = [ParallelAgent(
+            name="adk_booking_fanout_agent",
+            description="Runs the flight booking and hotel booking agents concurrently.",
+            sub_agents=[flight_booking_agent, hotel_booking_agent],
+            **agent_callbacks
+        )]
+    else:
+        booking_stage = [flight_booking_agent, hotel_booking_agent]
+
+    return SequentialAgent(
+        name="adk_supervisor_agent",
+        description=
+            """
+                You are the supervisor agent that coordinates the flight booking and hotel booking.
+                You must provide a consolidated summary back to the full coordination of the user's request.
+            """
+        ,
+        sub_agents=[*booking_stage, trip_summary_agent],
+        **agent_callbacks
+    )
+
 APP_NAME = "streaming_app"
 USER_ID = "user_123"
 SESSION_ID = "session_456"
 
-runner = Runner(
-    agent=root_agent,  # Assume this is defined
-    app_name=APP_NAME,
-    session_service=session_service
-)
+@dataclass
+class TravelApp:
+    """Everything needed to serve requests: the agent tree, its session service and runner."""
+    root_agent: SequentialAgent
+    session_service: BaseSessionService
+    runner: Runner
+    response_cache: Optional[ResponseCache] = None
+    booking_backend: Optional[BookingBackend] = None
+    tool_idempotency: Optional[ToolIdempotencyCache] = None
+    token_usage: Optional[TokenUsageTracker] = None
+    router: Optional[RequestRouter] = None
+    summarizer: Optional[TemplateSummarizer] = None
+    metrics: Optional[PipelineMetrics] = None
+    cassette: Optional[ModelCassette] = None
 
-async def run_agent(test_message: str):
-    session_id = generate_session_id()
-    session = await session_service.create_session(
-        app_name=APP_NAME, 
-        user_id=USER_ID,
-        session_id=session_id
+    async def flush_sessions(self):
+        """Writes buffered session events of a persistent session service."""
+        from session_store import SqliteSessionService
+        if isinstance(self.session_service, SqliteSessionService):
+            await self.session_service.flush()
+
+    async def close(self):
+        """Flushes sessions and releases the session store's and booking backend's connections and threads."""
+        await self.flush_sessions()
+        if hasattr(self.session_service, "close"):
+            await self.session_service.close()
+        if self.booking_backend is not None:
+            await self.booking_backend.close()
+
+def build_session_service() -> BaseSessionService:
+    from session_store import BoundedSessionService, SqliteSessionService
+    if ADK_SESSION_DB:
+        return SqliteSessionService(ADK_SESSION_DB)
+    return BoundedSessionService(
+        max_sessions=ADK_SESSION_MAX_SESSIONS,
+        max_bytes=ADK_SESSION_MAX_BYTES,
+        ttl_seconds=ADK_SESSION_TTL_SECONDS
+    )
+
+def build_response_cache() -> Optional[ResponseCache]:
+    if not ADK_RESPONSE_CACHE:
+        return None
+    from response_cache import ResponseCache
+    return ResponseCache(
+        max_entries=ADK_RESPONSE_CACHE_MAX_ENTRIES,
+        ttl_seconds=ADK_RESPONSE_CACHE_TTL_SECONDS,
+        disk_dir=ADK_RESPONSE_CACHE_DIR if ADK_RESPONSE_CACHE == "disk" else None
+    )
+
+def build_tool_idempotency() -> Optional[ToolIdempotencyCache]:
+    if ADK_TOOL_IDEMPOTENCY == "off":
+        return None
+    from tool_idempotency import ToolIdempotencyCache
+    return ToolIdempotencyCache(ttl_seconds=ADK_TOOL_IDEMPOTENCY_TTL_SECONDS)
+
+def parse_agent_map(spec: str) -> Optional[dict[str, str]]:
+    """Parses "agent=value,..." settings such as ADK_AGENT_MODELS."""
+    pairs = [item.split("=", 1) for item in spec.split(",") if "=" in item]
+    return {agent_name.strip(): value.strip() for agent_name, value in pairs} or None
+
+def build_router() -> Optional[RequestRouter]:
+    if ADK_ROUTER in ("", "off"):
+        return None
+    if ADK_ROUTER != "rules":
+        raise ValueError(f"Unknown router {ADK_ROUTER!r}, expected 'rules' or 'off'.")
+    from request_router import RequestRouter
+    return RequestRouter()
+
+def build_summarizer() -> Optional[TemplateSummarizer]:
+    if ADK_SUMMARIZER in ("", "model"):
+        return None
+    if ADK_SUMMARIZER != "template":
+        raise ValueError(f"Unknown summarizer {ADK_SUMMARIZER!r}, expected 'template' or 'model'.")
+    from template_summary import TemplateSummarizer
+    return TemplateSummarizer()
+
+def build_cassette() -> Optional[ModelCassette]:
+    if not ADK_CASSETTE or ADK_CASSETTE_MODE == "off":
+        return None
+    from model_cassette import ModelCassette
+    return ModelCassette(ADK_CASSETTE, mode=ADK_CASSETTE_MODE)
+
+def build_context_policies() -> Optional[dict[str, ContextPolicy]]:
+    if not ADK_CONTEXT_POLICY:
+        return None
+    from context_policy import parse_context_policies
+    return parse_context_policies(ADK_CONTEXT_POLICY, last_n=ADK_CONTEXT_LAST_N)
+
+def build_booking_backend() -> BookingBackend:
+    from booking_backends import HttpBookingBackend, ThreadPoolBookingBackend
+    policy = dict(max_concurrency=ADK_BOOKING_MAX_CONCURRENCY, timeout_seconds=ADK_BOOKING_TIMEOUT_SECONDS,
+                  retries=ADK_BOOKING_RETRIES)
+    if ADK_BOOKING_URL:
+        return HttpBookingBackend(ADK_BOOKING_URL, max_connections=ADK_BOOKING_MAX_CONCURRENCY, **policy)
+    return ThreadPoolBookingBackend(adk_book_flight, adk_book_hotel, max_workers=ADK_BOOKING_MAX_CONCURRENCY, **policy)
+
+def build_app(mode: str = ADK_PIPELINE_MODE, model=GOOGLE_GENAI_MODEL,
+              session_service: Optional[BaseSessionService] = None,
+              response_cache: Optional[ResponseCache] = None,
+              booking_backend: Optional[BookingBackend] = None,
+              tool_idempotency: Optional[ToolIdempotencyCache] = None,
+              context_policies: Optional[dict[str, ContextPolicy]] = None,
+              token_usage: Optional[TokenUsageTracker] = None,
+              agent_models: Optional[dict[str, Any]] = None,
+              agent_configs: Optional[dict[str, dict]] = None,
+              router: Optional[RequestRouter] = None,
+              summarizer: Optional[TemplateSummarizer] = None,
+              metrics: Optional[PipelineMetrics] = None,
+              cassette: Optional[ModelCassette] = None) -> TravelApp:
+    """Builds the agents, session service and runner, without touching telemetry.
+
+    Args:
+        mode (str): pipeline mode, see build_root_agent.
+        model: Model name or BaseLlm instance used by every LlmAgent.
+        session_service (BaseSessionService): defaults to build_session_service().
+        response_cache (ResponseCache): optional cache of model responses.
+        booking_backend (BookingBackend): defaults to build_booking_backend().
+        tool_idempotency (ToolIdempotencyCache): optional dedupe of repeated booking calls.
+        context_policies (dict): ContextPolicy by agent name, see build_root_agent.
+        token_usage (TokenUsageTracker): defaults to a tracker priced from the environment.
+        metrics (PipelineMetrics): defaults to new pipeline metrics.
+        agent_models (dict), agent_configs (dict), router (RequestRouter), summarizer (TemplateSummarizer),
+            cassette (ModelCassette): see build_root_agent.
+    """
+    from pipeline_metrics import PipelineMetrics
+    from token_usage import TokenUsageTracker
+    from google.adk.runners import Runner
+    os.environ["GOOGLE_GENAI_USE_VERTEXAI"] = "FALSE"  # Set to TRUE to use Vertex AI
+    booking_backend = booking_backend or build_booking_backend()
+    token_usage = token_usage or TokenUsageTracker(ADK_INPUT_PRICE_PER_MTOK, ADK_OUTPUT_PRICE_PER_MTOK)
+    metrics = metrics or PipelineMetrics()
+    root_agent = build_root_agent(mode, model=model, response_cache=response_cache, booking_backend=booking_backend,
+                                  tool_idempotency=tool_idempotency, context_policies=context_policies,
+                                  token_usage=token_usage, agent_models=agent_models, agent_configs=agent_configs,
+                                  router=router, summarizer=summarizer, metrics=metrics, cassette=cassette)
+    session_service = session_service or build_session_service()
+    runner = Runner(
+        agent=root_agent,
+        app_name=APP_NAME,
+        session_service=session_service
     )
-    session.model_config
+    return TravelApp(root_agent=root_agent, session_service=session_service, runner=runner,
+                     response_cache=response_cache, booking_backend=booking_backend, tool_idempotency=tool_idempotency,
+                     token_usage=token_usage, router=router, summarizer=summarizer, metrics=metrics, cassette=cassette)
+
+_telemetry_ready = False
+# The sampled profile's span processor, None for the other profiles
+span_processor: Optional[SampledBatchSpanProcessor] = None
+_app: Optional[TravelApp] = None
+_app_lock = threading.Lock()
+
+def setup_telemetry():
+    """Sets up Monocle tracing once per process, with the ADK_TELEMETRY profile."""
+    global _telemetry_ready, span_processor
+    if not _telemetry_ready:
+        from telemetry import setup_telemetry as setup_profile
+        span_processor = setup_profile('adk_travel_agent', profile=ADK_TELEMETRY, exporters=ADK_TELEMETRY_EXPORTERS,
+                                       sample_rate=ADK_TELEMETRY_SAMPLE_RATE,
+                                       slow_turn_seconds=ADK_TELEMETRY_SLOW_TURN_MS / 1000,
+                                       max_queue_size=ADK_TELEMETRY_QUEUE_SIZE, trace_dir=ADK_TRACE_DIR,
+                                       segment_bytes=int(ADK_TRACE_SEGMENT_MB * 2 ** 20),
+                                       segment_seconds=ADK_TRACE_SEGMENT_SECONDS)
+        _telemetry_ready = True
+
+async def flush_telemetry(timeout_seconds: float = 30.0) -> bool:
+    """Exports the spans recorded so far, e.g. before a test reads the trace files."""
+    if span_processor is not None:
+        return await span_processor.flush(timeout_seconds)
+    if not _telemetry_ready:
+        return True
+    from opentelemetry import trace
+    provider = trace.get_tracer_provider()
+    if not hasattr(provider, "force_flush"):
+        return True
+    return await asyncio.to_thread(provider.force_flush, int(timeout_seconds * 1000))
+
+def get_app() -> TravelApp:
+    """Returns the default app configured from the environment, building it and telemetry on first use."""
+    global _app
+    if _app is None:
+        with _app_lock:
+            if _app is None:
+                setup_telemetry()
+                _app = build_app(response_cache=build_response_cache(), tool_idempotency=build_tool_idempotency(),
+                                 context_policies=build_context_policies(), agent_models=parse_agent_map(ADK_AGENT_MODELS),
+                                 agent_configs=json.loads(ADK_AGENT_CONFIGS) if ADK_AGENT_CONFIGS else None,
+                                 router=build_router(), summarizer=build_summarizer(), cassette=build_cassette())
+    return _app
+
+_APP_ATTRIBUTES = {"root_agent", "session_service", "runner", "response_cache", "booking_backend", "tool_idempotency", "token_usage", "router", "summarizer", "metrics", "cassette"}
+_AGENT_ATTRIBUTES = {
+    "flight_booking_agent": "adk_flight_booking_agent",
+    "hotel_booking_agent": "adk_hotel_booking_agent",
+    "trip_summary_agent": "adk_trip_summary_agent",
+}
+
+def __getattr__(name: str) -> Any:
+    # Resolve the default app's objects lazily, see the module docstring
+    if name in _APP_ATTRIBUTES:
+        return getattr(get_app(), name)
+    if name in _AGENT_ATTRIBUTES:
+        return get_app().root_agent.find_agent(_AGENT_ATTRIBUTES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+async def open_session(app: TravelApp, session_id: str):
+    """Creates the session on its first turn, later turns continue it."""
+    from google.adk.errors.already_exists_error import AlreadyExistsError
+    try:
+        await app.session_service.create_session(app_name=APP_NAME, user_id=USER_ID, session_id=session_id)
+    except AlreadyExistsError:
+        pass
+
+async def run_turn(test_message: str, session_id: Optional[str] = None, app: Optional[TravelApp] = None) -> Optional[str]:
+    """Runs one request through root_agent on the shared runner and returns the final response text."""
+    app = app or get_app()
+    if app.metrics is None:
+        return await _run_turn(test_message, session_id, app)
+    with app.metrics.turn():
+        return await _run_turn(test_message, session_id, app)
+
+async def _run_turn(test_message: str, session_id: Optional[str], app: TravelApp) -> Optional[str]:
+    from google.genai import types
+    session_id = session_id or generate_session_id()
+    await open_session(app, session_id)
     content = types.Content(role='user', parts=[types.Part(text=test_message)])
     response = None
-    # Process events as they arrive using async for\
-    async for event in runner.run_async(
+    # Process events as they arrive using async for
+    async for event in app.runner.run_async(
         user_id=USER_ID,
         session_id=session_id,
         new_message=content
@@ -121,14 +519,216 @@ async def run_agent(test_message: str):
         # For final response
         if event.is_final_response():
             response = event.content
+    await app.flush_sessions()  # Write the turn's events in one transaction
+
+    if response is None or not response.parts:
+        return None
+    return response.parts[0].text
+
+async def run_agent(test_message: str) -> Optional[str]:
+    response_text = await run_turn(test_message)
+    print(response_text)  # Print the last response text
+    return response_text
+
+@dataclass
+class ProgressEvent:
+    """A step of a streamed turn, see stream_agent."""
+    type: ClassVar[str]
+
+    def to_dict(self) -> dict:
+        return {"type": self.type, **asdict(self)}
+
+@dataclass
+class FlightBooked(ProgressEvent):
+    type: ClassVar[str] = "flight_booked"
+    args: dict
+    result: dict
+
+@dataclass
+class HotelBooked(ProgressEvent):
+    type: ClassVar[str] = "hotel_booked"
+    args: dict
+    result: dict
+
+@dataclass
+class SummaryDelta(ProgressEvent):
+    type: ClassVar[str] = "summary_delta"
+    text: str
+
+@dataclass
+class SummaryDone(ProgressEvent):
+    type: ClassVar[str] = "summary_done"
+    text: str
+
+_BOOKING_EVENTS = {"adk_book_flight": FlightBooked, "adk_book_hotel": HotelBooked}
+
+async def stream_agent(test_message: str, session_id: Optional[str] = None,
+                       app: Optional[TravelApp] = None) -> AsyncIterator[ProgressEvent]:
+    """Runs one request and yields progress as it happens instead of only the final response.
 
-    print(response.parts[0].text)  # Print the last response text
+    Model-side streaming is enabled for the turn, so summary text arrives as SummaryDelta chunks
+    while trip_summary_agent is still generating. Concatenated deltas equal the SummaryDone text.
 
-def generate_session_id() -> str:
-    return str(UUID(int=time.time_ns()))  # Simple UUID based on current time
+    Yields:
+        ProgressEvent: FlightBooked and HotelBooked as each booking tool returns, then SummaryDelta
+            chunks and a final SummaryDone.
+    """
+    app = app or get_app()
+    if app.metrics is None:
+        async for event in _stream_agent(test_message, session_id, app):
+            yield event
+        return
+    with app.metrics.turn():
+        async for event in _stream_agent(test_message, session_id, app):
+            yield event
+
+async def _stream_agent(test_message: str, session_id: Optional[str], app: TravelApp) -> AsyncIterator[ProgressEvent]:
+    from google.adk.agents import RunConfig
+    from google.adk.agents.run_config import StreamingMode
+    from google.genai import types
+    summary_agent_name = app.root_agent.find_agent("adk_trip_summary_agent").name
+    session_id = session_id or generate_session_id()
+    await open_session(app, session_id)
+    content = types.Content(role='user', parts=[types.Part(text=test_message)])
+    tool_args: dict[str, dict] = {}
+    streamed_summary = False
+    async for event in app.runner.run_async(
+        user_id=USER_ID,
+        session_id=session_id,
+        new_message=content,
+        run_config=RunConfig(streaming_mode=StreamingMode.SSE)
+    ):
+        for call in event.get_function_calls():
+            tool_args[call.id] = call.args or {}
+        for response in event.get_function_responses():
+            if response.name in _BOOKING_EVENTS:
+                yield _BOOKING_EVENTS[response.name](args=tool_args.get(response.id, {}), result=response.response or {})
+        if event.author != summary_agent_name or not event.content or not event.content.parts:
+            continue
+        text = "".join(part.text for part in event.content.parts if part.text and not part.thought)
+        if event.partial:
+            if text:
+                streamed_summary = True
+                yield SummaryDelta(text=text)
+        elif event.is_final_response():
+            if not streamed_summary and text:
+                yield SummaryDelta(text=text)  # The model (or a cache hit) didn't stream, send it in one chunk
+            yield SummaryDone(text=text)
+    await app.flush_sessions()
+
+async def _run_batch_request(index: int, request: Union[str, dict, Exception], app: Optional[TravelApp] = None) -> dict:
+    """Runs one batch request and captures its latency and any error, including a malformed request, instead of raising."""
+    result = {"index": index, "id": None, "prompt": None, "session_id": generate_session_id(), "response": None,
+              "error": None}
+    start = time.perf_counter()
+    try:
+        if isinstance(request, Exception):
+            raise request  # A line read_batch_requests couldn't parse
+        if isinstance(request, str):
+            request = {"prompt": request}
+        if not isinstance(request, dict):
+            raise ValueError(f"Batch request must be a string or an object, got {type(request).__name__}.")
+        result["id"], result["prompt"] = request.get("id"), request.get("prompt")
+        if not result["prompt"]:
+            raise ValueError("Batch request has no 'prompt'.")
+        result["response"] = await run_turn(result["prompt"], session_id=result["session_id"], app=app)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["latency_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    return result
+
+async def run_agents(requests: Iterable[Union[str, dict, Exception]], concurrency: int = ADK_BATCH_CONCURRENCY,
+                     app: Optional[TravelApp] = None) -> AsyncIterator[dict]:
+    """Runs many requests through the shared runner with at most `concurrency` turns in flight.
+
+    Args:
+        requests (Iterable[str | dict | Exception]): prompts, or dicts with a "prompt" and an optional "id".
+            An exception, e.g. a line read_batch_requests couldn't parse, is reported as that request's error.
+            The iterable is consumed lazily, so it can be a file being read line by line.
+        concurrency (int): maximum number of requests running at the same time.
+        app (TravelApp): app to run the requests on, defaults to get_app().
+
+    Yields:
+        dict: one result per request in completion order, with index, id, prompt, session_id,
+            response, error and latency_ms.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1.")
+    results: asyncio.Queue = asyncio.Queue()
+    pending = enumerate(requests)
+    done = object()
+
+    async def worker():
+        # Workers share one iterator so only `concurrency` requests are ever materialized at a time
+        try:
+            for index, request in pending:
+                results.put_nowait(await _run_batch_request(index, request, app=app))
+        finally:
+            results.put_nowait(done)
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    try:
+        running = len(workers)
+        while running:
+            result = await results.get()
+            if result is done:
+                running -= 1
+            else:
+                yield result
+        await asyncio.gather(*workers)  # Surface failures from reading `requests`
+    finally:
+        for task in workers:
+            task.cancel()
+
+def read_batch_requests(lines: Iterable[str]) -> Iterator[Union[str, dict, ValueError]]:
+    """Parses JSONL batch input where each line is a JSON string or an object with a "prompt".
+
+    A line that isn't valid JSON is yielded as its ValueError, so run_agents reports it as that
+    request's error and keeps going.
+    """
+    for line in lines:
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                yield e
+
+async def print_stream(test_message: str):
+    async for progress in stream_agent(test_message):
+        if isinstance(progress, (FlightBooked, HotelBooked)):
+            print(progress.result.get("message", progress.result), flush=True)
+        elif isinstance(progress, SummaryDelta):
+            print(progress.text, end="", flush=True)
+        elif isinstance(progress, SummaryDone):
+            print()
+
+async def run_batch(input_file: TextIO, output_file: TextIO, concurrency: int = ADK_BATCH_CONCURRENCY):
+    async for result in run_agents(read_batch_requests(input_file), concurrency=concurrency):
+        output_file.write(json.dumps(result) + "\n")
+        output_file.flush()
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.ERROR)
 
-    user_request = input("\nI am a travel booking agent. How can I assist you with your travel plans? ")
-    asyncio.run(run_agent(user_request))
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Travel booking agent built with Google ADK.")
+    parser.add_argument("--batch", metavar="FILE", help="JSONL file of requests to run, '-' for stdin.")
+    parser.add_argument("--output", metavar="FILE", help="JSONL file for batch results, defaults to stdout.")
+    parser.add_argument("--concurrency", type=int, default=ADK_BATCH_CONCURRENCY, help="Maximum batch requests in flight.")
+    parser.add_argument("--stream", action="store_true", help="Print bookings and the summary as they arrive.")
+    parser.add_argument("--metrics", action="store_true", help="Print latency, model calls and tokens per stage to stderr at exit.")
+    args = parser.parse_args()
+
+    if args.batch:
+        # Close only the files opened here, never stdin or stdout
+        with contextlib.ExitStack() as opened:
+            input_file = sys.stdin if args.batch == "-" else opened.enter_context(open(args.batch, encoding="utf-8"))
+            output_file = opened.enter_context(open(args.output, "w", encoding="utf-8")) if args.output else sys.stdout
+            asyncio.run(run_batch(input_file, output_file, concurrency=args.concurrency))
+    else:
+        user_request = input("\nI am a travel booking agent. How can I assist you with your travel plans? ")
+        if args.stream:
+            asyncio.run(print_stream(user_request))
+        else:
+            asyncio.run(run_agent(user_request))
+    if args.metrics:
+        print("\n" + get_app().metrics.summary(), file=sys.stderr)
\ No newline at end of file
@@ -0,0 +1,72 @@
+"""Compares prompt tokens, latency and cost per booking across context policies.
+
+Every session runs several turns, so the history a full-context agent is sent keeps growing.
+FakeTravelLlm charges a fixed latency per call plus a latency per 1000 prompt tokens, standing
+in for the model's prefill time, so trimming shows up in latency as well as in tokens.
+
+    python benchmarks/bench_context_policy.py --sessions 10 --turns 4 --latency-ms 50 --ms-per-1k-tokens 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import bench_utils  # Puts the repository root on sys.path
+from adk_travel_agent import build_app, generate_session_id, run_turn
+from context_policy import ContextPolicy
+from fake_llm import FakeTravelLlm
+from token_usage import TokenUsageTracker
+
+PROMPTS = [
+    "Book a flight from San Francisco to Mumbai for 26th April 2026. Book a two queen room at Marriott Intercontinental at Mumbai for 27th April 2026 for 4 nights.",
+    "Book a flight from Mumbai to Delhi for 1st May 2026. Book a stay at Taj Palace in Delhi for 2 nights.",
+    "Book a flight from Delhi to San Francisco for 3rd May 2026.",
+]
+PRESETS = {
+    "full": None,
+    "last_n": {"*": ContextPolicy("last_n", last_n=4)},
+    # The summary agent needs the booking results, so it keeps the full history here
+    "own": {"adk_flight_booking_agent": ContextPolicy("own"), "adk_hotel_booking_agent": ContextPolicy("own")},
+    "own+state": {"adk_flight_booking_agent": ContextPolicy("own"), "adk_hotel_booking_agent": ContextPolicy("own"),
+                  "adk_trip_summary_agent": ContextPolicy("state")},
+}
+AGENTS = ["adk_flight_booking_agent", "adk_hotel_booking_agent", "adk_trip_summary_agent"]
+
+
+async def measure(policies, sessions: int, turns: int, model: FakeTravelLlm) -> dict:
+    tracker = TokenUsageTracker()
+    app = build_app(model=model, context_policies=policies, token_usage=tracker)
+    latencies, bookings = [], 0
+    for _ in range(sessions):
+        session_id = generate_session_id()
+        for turn in range(turns):
+            prompt = PROMPTS[turn % len(PROMPTS)]
+            start = time.perf_counter()
+            await run_turn(prompt, session_id=session_id, app=app)
+            latencies.append((time.perf_counter() - start) * 1000)
+            bookings += prompt.count("flight from") + (1 if "stay at" in prompt or "room at" in prompt else 0)
+    await app.close()
+    return {"tracker": tracker, "latencies": latencies, "bookings": bookings, "turns": sessions * turns}
+
+
+async def main(sessions: int, turns: int, latency_ms: float, ms_per_1k_tokens: float):
+    model = FakeTravelLlm(latency_ms=latency_ms, ms_per_1k_prompt_tokens=ms_per_1k_tokens)
+    header = "".join(f"{agent.removeprefix('adk_').removesuffix('_agent') + ' in':>24}" for agent in AGENTS)
+    print(f"{'policy':<12}{header}{'turn p50 ms':>14}{'usd/booking':>14}")
+    for name, policies in PRESETS.items():
+        result = await measure(policies, sessions, turns, model)
+        totals = result["tracker"].totals
+        per_turn = "".join(f"{totals[agent].input_tokens / result['turns']:>24.0f}" if agent in totals else f"{'-':>24}"
+                           for agent in AGENTS)
+        cost = sum(usage.cost_usd for usage in totals.values()) / max(1, result["bookings"])
+        print(f"{name:<12}{per_turn}{statistics.median(result['latencies']):>14.1f}{cost:>14.8f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--turns", type=int, default=4, help="Turns per session, later turns carry more history.")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--ms-per-1k-tokens", type=float, default=200.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.sessions, args.turns, args.latency_ms, args.ms_per_1k_tokens))
@@ -0,0 +1,64 @@
+"""Measures cold start: importing adk_travel_agent, building the app and setting up telemetry.
+
+Each phase runs in a fresh interpreter so nothing is served from an already populated sys.modules.
+With --top, also lists the slowest modules of the full cold start from python -X importtime.
+
+    python benchmarks/bench_import_time.py --repeat 5 --top 10
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+from bench_utils import ROOT
+
+PROBE = """
+import json, time
+start = time.perf_counter()
+import adk_travel_agent
+imported = time.perf_counter()
+adk_travel_agent.build_app(model="fake-travel")
+built = time.perf_counter()
+adk_travel_agent.setup_telemetry()
+ready = time.perf_counter()
+print(json.dumps({"import": imported - start, "build_app": built - imported, "telemetry": ready - built}))
+"""
+
+
+def run_probe() -> dict:
+    result = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_modules(top: int) -> list[tuple[int, str]]:
+    code = "import adk_travel_agent; adk_travel_agent.build_app(model='fake-travel'); adk_travel_agent.setup_telemetry()"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, capture_output=True, text=True)
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):  # Top-level imports only, their cumulative time includes their children
+            modules.append((int(cumulative), name.strip()))
+    return sorted(modules, reverse=True)[:top]
+
+
+def main(repeat: int, top: int):
+    runs = [run_probe() for _ in range(repeat)]
+    print(f"{'phase':<12}{'p50 ms':>10}{'max ms':>10}")
+    for phase in ("import", "build_app", "telemetry"):
+        values = [run[phase] * 1000 for run in runs]
+        print(f"{phase:<12}{statistics.median(values):>10.1f}{max(values):>10.1f}")
+    if top:
+        print(f"\n{'module':<48}{'cumulative ms':>14}")
+        for cumulative_us, name in slowest_modules(top):
+            print(f"{name:<48}{cumulative_us / 1000:>14.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Slowest top-level modules to list, 0 to skip.")
+    args = parser.parse_args()
+    main(args.repeat, args.top)
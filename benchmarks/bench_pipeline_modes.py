@@ -0,0 +1,52 @@
+"""Compares turn latency of the sequential and parallel pipeline modes.
+
+Every LlmAgent is pointed at the offline FakeTravelLlm with a fixed latency per call,
+so the numbers reflect how many model round-trips sit on the critical path of a turn.
+
+    python benchmarks/bench_pipeline_modes.py --turns 20 --latency-ms 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from bench_utils import percentile
+from adk_travel_agent import PIPELINE_MODES, USER_ID, build_root_agent, generate_session_id
+from fake_llm import FakeTravelLlm
+
+PROMPT = "Book a flight from San Francisco to Mumbai for 26th April 2026. Book a two queen room at Marriott Intercontinental at Mumbai for 27th April 2026 for 4 nights."
+
+
+async def measure(mode: str, turns: int, latency_ms: float) -> list[float]:
+    session_service = InMemorySessionService()
+    runner = Runner(agent=build_root_agent(mode, model=FakeTravelLlm(latency_ms=latency_ms)),
+                    app_name="bench_pipeline_modes", session_service=session_service)
+    content = types.Content(role='user', parts=[types.Part(text=PROMPT)])
+    latencies = []
+    for _ in range(turns):
+        session_id = generate_session_id()
+        await session_service.create_session(app_name="bench_pipeline_modes", user_id=USER_ID, session_id=session_id)
+        start = time.perf_counter()
+        async for _event in runner.run_async(user_id=USER_ID, session_id=session_id, new_message=content):
+            pass
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+async def main(turns: int, latency_ms: float):
+    print(f"{'mode':<12}{'p50 ms':>10}{'p95 ms':>10}{'mean ms':>10}")
+    for mode in PIPELINE_MODES:
+        latencies = await measure(mode, turns, latency_ms)
+        print(f"{mode:<12}{percentile(latencies, 50):>10.1f}{percentile(latencies, 95):>10.1f}{statistics.mean(latencies):>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.turns, args.latency_ms))
@@ -0,0 +1,65 @@
+"""Compares model calls and turn latency with the request router, a faster summary model and the template summary.
+
+The traffic is mostly single-intent: requests for a flight or a hotel, with some combined trips.
+Latency percentiles are reported separately for single-intent and combined requests.
+Every agent uses FakeTravelLlm with --latency-ms per call. The tiered setup gives the summary agent
+its own FakeTravelLlm with --summary-latency-ms, standing in for a smaller, faster model. The
+template setup summarizes from the booking results and calls the summary model only as a fallback.
+
+    python benchmarks/bench_routing.py --turns 60 --latency-ms 100 --summary-latency-ms 40
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from bench_utils import percentile
+from adk_travel_agent import build_app, run_turn
+from fake_llm import FakeTravelLlm
+from request_router import RequestRouter
+from template_summary import TemplateSummarizer
+from token_usage import TokenUsageTracker
+
+TRAFFIC = [
+    "Book a flight from San Jose to Seattle for 27th Nov 2025.",
+    "Book a stay at Hyatt in Seattle for 2 nights.",
+    "Book a flight from San Francisco to Mumbai for 26th April 2026.",
+    "Book a two queen room at Marriott Intercontinental at Mumbai for 27th April 2026 for 4 nights.",
+    "Book a flight from Delhi to Boston for 3rd May 2026. Book a stay at Hilton in Boston for 3 nights.",
+]
+
+
+async def measure(turns: int, latency_ms: float, summary_latency_ms: float, routed: bool, tiered: bool,
+                  templated: bool = False) -> tuple[dict, int]:
+    tracker = TokenUsageTracker()
+    agent_models = {"adk_trip_summary_agent": FakeTravelLlm(latency_ms=summary_latency_ms)} if tiered else None
+    app = build_app(model=FakeTravelLlm(latency_ms=latency_ms), token_usage=tracker, agent_models=agent_models,
+                    router=RequestRouter() if routed else None, summarizer=TemplateSummarizer() if templated else None)
+    latencies = {"single": [], "combined": []}
+    for index in range(turns):
+        prompt = TRAFFIC[index % len(TRAFFIC)]
+        start = time.perf_counter()
+        await run_turn(prompt, app=app)
+        latencies["combined" if "flight" in prompt and "stay" in prompt else "single"].append((time.perf_counter() - start) * 1000)
+    await app.close()
+    return latencies, tracker.stats()["model_calls"]
+
+
+async def main(turns: int, latency_ms: float, summary_latency_ms: float):
+    print(f"{'setup':<20}{'calls/turn':>12}{'single p50':>12}{'single p95':>12}{'combined p95':>14}{'mean ms':>10}")
+    setups = [("all agents", False, False, False), ("router", True, False, False), ("router + tiered", True, True, False),
+              ("router + template", True, False, True)]
+    for name, routed, tiered, templated in setups:
+        latencies, calls = await measure(turns, latency_ms, summary_latency_ms, routed, tiered, templated)
+        single, combined = latencies["single"], latencies["combined"]
+        print(f"{name:<20}{calls / turns:>12.2f}{percentile(single, 50):>12.1f}{percentile(single, 95):>12.1f}"
+              f"{percentile(combined, 95):>14.1f}{statistics.mean(single + combined):>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=60)
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--summary-latency-ms", type=float, default=40.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.turns, args.latency_ms, args.summary_latency_ms))
@@ -0,0 +1,77 @@
+"""Append/read throughput of the session services, to quantify the cost of durability.
+
+Each service gets the same workload: create sessions, append events in turns of several events,
+then read every session back. SQLite is measured with per-turn write batching, with one
+transaction per event, and for cold reads from a freshly opened service (empty hot cache).
+
+    python benchmarks/bench_session_store.py --sessions 200 --turns 5 --events-per-turn 6
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from google.adk.events import Event
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+import bench_utils  # Puts the repository root on sys.path
+from session_store import BoundedSessionService, SqliteSessionService
+
+APP_NAME = "bench_session_store"
+USER_ID = "user_123"
+
+
+async def append_all(service, sessions: int, turns: int, events_per_turn: int) -> float:
+    start = time.perf_counter()
+    for index in range(sessions):
+        session = await service.create_session(app_name=APP_NAME, user_id=USER_ID, session_id=f"session-{index}")
+        for turn in range(turns):
+            for position in range(events_per_turn):
+                text = f"turn {turn} event {position}: Flight booked from San Francisco to Mumbai."
+                await service.append_event(session, Event(author="adk_flight_booking_agent", invocation_id=f"{index}-{turn}",
+                                                          content=types.Content(role="model", parts=[types.Part(text=text)])))
+            if isinstance(service, SqliteSessionService):
+                await service.flush()
+    return time.perf_counter() - start
+
+
+async def read_all(service, sessions: int) -> float:
+    start = time.perf_counter()
+    for index in range(sessions):
+        await service.get_session(app_name=APP_NAME, user_id=USER_ID, session_id=f"session-{index}")
+    return time.perf_counter() - start
+
+
+async def main(sessions: int, turns: int, events_per_turn: int):
+    events = sessions * turns * events_per_turn
+    print(f"{'service':<28}{'append ev/s':>14}{'read sess/s':>14}")
+
+    def report(name: str, append_seconds, read_seconds):
+        append_rate = f"{events / append_seconds:>14.0f}" if append_seconds else f"{'-':>14}"
+        print(f"{name:<28}{append_rate}{sessions / read_seconds:>14.0f}")
+
+    for name, service in [("InMemorySessionService", InMemorySessionService()),
+                          ("BoundedSessionService", BoundedSessionService(max_sessions=sessions))]:
+        report(name, await append_all(service, sessions, turns, events_per_turn), await read_all(service, sessions))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, batch in [("Sqlite (batched per turn)", events_per_turn), ("Sqlite (one txn per event)", 1)]:
+            db_path = os.path.join(tmp, f"sessions-{batch}.db")
+            service = SqliteSessionService(db_path, cache_size=sessions, max_batch_events=batch)
+            report(name, await append_all(service, sessions, turns, events_per_turn), await read_all(service, sessions))
+            await service.close()
+
+        cold = SqliteSessionService(os.path.join(tmp, f"sessions-{events_per_turn}.db"), cache_size=sessions)
+        report("Sqlite (cold cache reads)", None, await read_all(cold, sessions))
+        await cold.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--events-per-turn", type=int, default=6)
+    args = parser.parse_args()
+    asyncio.run(main(args.sessions, args.turns, args.events_per_turn))
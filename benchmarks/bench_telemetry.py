@@ -0,0 +1,78 @@
+"""Measures the tracing overhead per turn of the telemetry profiles.
+
+Turns run back to back on FakeTravelLlm, so the time per turn is mostly framework and tracing
+work. "off" runs before Monocle is set up. "spans" is instrumented without a span processor,
+the baseline of the overhead column. "full" is Monocle's default BatchSpanProcessor, and
+"sampled" is telemetry.SampledBatchSpanProcessor; both write spans to Monocle's file exporter
+in a temporary directory. Export time after each round is reported separately as flush ms.
+
+    python benchmarks/bench_telemetry.py --turns 200 --sample-rate 0.1
+"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+
+import bench_utils  # Puts the repository root on sys.path
+from adk_travel_agent import build_app, run_turn
+from telemetry import SampledBatchSpanProcessor
+
+PROMPT = "Book a flight from San Jose to Seattle for 27th Nov 2025. Book a stay at Hyatt in Seattle for 2 nights."
+
+
+async def measure(turns: int) -> list[float]:
+    app = build_app(model="fake-travel")
+    await run_turn(PROMPT, app=app)  # Warm up imports and the first session
+    latencies = []
+    for _ in range(turns):
+        start = time.perf_counter()
+        await run_turn(PROMPT, app=app)
+        latencies.append((time.perf_counter() - start) * 1000)
+    await app.close()
+    return latencies
+
+
+async def main(turns: int, rounds: int, sample_rate: float):
+    from monocle_apptrace.exporters.file_exporter import FileSpanExporter
+    from monocle_apptrace.instrumentation.common.instrumentor import reset_span_processors, setup_monocle_telemetry
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+    print(f"{'profile':<10}{'p50 ms':>10}{'mean ms':>10}{'overhead':>10}{'exported':>10}{'dropped':>10}{'flush ms':>10}")
+    off = await measure(turns)
+    print(f"{'off':<10}{statistics.median(off):>10.2f}{statistics.mean(off):>10.2f}")
+    with tempfile.TemporaryDirectory() as trace_dir:
+        # Swapping processors shuts the previous ones down, so every round gets new ones
+        profiles = {"spans": lambda: None, "full": lambda: BatchSpanProcessor(FileSpanExporter(out_path=trace_dir)),
+                    "sampled": lambda: SampledBatchSpanProcessor([FileSpanExporter(out_path=trace_dir)], sample_rate=sample_rate)}
+        setup_monocle_telemetry(workflow_name="bench_telemetry", span_processors=[profiles["full"]()])
+        latencies = {name: [] for name in profiles}
+        flush_ms = {name: 0.0 for name in profiles}
+        stats = {name: {} for name in profiles}
+        # Turns get slower as the process warms up and its heap grows, so alternate the profiles in rounds
+        for _ in range(rounds):
+            for name, make_processor in profiles.items():
+                processor = make_processor()
+                reset_span_processors([processor] if processor else [])
+                latencies[name] += await measure(turns // rounds)
+                if processor:
+                    start = time.perf_counter()
+                    await asyncio.to_thread(processor.force_flush)
+                    flush_ms[name] += (time.perf_counter() - start) * 1000
+                for key, value in (processor.stats() if hasattr(processor, "stats") else {}).items():
+                    stats[name][key] = stats[name].get(key, 0) + value
+        reset_span_processors([])
+        baseline = statistics.mean(latencies["spans"])
+        for name in profiles:
+            mean = statistics.mean(latencies[name])
+            print(f"{name:<10}{statistics.median(latencies[name]):>10.2f}{mean:>10.2f}{(mean - baseline) / baseline:>10.1%}"
+                  f"{stats[name].get('exported', '-'):>10}{stats[name].get('dropped', '-'):>10}{flush_ms[name]:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--sample-rate", type=float, default=0.1)
+    args = parser.parse_args()
+    asyncio.run(main(args.turns, args.rounds, args.sample_rate))
@@ -0,0 +1,94 @@
+"""Compares disk use and analysis cost of Monocle's file exporter and NDJSON segments.
+
+Synthetic traces copy the spans of the trace in .monocle.example (names, attributes and events),
+and are exported in batches like a batch span processor would. The analysis counts agentic.turn
+spans: Monocle's files are loaded one JSON document at a time, segments are streamed with
+trace_files.iter_spans. Peak memory is measured with tracemalloc.
+
+    python benchmarks/bench_trace_files.py --traces 2000 --segment-mb 4
+"""
+import argparse
+import json
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import bench_utils  # Puts the repository root on sys.path
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.trace import set_span_in_context
+from trace_files import NdjsonSpanExporter, iter_spans
+
+EXAMPLE_DIR = Path(__file__).resolve().parent.parent / ".monocle.example"
+
+
+def make_spans(traces: int) -> list:
+    template = json.loads(next(EXAMPLE_DIR.glob("*.json")).read_text())
+    tracer = TracerProvider().get_tracer(__name__)
+    spans = []
+    for _ in range(traces):
+        root = None
+        for index, source in enumerate(template):
+            attributes = {key: value for key, value in source["attributes"].items() if value is not None}
+            span = tracer.start_span(source["name"], context=set_span_in_context(root) if root else None,
+                                     attributes=attributes)
+            for event in source.get("events", []):
+                span.add_event(event["name"], {key: str(value) for key, value in (event.get("attributes") or {}).items()})
+            span.end()
+            root = root or span
+            spans.append(span)
+    return spans
+
+
+def export(exporter, spans: list, batch_size: int = 512) -> float:
+    start = time.perf_counter()
+    for offset in range(0, len(spans), batch_size):
+        exporter.export(spans[offset:offset + batch_size])
+    exporter.shutdown()
+    return time.perf_counter() - start
+
+
+def measure_read(count_turns) -> tuple[int, float, float]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    turns = count_turns()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return turns, elapsed, peak / 2 ** 20
+
+
+def load_monocle_files(directory: str) -> int:
+    turns = 0
+    for path in Path(directory).glob("*.json"):
+        with open(path) as document:
+            turns += sum(1 for span in json.load(document) if span["attributes"].get("span.type") == "agentic.turn")
+    return turns
+
+
+def main(traces: int, segment_mb: float):
+    from monocle_apptrace.exporters.file_exporter import FileSpanExporter
+
+    spans = make_spans(traces)
+    print(f"{traces} traces, {len(spans)} spans")
+    print(f"{'sink':<10}{'export s':>10}{'files':>8}{'disk MB':>10}{'read s':>10}{'peak MB':>10}{'turns':>8}")
+    with tempfile.TemporaryDirectory() as monocle_dir, tempfile.TemporaryDirectory() as ndjson_dir:
+        sinks = [
+            ("file", monocle_dir, FileSpanExporter(out_path=monocle_dir), lambda: load_monocle_files(monocle_dir)),
+            ("ndjson", ndjson_dir, NdjsonSpanExporter(ndjson_dir, segment_bytes=int(segment_mb * 2 ** 20)),
+             lambda: sum(1 for _ in iter_spans(ndjson_dir, span_types=["agentic.turn"]))),
+        ]
+        for name, directory, exporter, count_turns in sinks:
+            export_seconds = export(exporter, spans)
+            files = list(Path(directory).iterdir())
+            disk_mb = sum(path.stat().st_size for path in files) / 2 ** 20
+            turns, read_seconds, peak_mb = measure_read(count_turns)
+            print(f"{name:<10}{export_seconds:>10.2f}{len(files):>8}{disk_mb:>10.1f}{read_seconds:>10.2f}{peak_mb:>10.2f}{turns:>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--traces", type=int, default=2000)
+    parser.add_argument("--segment-mb", type=float, default=4.0)
+    args = parser.parse_args()
+    main(args.traces, args.segment_mb)
@@ -0,0 +1,17 @@
+"""Helpers shared by the benchmark scripts.
+
+Importing this module puts the repository root on sys.path, so a script run as
+`python benchmarks/<script>.py` can import the app's modules.
+"""
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of values, pct from 0 to 100."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
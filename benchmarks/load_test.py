@@ -0,0 +1,128 @@
+"""No-network load test of the booking pipeline against the offline FakeTravelLlm.
+
+For each concurrency level it reports requests/sec, turn latency percentiles, a latency histogram
+per stage (each sub-agent and the whole turn) and the peak RSS of the process so far.
+
+    python benchmarks/load_test.py --concurrency 1,4,16,64 --requests 200 --latency-ms 50
+"""
+import argparse
+import asyncio
+import bisect
+import resource
+import sys
+import time
+from collections import defaultdict
+
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from bench_utils import percentile
+from adk_travel_agent import ADK_PIPELINE_MODE, PIPELINE_MODES, USER_ID, build_root_agent, generate_session_id
+from fake_llm import FakeTravelLlm
+
+APP_NAME = "load_test"
+PROMPTS = [
+    "Book a flight from San Francisco to Mumbai for 26th April 2026. Book a two queen room at Marriott Intercontinental at Mumbai for 27th April 2026 for 4 nights.",
+    "Book a flight from San Jose to Seattle for 27th Nov 2025.",
+    "Please Book a flight from New York to Hamburg for 1st Dec 2025. Then book a hotel room in Paris for 5th Jan 2026.",
+]
+# Upper bounds in ms, the last bucket catches everything slower
+BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float("inf")]
+TURN_STAGE = "turn"
+
+
+class StageTimer:
+    """Records per-agent latency through the before/after agent callbacks."""
+
+    def __init__(self):
+        self.samples: dict[str, list[float]] = defaultdict(list)
+        self._started: dict[tuple[str, str], float] = {}
+
+    def attach(self, root_agent):
+        for agent in [root_agent, *_descendants(root_agent)]:
+            agent.before_agent_callback = self.before_agent
+            agent.after_agent_callback = self.after_agent
+
+    def before_agent(self, callback_context):
+        self._started[(callback_context.invocation_id, callback_context.agent_name)] = time.perf_counter()
+
+    def after_agent(self, callback_context):
+        started = self._started.pop((callback_context.invocation_id, callback_context.agent_name), None)
+        if started is not None:
+            self.samples[callback_context.agent_name].append((time.perf_counter() - started) * 1000)
+
+
+def _descendants(agent):
+    for sub_agent in agent.sub_agents:
+        yield sub_agent
+        yield from _descendants(sub_agent)
+
+
+def histogram(values: list[float]) -> list[int]:
+    counts = [0] * len(BUCKETS_MS)
+    for value in values:
+        counts[bisect.bisect_left(BUCKETS_MS, value)] += 1
+    return counts
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+async def run_level(mode: str, concurrency: int, requests: int, latency_ms: float) -> tuple[float, StageTimer, int]:
+    session_service = InMemorySessionService()
+    root_agent = build_root_agent(mode, model=FakeTravelLlm(latency_ms=latency_ms))
+    timer = StageTimer()
+    timer.attach(root_agent)
+    runner = Runner(agent=root_agent, app_name=APP_NAME, session_service=session_service)
+    semaphore = asyncio.Semaphore(concurrency)
+    errors = 0
+
+    async def one(index: int):
+        nonlocal errors
+        async with semaphore:
+            session_id = generate_session_id()
+            await session_service.create_session(app_name=APP_NAME, user_id=USER_ID, session_id=session_id)
+            content = types.Content(role='user', parts=[types.Part(text=PROMPTS[index % len(PROMPTS)])])
+            start = time.perf_counter()
+            try:
+                async for _event in runner.run_async(user_id=USER_ID, session_id=session_id, new_message=content):
+                    pass
+            except Exception:
+                errors += 1
+            timer.samples[TURN_STAGE].append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(requests)))
+    return time.perf_counter() - start, timer, errors
+
+
+def report(concurrency: int, elapsed: float, timer: StageTimer, errors: int):
+    turns = timer.samples[TURN_STAGE]
+    print(f"\nconcurrency={concurrency} requests={len(turns)} errors={errors} "
+          f"rps={len(turns) / elapsed:.1f} p50={percentile(turns, 50):.1f}ms p95={percentile(turns, 95):.1f}ms "
+          f"peak_rss={peak_rss_mb():.1f}MB")
+    labels = [f"<={bound:g}" if bound != float("inf") else ">" + f"{BUCKETS_MS[-2]:g}" for bound in BUCKETS_MS]
+    print(f"  {'stage (ms)':<28}" + "".join(f"{label:>7}" for label in labels))
+    for stage, values in sorted(timer.samples.items()):
+        print(f"  {stage:<28}" + "".join(f"{count:>7}" for count in histogram(values)))
+
+
+async def main(mode: str, levels: list[int], requests: int, latency_ms: float):
+    print(f"mode={mode} fake model latency={latency_ms:g}ms")
+    for concurrency in levels:
+        elapsed, timer, errors = await run_level(mode, concurrency, requests, latency_ms)
+        report(concurrency, elapsed, timer, errors)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=PIPELINE_MODES, default=ADK_PIPELINE_MODE)
+    parser.add_argument("--concurrency", default="1,4,16,64", help="Comma separated concurrency levels.")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per concurrency level.")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Fake model latency per call.")
+    args = parser.parse_args()
+    asyncio.run(main(args.mode, [int(level) for level in args.concurrency.split(",")], args.requests, args.latency_ms))
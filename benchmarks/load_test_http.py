@@ -0,0 +1,67 @@
+"""Load test for server.py over HTTP with keep-alive connections.
+
+Start the server first, e.g. against the offline fake model:
+
+    GOOGLE_GENAI_MODEL=fake-travel FAKE_LLM_LATENCY_MS=200 python server.py --port 8080
+    python benchmarks/load_test_http.py --url http://127.0.0.1:8080 --requests 500 --concurrency 32
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+
+import httpx
+
+from bench_utils import percentile
+
+PROMPTS = [
+    "Book a flight from San Francisco to Mumbai for 26th April 2026. Book a two queen room at Marriott Intercontinental at Mumbai for 27th April 2026 for 4 nights.",
+    "Book a flight from San Jose to Seattle for 27th Nov 2025.",
+    "Please Book a flight from New York to Hamburg for 1st Dec 2025. Then book a hotel room in Paris for 5th Jan 2026.",
+]
+
+
+async def main(url: str, requests: int, concurrency: int, stream: bool):
+    path = "/book/stream" if stream else "/book"
+    statuses = Counter()
+    latencies, first_byte = [], []
+    pending = iter(range(requests))
+    # One pooled client, so every worker reuses its keep-alive connection
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=httpx.Timeout(120)) as client:
+
+        async def worker():
+            for index in pending:
+                start, first = time.perf_counter(), None
+                try:
+                    async with client.stream("POST", path, json={"prompt": PROMPTS[index % len(PROMPTS)]}) as response:
+                        async for _chunk in response.aiter_bytes():
+                            first = first or (time.perf_counter() - start) * 1000
+                        statuses[response.status_code] += 1
+                except httpx.HTTPError as e:
+                    statuses[type(e).__name__] += 1
+                    continue
+                if response.status_code == 200:
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    first_byte.append(first)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    print(f"{path}: {requests} requests, concurrency {concurrency}, {elapsed:.1f}s, {len(latencies) / elapsed:.1f} ok/s")
+    print("status: " + ", ".join(f"{status}={count}" for status, count in sorted(statuses.items(), key=str)))
+    if latencies:
+        print(f"latency ms: p50={percentile(latencies, 50):.1f} p95={percentile(latencies, 95):.1f} mean={statistics.mean(latencies):.1f}")
+        print(f"first byte ms: p50={percentile(first_byte, 50):.1f} p95={percentile(first_byte, 95):.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--stream", action="store_true", help="Use /book/stream instead of /book.")
+    args = parser.parse_args()
+    asyncio.run(main(args.url, args.requests, args.concurrency, args.stream))
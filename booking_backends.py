@@ -0,0 +1,315 @@
+"""Async backends behind the adk_book_flight and adk_book_hotel tools.
+
+ADK calls a synchronous tool directly on the event loop that runner.run_async shares across every
+session, so one slow inventory call would stall all concurrent turns. booking_tools() builds async
+tools with the same names, arguments and docstrings that await a BookingBackend instead:
+
+- ThreadPoolBookingBackend runs synchronous booking functions in a dedicated thread pool.
+- HttpBookingBackend calls an inventory service over a pooled HTTP client, for example the local
+  stand-in in fake_booking_server.py.
+
+Both share the same call policy: at most max_concurrency calls in flight, a timeout per attempt,
+retries with exponential backoff and full jitter, and a circuit breaker that fails fast while the
+backend keeps failing. A booking that still fails comes back to the model as
+{"status": "error", "message": ...} so it can tell the user instead of aborting the turn.
+"""
+import asyncio
+import functools
+import logging
+import random
+import time
+import uuid
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class BookingError(Exception):
+    """A booking call failed after its retries."""
+
+
+class RetryableBookingError(BookingError):
+    """A failure worth retrying, e.g. a 5xx or 429 from the inventory service."""
+
+
+class BookingRejectedError(BookingError):
+    """The service refused the booking, e.g. a 4xx. The call failed but the service is healthy."""
+
+
+class CircuitOpenError(BookingError):
+    """The circuit breaker is open and the call was rejected without reaching the backend."""
+
+
+@dataclass
+class BookingBackendMetrics:
+    calls: int = 0
+    successes: int = 0
+    failures: int = 0
+    retries: int = 0
+    timeouts: int = 0
+    rejected: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class CircuitBreaker:
+    """Opens after failure_threshold consecutive failed calls and lets one trial call through
+    every reset_seconds until one succeeds.
+
+    Args:
+        failure_threshold (int): consecutive failures that open the circuit, 0 disables the breaker.
+        reset_seconds (float): time the circuit stays open before a trial call is allowed.
+        clock: monotonic time source, injectable for tests.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        return "half_open" if self._clock() - self._opened_at >= self.reset_seconds else "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self, trial: bool = False):
+        self._failures = 0
+        self._opened_at = None
+        if trial:
+            self._trial_in_flight = False
+
+    def record_failure(self, trial: bool = False):
+        """Counts a failed call, trial is True for the half open trial call, whose failure reopens the circuit."""
+        self._failures += 1
+        if trial or (self.failure_threshold and self._failures >= self.failure_threshold):
+            self._opened_at = self._clock()
+        if trial:
+            self._trial_in_flight = False
+
+    def release_trial(self):
+        """Lets the next call through as the trial when the trial call ended without an outcome, e.g. cancelled."""
+        self._trial_in_flight = False
+
+
+class BookingBackend(ABC):
+    """Call policy shared by the backends, subclasses implement _book_flight and _book_hotel.
+
+    Args:
+        max_concurrency (int): booking calls in flight at once, further calls wait their turn.
+        timeout_seconds (float): limit for a single attempt.
+        retries (int): attempts after the first one for timeouts and retryable errors.
+        backoff_seconds (float): base of the exponential backoff between attempts.
+        max_backoff_seconds (float): cap of the backoff.
+        breaker (CircuitBreaker): defaults to a breaker opening after 5 failed calls for 30s.
+    """
+
+    retry_on: tuple = (asyncio.TimeoutError, RetryableBookingError)
+    # Whether an attempt that timed out is retried, safe only when every attempt carries the idempotency key
+    retry_timeouts: bool = True
+
+    def __init__(self, max_concurrency: int = 16, timeout_seconds: float = 10, retries: int = 2,
+                 backoff_seconds: float = 0.1, max_backoff_seconds: float = 2,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.max_concurrency = max_concurrency
+        self.timeout_seconds = timeout_seconds
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.breaker = breaker or CircuitBreaker()
+        self.metrics = BookingBackendMetrics()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._rng = random.Random()
+
+    async def book_flight(self, from_airport: str, to_airport: str) -> dict:
+        return await self._call(functools.partial(self._book_flight, from_airport, to_airport))
+
+    async def book_hotel(self, hotel_name: str, city: str) -> dict:
+        return await self._call(functools.partial(self._book_hotel, hotel_name, city))
+
+    @abstractmethod
+    async def _book_flight(self, from_airport: str, to_airport: str, idempotency_key: str) -> dict:
+        """One attempt at booking a flight."""
+
+    @abstractmethod
+    async def _book_hotel(self, hotel_name: str, city: str, idempotency_key: str) -> dict:
+        """One attempt at booking a hotel."""
+
+    async def close(self):
+        pass
+
+    def stats(self) -> dict:
+        return {**self.metrics.as_dict(), "circuit_open": int(self.breaker.state != "closed")}
+
+    def backoff(self, attempt: int) -> float:
+        """Full jitter: a uniform delay up to the exponential backoff of this attempt."""
+        return self._rng.uniform(0, min(self.max_backoff_seconds, self.backoff_seconds * 2 ** attempt))
+
+    async def _call(self, attempt_call: Callable[[str], Awaitable[dict]]) -> dict:
+        self.metrics.calls += 1
+        # One key for every attempt, so the service can drop a retry of a booking it already made
+        idempotency_key = str(uuid.uuid4())
+        async with self._semaphore:
+            # Asked once a slot is free, the breaker may have opened while this call waited
+            trial = self.breaker.state == "half_open"
+            if not self.breaker.allow():
+                self.metrics.rejected += 1
+                raise CircuitOpenError("Booking service is unavailable, try again later.")
+            try:
+                return await self._attempts(attempt_call, idempotency_key, trial)
+            finally:
+                if trial:
+                    self.breaker.release_trial()
+
+    async def _attempts(self, attempt_call: Callable[[str], Awaitable[dict]], idempotency_key: str, trial: bool) -> dict:
+        for attempt in range(self.retries + 1):
+            try:
+                result = await asyncio.wait_for(attempt_call(idempotency_key), self.timeout_seconds)
+            except self.retry_on as e:
+                timed_out = isinstance(e, asyncio.TimeoutError)
+                if timed_out:
+                    self.metrics.timeouts += 1
+                if attempt == self.retries or (timed_out and not self.retry_timeouts):
+                    self._failed(trial)
+                    raise BookingError(f"Booking failed after {attempt + 1} attempts: {type(e).__name__} {e}".strip()) from e
+                self.metrics.retries += 1
+                await asyncio.sleep(self.backoff(attempt))
+            except BookingRejectedError:
+                # The service answered, so it counts towards closing the breaker, not opening it
+                self.breaker.record_success(trial)
+                self.metrics.failures += 1
+                raise
+            except Exception:
+                self._failed(trial)
+                raise
+            else:
+                self.breaker.record_success(trial)
+                self.metrics.successes += 1
+                return result
+
+    def _failed(self, trial: bool):
+        self.breaker.record_failure(trial)
+        self.metrics.failures += 1
+
+
+class ThreadPoolBookingBackend(BookingBackend):
+    """Runs synchronous booking functions in a thread pool so they never block the event loop.
+
+    An attempt that timed out is not retried: its thread keeps running, and the sync functions take no
+    idempotency key, so a retry could book a second time.
+
+    Args:
+        book_flight: sync function taking from_airport and to_airport.
+        book_hotel: sync function taking hotel_name and city.
+        max_workers (int): threads in the pool, also the default max_concurrency.
+        **policy: see BookingBackend.
+    """
+
+    retry_on = (asyncio.TimeoutError, RetryableBookingError, ConnectionError, TimeoutError)
+    retry_timeouts = False
+
+    def __init__(self, book_flight: Callable[..., dict], book_hotel: Callable[..., dict], max_workers: int = 8, **policy):
+        policy.setdefault("max_concurrency", max_workers)
+        super().__init__(**policy)
+        self._sync_book_flight = book_flight
+        self._sync_book_hotel = book_hotel
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="booking")
+
+    async def _book_flight(self, from_airport: str, to_airport: str, idempotency_key: str) -> dict:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._sync_book_flight, from_airport, to_airport)
+
+    async def _book_hotel(self, hotel_name: str, city: str, idempotency_key: str) -> dict:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._sync_book_hotel, hotel_name, city)
+
+    async def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class HttpBookingBackend(BookingBackend):
+    """Books through an inventory service over HTTP with a pooled, keep-alive client.
+
+        POST {base_url}/flights  {"from_airport", "to_airport"} -> {"status", "message"}
+        POST {base_url}/hotels   {"hotel_name", "city"}         -> {"status", "message"}
+
+    Every attempt of a booking carries the same Idempotency-Key header. Connection errors,
+    timeouts, 429 and 5xx responses are retried, other 4xx responses are not and don't count
+    towards opening the circuit breaker.
+
+    Args:
+        base_url (str): root URL of the inventory service.
+        max_connections (int): size of the connection pool.
+        transport: httpx transport, e.g. httpx.ASGITransport to call an in-process app in tests.
+        **policy: see BookingBackend.
+    """
+
+    retry_on = (asyncio.TimeoutError, RetryableBookingError, httpx.TransportError)
+
+    def __init__(self, base_url: str, max_connections: int = 32, transport: Optional[httpx.AsyncBaseTransport] = None, **policy):
+        super().__init__(**policy)
+        self.base_url = base_url
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            transport=transport,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            # The attempt timeout is enforced by BookingBackend, this only bounds a stuck connect
+            timeout=httpx.Timeout(None, connect=self.timeout_seconds),
+        )
+
+    async def _book_flight(self, from_airport: str, to_airport: str, idempotency_key: str) -> dict:
+        return await self._post("/flights", {"from_airport": from_airport, "to_airport": to_airport}, idempotency_key)
+
+    async def _book_hotel(self, hotel_name: str, city: str, idempotency_key: str) -> dict:
+        return await self._post("/hotels", {"hotel_name": hotel_name, "city": city}, idempotency_key)
+
+    async def _post(self, path: str, body: dict, idempotency_key: str) -> dict:
+        response = await self._client.post(path, json=body, headers={"Idempotency-Key": idempotency_key})
+        if response.status_code == 429 or response.status_code >= 500:
+            raise RetryableBookingError(f"{path} answered {response.status_code}")
+        if response.status_code >= 400:
+            raise BookingRejectedError(f"{path} answered {response.status_code}: {response.text}")
+        try:
+            return response.json()
+        except ValueError as e:
+            raise BookingError(f"{path} answered with a malformed body: {e}") from e
+
+    async def close(self):
+        await self._client.aclose()
+
+
+def booking_tools(backend: BookingBackend, book_flight: Callable[..., dict], book_hotel: Callable[..., dict]) -> list:
+    """Async tools awaiting backend, named and documented like book_flight and book_hotel.
+
+    The model sees the same function declarations as for the sync functions, so prompts,
+    tool names in traces and the progress events of stream_agent don't change.
+    """
+    return [_async_tool(book_flight, backend.book_flight, "Flight"), _async_tool(book_hotel, backend.book_hotel, "Hotel")]
+
+
+def _async_tool(declaration: Callable[..., dict], call: Callable[..., Awaitable[dict]], kind: str) -> Callable[..., Awaitable[dict]]:
+    @functools.wraps(declaration)
+    async def tool(**kwargs: Any) -> dict:
+        try:
+            return await call(**kwargs)
+        except BookingError as e:
+            logger.warning("%s booking failed: %s", kind, e)
+            return {"status": "error", "message": f"{kind} booking failed: {e}"}
+    return tool
@@ -0,0 +1,121 @@
+"""Per-agent trimming of the conversation sent to the model.
+
+Every LlmAgent in the pipeline gets the whole session history by default: the summary agent sees
+the user's prompt plus every tool call, tool response and reply of the booking agents, for every
+earlier turn of the session too. A ContextPolicy rewrites llm_request.contents in
+before_model_callback:
+
+    full     the unchanged history
+    last_n   the last N contents, starting at a user message
+    own      the user's messages and this agent's own calls, results and replies, no other agents
+    state    the current request, the tool results of the current turn recorded in session state by
+             record_tool_result, and this agent's own contents of the current turn
+
+record_tool_result is an after_tool_callback that stores each tool result in session state under
+tool_results:<agent name>, so the state policy and other consumers can read structured results
+instead of parsing transcripts.
+"""
+from typing import Any, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.adk.tools import BaseTool, ToolContext
+from google.genai import types
+
+CONTEXT_POLICIES = ("full", "last_n", "own", "state")
+TOOL_RESULTS_PREFIX = "tool_results:"
+# ADK replays other agents' events as user content starting with this text
+_FOREIGN_PREFIX = "For context:"
+
+
+def record_tool_result(tool: BaseTool, args: dict, tool_context: ToolContext, tool_response: Any) -> Optional[dict]:
+    """Appends the call to the agent's tool results of the current turn in session state."""
+    key = f"{TOOL_RESULTS_PREFIX}{tool_context.agent_name}"
+    recorded = tool_context.state.get(key) or {}
+    results = recorded.get("results", []) if recorded.get("invocation_id") == tool_context.invocation_id else []
+    tool_context.state[key] = {"invocation_id": tool_context.invocation_id,
+                               "results": [*results, {"tool": tool.name, "args": dict(args), "result": tool_response}]}
+    return None
+
+
+def turn_tool_results(state, invocation_id: str) -> list[dict]:
+    """Tool results every agent recorded during the invocation, as {"agent", "tool", "args", "result"}."""
+    results = []
+    values = state.to_dict() if hasattr(state, "to_dict") else state
+    for key, recorded in values.items():
+        if key.startswith(TOOL_RESULTS_PREFIX) and isinstance(recorded, dict) and recorded.get("invocation_id") == invocation_id:
+            results += [{"agent": key[len(TOOL_RESULTS_PREFIX):], **result} for result in recorded["results"]]
+    return results
+
+
+def _text(content: types.Content) -> str:
+    return "".join(part.text for part in content.parts or [] if part.text)
+
+
+def _is_foreign(content: types.Content) -> bool:
+    return content.role == "user" and _text(content).startswith(_FOREIGN_PREFIX)
+
+
+def _is_user_message(content: types.Content) -> bool:
+    return content.role == "user" and bool(_text(content)) and not _is_foreign(content) \
+        and not any(part.function_response for part in content.parts or [])
+
+
+class ContextPolicy:
+    """Decides what one agent sends to the model.
+
+    Args:
+        mode (str): one of CONTEXT_POLICIES.
+        last_n (int): contents kept by the last_n mode.
+    """
+
+    def __init__(self, mode: str = "full", last_n: int = 6):
+        if mode not in CONTEXT_POLICIES:
+            raise ValueError(f"Unknown context policy {mode!r}, expected one of {CONTEXT_POLICIES}.")
+        self.mode = mode
+        self.last_n = last_n
+
+    def __repr__(self) -> str:
+        return f"ContextPolicy({self.mode!r})" if self.mode != "last_n" else f"ContextPolicy('last_n', last_n={self.last_n})"
+
+    def before_model_callback(self, callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+        if self.mode != "full" and llm_request.contents:
+            llm_request.contents = self.trim(llm_request.contents, callback_context)
+        return None
+
+    def trim(self, contents: list[types.Content], callback_context: Optional[CallbackContext] = None) -> list[types.Content]:
+        if self.mode == "last_n":
+            start = max(0, len(contents) - self.last_n)
+            # Start at a user message so no function response is left without its call
+            while start > 0 and not _is_user_message(contents[start]):
+                start -= 1
+            return contents[start:]
+        if self.mode == "own":
+            return [content for content in contents if not _is_foreign(content)]
+        # state: the current request, then the recorded results, then what this agent did since
+        request_index = max((index for index, content in enumerate(contents) if _is_user_message(content)), default=None)
+        if request_index is None:
+            return contents
+        own = [content for content in contents[request_index + 1:] if not _is_foreign(content)]
+        results = [result for result in turn_tool_results(callback_context.state, callback_context.invocation_id)
+                   if result["agent"] != callback_context.agent_name] if callback_context else []
+        if not results:
+            return [contents[request_index], *own]
+        context = types.Content(role="user", parts=[types.Part(text=_FOREIGN_PREFIX)] + [
+            types.Part(text=f"[{result['agent']}] `{result['tool']}` tool returned result: {result['result']}")
+            for result in results
+        ])
+        return [contents[request_index], context, *own]
+
+
+def parse_context_policies(spec: str, last_n: int = 6) -> dict[str, ContextPolicy]:
+    """Parses "mode" for every agent or "agent=mode,..." with an optional "*=mode" default.
+
+    Returns:
+        dict: ContextPolicy by agent name, "*" for the agents not listed.
+    """
+    policies = {}
+    for item in filter(None, (item.strip() for item in spec.split(","))):
+        agent_name, _, mode = item.rpartition("=")
+        policies[agent_name.strip() or "*"] = ContextPolicy(mode.strip().lower(), last_n=last_n)
+    return policies
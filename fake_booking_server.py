@@ -0,0 +1,134 @@
+"""Local stand-in for the flight and hotel inventory systems, used with HttpBookingBackend.
+
+    POST /flights  {"from_airport", "to_airport"} -> {"status": "success", "message": "Flight booked from X to Y."}
+    POST /hotels   {"hotel_name", "city"}         -> {"status": "success", "message": "Successfully booked a stay at H in C."}
+    GET  /stats    bookings made, duplicates dropped and failures injected
+
+FAKE_BOOKING_LATENCY_MS delays every booking and FAKE_BOOKING_FAILURE_RATE answers that share of
+requests with 503, to exercise timeouts, retries and circuit breaking. A repeated Idempotency-Key
+returns the original booking instead of booking again. The key is reserved before the latency, so a
+retry that arrives while the original is still booking waits for it. Like a real inventory system,
+a booking runs to completion when its client stops waiting.
+
+    python fake_booking_server.py --port 8090
+    ADK_BOOKING_URL=http://127.0.0.1:8090 python adk_travel_agent.py
+"""
+import argparse
+import asyncio
+import os
+import random
+from collections import Counter, OrderedDict
+from typing import Optional
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+FAKE_BOOKING_LATENCY_MS = float(os.getenv("FAKE_BOOKING_LATENCY_MS", "0"))
+FAKE_BOOKING_FAILURE_RATE = float(os.getenv("FAKE_BOOKING_FAILURE_RATE", "0"))
+# Idempotency keys remembered, oldest are forgotten first
+_MAX_KEYS = 10000
+
+
+class FakeInventory:
+    """Bookings and fault injection state of the fake server.
+
+    Args:
+        latency_ms (float): delay before answering each booking.
+        failure_rate (float): share of bookings answered with 503.
+        seed (int): seed of the failure injection, None for a random one.
+    """
+
+    def __init__(self, latency_ms: float = FAKE_BOOKING_LATENCY_MS, failure_rate: float = FAKE_BOOKING_FAILURE_RATE,
+                 seed: Optional[int] = None):
+        self.latency_ms = latency_ms
+        self.failure_rate = failure_rate
+        # Deterministic fault injection for tests: the next fail_next bookings answer 503
+        self.fail_next = 0
+        self.counts = Counter()
+        self._rng = random.Random(seed)
+        self._bookings: "OrderedDict[str, asyncio.Future]" = OrderedDict()
+
+    def should_fail(self) -> bool:
+        if self.fail_next:
+            self.fail_next -= 1
+            return True
+        return self.failure_rate > 0 and self._rng.random() < self.failure_rate
+
+    def reserve(self, key: Optional[str], booking: asyncio.Future) -> asyncio.Future:
+        """Remembers the booking of key, a failed booking (None result) is forgotten so a retry can book."""
+        if key:
+            self._bookings[key] = booking
+            booking.add_done_callback(lambda _: self._forget_failed(key, booking))
+            while len(self._bookings) > _MAX_KEYS:
+                self._bookings.popitem(last=False)
+        return booking
+
+    def booking(self, key: Optional[str]) -> Optional[asyncio.Future]:
+        """The running or successful booking of key."""
+        booking = self._bookings.get(key) if key else None
+        if booking is not None and booking.done() and booking.result() is None:
+            return None
+        return booking
+
+    def _forget_failed(self, key: str, booking: asyncio.Future):
+        if booking.result() is None and self._bookings.get(key) is booking:
+            del self._bookings[key]
+
+
+def create_app(inventory: Optional[FakeInventory] = None) -> Starlette:
+    inventory = inventory or FakeInventory()
+
+    def booking_route(kind: str, fields: tuple[str, str], message: str):
+        async def make_booking(args: dict) -> Optional[dict]:
+            if inventory.latency_ms:
+                await asyncio.sleep(inventory.latency_ms / 1000)
+            if inventory.should_fail():
+                inventory.counts["failures"] += 1
+                return None
+            inventory.counts[kind] += 1
+            return {"status": "success", "message": message.format(**args)}
+
+        async def book(request: Request) -> Response:
+            try:
+                body = await request.json()
+                args = {field: body[field] for field in fields}
+            except (ValueError, KeyError, TypeError):
+                return JSONResponse({"status": "error", "message": f"Expected JSON with {', '.join(fields)}."}, status_code=400)
+            key = request.headers.get("Idempotency-Key")
+            while (booking := inventory.booking(key)) is not None:
+                # A retry waits for the original, and books itself only if the original failed
+                result = await asyncio.shield(booking)
+                if result is not None:
+                    inventory.counts["duplicates"] += 1
+                    return JSONResponse(result)
+            booking = inventory.reserve(key, asyncio.ensure_future(make_booking(args)))
+            # Shielded, the booking completes even when this request is cancelled
+            result = await asyncio.shield(booking)
+            if result is None:
+                return JSONResponse({"status": "error", "message": "Inventory temporarily unavailable."}, status_code=503)
+            return JSONResponse(result)
+        return book
+
+    async def stats(request: Request) -> Response:
+        return JSONResponse(dict(inventory.counts))
+
+    app = Starlette(routes=[
+        Route("/flights", booking_route("flights", ("from_airport", "to_airport"), "Flight booked from {from_airport} to {to_airport}."), methods=["POST"]),
+        Route("/hotels", booking_route("hotels", ("hotel_name", "city"), "Successfully booked a stay at {hotel_name} in {city}."), methods=["POST"]),
+        Route("/stats", stats, methods=["GET"]),
+    ])
+    app.state.inventory = inventory
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake flight and hotel inventory service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency-ms", type=float, default=FAKE_BOOKING_LATENCY_MS)
+    parser.add_argument("--failure-rate", type=float, default=FAKE_BOOKING_FAILURE_RATE)
+    args = parser.parse_args()
+    uvicorn.run(create_app(FakeInventory(args.latency_ms, args.failure_rate)), host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,159 @@
+"""Deterministic offline stand-in for Gemini, used for load tests and benchmarks.
+
+Any model name matching ``fake-.*`` resolves to FakeTravelLlm once this module is imported,
+so the whole pipeline runs without network access:
+
+    GOOGLE_GENAI_MODEL=fake-travel python adk_travel_agent.py
+
+The fake reads the user's request, calls adk_book_flight / adk_book_hotel with arguments parsed
+from it, confirms the tool result and summarizes every booking it finds in the context.
+FAKE_LLM_LATENCY_MS adds a fixed delay to every call to stand in for the model round-trip, and
+FAKE_LLM_MS_PER_1K_PROMPT_TOKENS a delay that grows with the prompt.
+"""
+import ast
+import asyncio
+import os
+import re
+from typing import AsyncGenerator, Optional
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.models.registry import LLMRegistry
+from google.genai import types
+
+FAKE_LLM_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", "0"))
+# Extra delay per 1000 prompt tokens, so longer prompts take longer like a real model's prefill
+FAKE_LLM_MS_PER_1K_PROMPT_TOKENS = float(os.getenv("FAKE_LLM_MS_PER_1K_PROMPT_TOKENS", "0"))
+
+_NAME = r"[\w'&-]+(?: [\w'&-]+)*?"
+_END = r"(?=\s+(?:for|on|from|next|tomorrow|and|but|starting)\b|\s*[,.;!?]|$)"
+_FLIGHT = re.compile(rf"flight from (?P<from_airport>{_NAME}) to (?P<to_airport>{_NAME}){_END}", re.I)
+_HOTEL_PATTERNS = [
+    re.compile(rf"(?:room|stay|suite) at (?:the )?(?P<hotel_name>{_NAME}) (?:at|in) (?P<city>{_NAME}){_END}", re.I),
+    re.compile(rf"(?:an? |the )(?P<hotel_name>[A-Z][\w'&-]*(?: [A-Z][\w'&-]*)*) hotel (?:at|in) (?P<city>{_NAME}){_END}"),
+    re.compile(rf"hotel(?: room)? (?:at|in) (?P<city>{_NAME}){_END}", re.I),
+]
+_TOOL_RESULT = re.compile(r"`(?P<tool>adk_book_\w+)` tool returned result: (?P<result>\{.*\})", re.S)
+_CONTEXT_PREFIX = "For context:"
+# Hilton is the primary option in the hotel agent's instruction when the user names no hotel
+_DEFAULT_HOTEL = "Hilton"
+
+
+def parse_flights(text: str) -> list[dict]:
+    """Returns adk_book_flight arguments for every "flight from X to Y" in the request."""
+    return [match.groupdict() for match in _FLIGHT.finditer(text)]
+
+
+def parse_hotels(text: str) -> list[dict]:
+    """Returns adk_book_hotel arguments for the first hotel stay found in the request."""
+    for pattern in _HOTEL_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            args = match.groupdict()
+            return [{"hotel_name": args.get("hotel_name") or _DEFAULT_HOTEL, "city": args["city"]}]
+    return []
+
+
+def _text(content: types.Content) -> str:
+    return "".join(part.text for part in content.parts or [] if part.text)
+
+
+def _user_request(llm_request: LlmRequest) -> str:
+    """The latest user message that isn't another agent's output replayed as context."""
+    for content in reversed(llm_request.contents):
+        text = _text(content)
+        if content.role == "user" and text and not text.startswith(_CONTEXT_PREFIX):
+            return text
+    return ""
+
+
+def _tool_results(llm_request: LlmRequest) -> list[dict]:
+    """Tool results visible to the agent, either as function responses or as replayed context."""
+    results = []
+    for content in llm_request.contents:
+        for part in content.parts or []:
+            if part.function_response and part.function_response.response:
+                results.append(part.function_response.response)
+            elif part.text:
+                match = _TOOL_RESULT.search(part.text)
+                if match:
+                    try:
+                        results.append(ast.literal_eval(match.group("result")))
+                    except (ValueError, SyntaxError):
+                        pass
+    return [result for result in results if isinstance(result, dict)]
+
+
+def _prompt_text(llm_request: LlmRequest) -> str:
+    """Everything the model would read: the instruction, texts, function calls and function responses."""
+    texts = [str(llm_request.config.system_instruction or "")]
+    for content in llm_request.contents:
+        for part in content.parts or []:
+            if part.text:
+                texts.append(part.text)
+            elif part.function_call:
+                texts.append(f"{part.function_call.name}({part.function_call.args})")
+            elif part.function_response:
+                texts.append(f"{part.function_response.name} -> {part.function_response.response}")
+    return "".join(texts)
+
+
+def _count_tokens(text: str) -> int:
+    # Roughly four characters per token, close enough for relative comparisons
+    return max(1, len(text) // 4)
+
+
+class FakeTravelLlm(BaseLlm):
+    """Scripted model that books what the user asked for and summarizes the tool results."""
+    model: str = "fake-travel"
+    latency_ms: float = FAKE_LLM_LATENCY_MS
+    ms_per_1k_prompt_tokens: float = FAKE_LLM_MS_PER_1K_PROMPT_TOKENS
+
+    @classmethod
+    def supported_models(cls) -> list[str]:
+        return [r"fake-.*"]
+
+    def respond(self, llm_request: LlmRequest) -> types.Content:
+        """Builds the model turn for the request without any delay."""
+        last = llm_request.contents[-1] if llm_request.contents else None
+        answered = [part.function_response.response for part in (last.parts or []) if part.function_response] if last else []
+        if answered:
+            return self._reply(" ".join(str(result.get("message", result)) for result in answered))
+
+        request = _user_request(llm_request)
+        if "adk_book_flight" in llm_request.tools_dict:
+            return self._call("adk_book_flight", parse_flights(request)) or self._reply("No flight booking was requested.")
+        if "adk_book_hotel" in llm_request.tools_dict:
+            return self._call("adk_book_hotel", parse_hotels(request)) or self._reply("No hotel booking was requested.")
+
+        messages = [result["message"] for result in _tool_results(llm_request) if result.get("message")]
+        return self._reply(" ".join(messages) if messages else "No bookings were made.")
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        prompt_tokens = _count_tokens(_prompt_text(llm_request))
+        latency_ms = self.latency_ms + prompt_tokens * self.ms_per_1k_prompt_tokens / 1000
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        content = self.respond(llm_request)
+        usage = types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=_count_tokens(_text(content) or str(content.parts[0].function_call)),
+        )
+        usage.total_token_count = usage.prompt_token_count + usage.candidates_token_count
+        text = _text(content)
+        if stream and text:
+            for word in re.findall(r"\S+\s*", text):
+                yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=word)]), partial=True)
+        yield LlmResponse(content=content, usage_metadata=usage, turn_complete=True)
+
+    @staticmethod
+    def _call(tool_name: str, calls: list[dict]) -> Optional[types.Content]:
+        if not calls:
+            return None
+        return types.Content(role="model", parts=[types.Part(function_call=types.FunctionCall(name=tool_name, args=args)) for args in calls])
+
+    @staticmethod
+    def _reply(text: str) -> types.Content:
+        return types.Content(role="model", parts=[types.Part(text=text)])
+
+
+LLMRegistry.register(FakeTravelLlm)
@@ -0,0 +1,123 @@
+"""Record and replay of model responses, so test suites run without network.
+
+ModelCassette plugs into an LlmAgent's before/after model callbacks, like ResponseCache, and keys
+requests the same way (response_cache.cache_key). In "record" mode every model response is appended
+to an NDJSON cassette file as it arrives, so a live run of a test suite captures all of them. In
+"replay" mode the recorded responses answer before_model_callback and the model is never called. A
+request that isn't in the cassette raises CassetteMissError rather than reaching the network, so a
+stale cassette fails loudly. A request recorded several times replays its responses in recorded order,
+then starts over.
+
+    ADK_CASSETTE=tests/cassettes/travel.ndjson ADK_CASSETTE_MODE=record python -m pytest tests/test_adk_travel_agent.py
+    ADK_CASSETTE=tests/cassettes/travel.ndjson python -m pytest tests/test_adk_travel_agent.py
+"""
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+
+from response_cache import PendingModelCalls, _strip_function_call_ids, cache_key
+
+CASSETTE_MODES = ("record", "replay", "off")
+
+
+class CassetteMissError(LookupError):
+    """A replayed request has no recorded response."""
+
+
+@dataclass
+class CassetteMetrics:
+    replayed: int = 0
+    recorded: int = 0
+    misses: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class ModelCassette:
+    """Records model responses to a cassette file or replays them from it.
+
+    Args:
+        path (str): NDJSON cassette file, one {"key", "agent", "response"} object per model response.
+        mode (str): "record" starts a new cassette and appends every response, "replay" serves the
+            recorded responses and never calls the model.
+    """
+
+    def __init__(self, path: str, mode: str = "replay"):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode {mode!r}, expected 'record' or 'replay'.")
+        self.path = Path(path)
+        self.mode = mode
+        self.metrics = CassetteMetrics()
+        self._lock = threading.Lock()
+        self._responses: dict[str, list[dict]] = defaultdict(list)
+        self._replay_counts: dict[str, int] = defaultdict(int)
+        # Keys of model calls in flight, so after_model_callback can record what before_model_callback saw
+        self._pending = PendingModelCalls()
+        if mode == "replay":
+            self._load()
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text("")
+
+    def _load(self):
+        with open(self.path, encoding="utf-8") as lines:
+            for line in lines:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._responses[entry["key"]].append(entry["response"])
+
+    async def before_model_callback(self, callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+        key = cache_key(callback_context.agent_name, llm_request)
+        if self.mode == "record":
+            self._pending.add(callback_context, key)
+            return None
+        responses = self._responses.get(key)
+        if not responses:
+            self.metrics.misses += 1
+            raise CassetteMissError(f"No recorded response of {callback_context.agent_name} for request {key[:12]} "
+                                    f"in {self.path}, record the cassette again with ADK_CASSETTE_MODE=record.")
+        with self._lock:
+            index = self._replay_counts[key] % len(responses)
+            self._replay_counts[key] += 1
+        self.metrics.replayed += 1
+        return LlmResponse.model_validate(responses[index])
+
+    async def after_model_callback(self, callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
+        if llm_response.partial:
+            return None
+        key = self._pending.pop(callback_context)
+        if key is None or llm_response.error_code or not llm_response.content:
+            return None
+        response = json.loads(_strip_function_call_ids(llm_response).model_dump_json(exclude_none=True))
+        entry = {"key": key, "agent": callback_context.agent_name, "response": response}
+        await asyncio.to_thread(self._append, entry)
+        return None
+
+    def on_model_error_callback(self, callback_context: CallbackContext, llm_request: LlmRequest, error: Exception) -> Optional[LlmResponse]:
+        self._pending.pop(callback_context)
+        return None
+
+    def _append(self, entry: dict):
+        # Keep the recorded key order, ADK renders function call args into later agents' context as they are
+        line = json.dumps(entry) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as cassette:
+                cassette.write(line)
+            self._responses[entry["key"]].append(entry["response"])
+            self.metrics.recorded += 1
+
+    def callbacks(self) -> dict[str, Any]:
+        """Keyword arguments that plug the cassette into an LlmAgent."""
+        return {"before_model_callback": self.before_model_callback, "after_model_callback": self.after_model_callback,
+                "on_model_error_callback": self.on_model_error_callback}
+
+    def stats(self) -> dict:
+        return {**self.metrics.as_dict(), "responses": sum(len(responses) for responses in self._responses.values())}
@@ -0,0 +1,253 @@
+"""Latency, LLM call, token and error metrics per stage of the booking pipeline.
+
+PipelineMetrics plugs into the agent, model and tool callbacks of every agent and records into a
+MetricsRegistry of labeled counters and histograms:
+
+    adk_pipeline_turn_seconds{}                  run_turn end to end
+    adk_pipeline_turn_errors_total{}             turns that raised
+    adk_pipeline_agent_seconds{agent}            each agent's run, including its model and tool calls
+    adk_pipeline_llm_calls_total{agent}          model calls that reached the model
+    adk_pipeline_llm_seconds{agent}              model call latency
+    adk_pipeline_llm_input_tokens_total{agent}   prompt tokens
+    adk_pipeline_llm_output_tokens_total{agent}  output and thinking tokens
+    adk_pipeline_tool_seconds{agent,tool}        tool call latency, including idempotent replays
+    adk_pipeline_errors_total{agent,stage}       failed model calls (stage="model") and tool calls
+                                                 that raised or returned {"status": "error"} (stage="tool")
+
+render_prometheus() is the Prometheus text format served by the HTTP server's /metrics, and
+summary() is a table of the same numbers for the command line. Agents skipped by the request
+router or answered by the response cache record no latency or model call.
+"""
+import bisect
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.adk.tools import BaseTool, ToolContext
+from google.genai import types
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Starts of agent runs and calls that never finished, e.g. in a turn that raised, are dropped beyond this
+_MAX_STARTED = 4096
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count of observed values, as in a Prometheus histogram."""
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # The last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimate interpolated within the bucket holding the q-th value, like histogram_quantile."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                if index == len(self.buckets):
+                    return lower  # Beyond the largest bucket only its lower bound is known
+                return lower + (self.buckets[index] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+
+def _format_labels(labels: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in labels] + ([extra] if extra else [])
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class MetricsRegistry:
+    """Labeled counters and histograms, safe to update from several threads."""
+
+    def __init__(self):
+        self.counters: dict[str, dict[Labels, float]] = {}
+        self.histograms: dict[str, dict[Labels, Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, amount: float = 1, **labels: str):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels: str):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    def counter(self, name: str, **labels: str) -> float:
+        return self.counters.get(name, {}).get(tuple(sorted(labels.items())), 0)
+
+    def histogram(self, name: str, **labels: str) -> Optional[Histogram]:
+        return self.histograms.get(name, {}).get(tuple(sorted(labels.items())))
+
+    def render_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            for name, series in sorted(self.counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                lines += [f"{name}{_format_labels(labels)} {value:g}" for labels, value in sorted(series.items())]
+            for name, series in sorted(self.histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for labels, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip([*histogram.buckets, "+Inf"], histogram.counts):
+                        cumulative += count
+                        bucket_labels = _format_labels(labels, 'le="%s"' % bound)
+                        lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum:.6f}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+class PipelineMetrics:
+    """Records the pipeline's metrics into a registry from agent, model and tool callbacks.
+
+    Args:
+        registry (MetricsRegistry): where to record, a new registry when None.
+        clock: monotonic time source, injectable for tests.
+    """
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None, clock: Callable[[], float] = time.perf_counter):
+        self.registry = registry or MetricsRegistry()
+        self._clock = clock
+        self._started: "OrderedDict[tuple, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _start(self, key: tuple):
+        with self._lock:
+            self._started[key] = self._clock()
+            while len(self._started) > _MAX_STARTED:
+                self._started.popitem(last=False)
+
+    def _elapsed(self, key: tuple) -> Optional[float]:
+        with self._lock:
+            started = self._started.pop(key, None)
+        return self._clock() - started if started is not None else None
+
+    @contextmanager
+    def turn(self) -> Iterator[None]:
+        """Times one turn and counts it as an error when it raises."""
+        started = self._clock()
+        try:
+            yield
+        except Exception:
+            self.registry.inc("adk_pipeline_turn_errors_total")
+            raise
+        finally:
+            self.registry.observe("adk_pipeline_turn_seconds", self._clock() - started)
+
+    def before_agent_callback(self, callback_context: CallbackContext) -> Optional[types.Content]:
+        self._start(("agent", callback_context.invocation_id, callback_context.agent_name))
+        return None
+
+    def after_agent_callback(self, callback_context: CallbackContext) -> Optional[types.Content]:
+        elapsed = self._elapsed(("agent", callback_context.invocation_id, callback_context.agent_name))
+        if elapsed is not None:
+            self.registry.observe("adk_pipeline_agent_seconds", elapsed, agent=callback_context.agent_name)
+        return None
+
+    def before_model_callback(self, callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+        self._start(("model", callback_context.invocation_id, callback_context.agent_name))
+        return None
+
+    def after_model_callback(self, callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
+        if llm_response.partial:
+            return None
+        agent_name = callback_context.agent_name
+        elapsed = self._elapsed(("model", callback_context.invocation_id, agent_name))
+        self.registry.inc("adk_pipeline_llm_calls_total", agent=agent_name)
+        if elapsed is not None:
+            self.registry.observe("adk_pipeline_llm_seconds", elapsed, agent=agent_name)
+        usage = llm_response.usage_metadata
+        if usage:
+            self.registry.inc("adk_pipeline_llm_input_tokens_total", usage.prompt_token_count or 0, agent=agent_name)
+            self.registry.inc("adk_pipeline_llm_output_tokens_total",
+                              (usage.candidates_token_count or 0) + (usage.thoughts_token_count or 0), agent=agent_name)
+        if llm_response.error_code:
+            self.registry.inc("adk_pipeline_errors_total", agent=agent_name, stage="model")
+        return None
+
+    def on_model_error_callback(self, callback_context: CallbackContext, llm_request: LlmRequest, error: Exception) -> Optional[LlmResponse]:
+        agent_name = callback_context.agent_name
+        elapsed = self._elapsed(("model", callback_context.invocation_id, agent_name))
+        self.registry.inc("adk_pipeline_llm_calls_total", agent=agent_name)
+        if elapsed is not None:
+            self.registry.observe("adk_pipeline_llm_seconds", elapsed, agent=agent_name)
+        self.registry.inc("adk_pipeline_errors_total", agent=agent_name, stage="model")
+        return None
+
+    def before_tool_callback(self, tool: BaseTool, args: dict, tool_context: ToolContext) -> Optional[dict]:
+        self._start(("tool", tool_context.invocation_id, tool_context.function_call_id))
+        return None
+
+    def after_tool_callback(self, tool: BaseTool, args: dict, tool_context: ToolContext, tool_response: Any) -> Optional[dict]:
+        self._record_tool(tool, tool_context, failed=isinstance(tool_response, dict) and tool_response.get("status") == "error")
+        return None
+
+    def on_tool_error_callback(self, tool: BaseTool, args: dict, tool_context: ToolContext, error: Exception) -> Optional[dict]:
+        self._record_tool(tool, tool_context, failed=True)
+        return None
+
+    def _record_tool(self, tool: BaseTool, tool_context: ToolContext, failed: bool):
+        elapsed = self._elapsed(("tool", tool_context.invocation_id, tool_context.function_call_id))
+        if elapsed is not None:
+            self.registry.observe("adk_pipeline_tool_seconds", elapsed, agent=tool_context.agent_name, tool=tool.name)
+        if failed:
+            self.registry.inc("adk_pipeline_errors_total", agent=tool_context.agent_name, stage="tool")
+
+    def agent_callbacks(self) -> dict[str, Any]:
+        """Keyword arguments that time any agent, including the supervisor and the fan-out agent."""
+        return {"before_agent_callback": self.before_agent_callback, "after_agent_callback": self.after_agent_callback}
+
+    def model_callbacks(self) -> dict[str, Any]:
+        """Keyword arguments that plug the metrics into an LlmAgent's model calls."""
+        return {"before_model_callback": self.before_model_callback, "after_model_callback": self.after_model_callback,
+                "on_model_error_callback": self.on_model_error_callback}
+
+    def tool_callbacks(self) -> dict[str, Any]:
+        """Keyword arguments that plug the metrics into an LlmAgent's tool calls."""
+        return {"before_tool_callback": self.before_tool_callback, "after_tool_callback": self.after_tool_callback,
+                "on_tool_error_callback": self.on_tool_error_callback}
+
+    def render_prometheus(self) -> str:
+        return self.registry.render_prometheus()
+
+    def summary(self) -> str:
+        """Latency percentiles, model calls, tokens and errors per agent as a text table."""
+        registry = self.registry
+        agents = sorted({dict(labels)["agent"] for name in ("adk_pipeline_agent_seconds", "adk_pipeline_llm_seconds")
+                         for labels in registry.histograms.get(name, {})})
+        lines = [f"{'stage':<28}{'runs':>7}{'p50 ms':>9}{'p95 ms':>9}{'llm calls':>11}{'in tok':>9}{'out tok':>9}{'errors':>8}"]
+        turns = registry.histogram("adk_pipeline_turn_seconds")
+        if turns:
+            lines.append(f"{'turn':<28}{turns.count:>7}{turns.quantile(0.5) * 1000:>9.1f}{turns.quantile(0.95) * 1000:>9.1f}"
+                         f"{'':>11}{'':>9}{'':>9}{registry.counter('adk_pipeline_turn_errors_total'):>8g}")
+        for agent_name in agents:
+            runs = registry.histogram("adk_pipeline_agent_seconds", agent=agent_name) or Histogram()
+            errors = sum(registry.counter("adk_pipeline_errors_total", agent=agent_name, stage=stage) for stage in ("model", "tool"))
+            lines.append(f"{agent_name:<28}{runs.count:>7}{runs.quantile(0.5) * 1000:>9.1f}{runs.quantile(0.95) * 1000:>9.1f}"
+                         f"{registry.counter('adk_pipeline_llm_calls_total', agent=agent_name):>11g}"
+                         f"{registry.counter('adk_pipeline_llm_input_tokens_total', agent=agent_name):>9g}"
+                         f"{registry.counter('adk_pipeline_llm_output_tokens_total', agent=agent_name):>9g}{errors:>8g}")
+        return "\n".join(lines)
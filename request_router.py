@@ -0,0 +1,60 @@
+"""Rule-based pre-routing that skips the booking agents a request doesn't need.
+
+RequestRouter plugs into the booking agents' before_agent_callback. It matches the user's message
+of the current turn against evidence rules per agent, which costs microseconds instead of a model
+call. An agent is skipped only when the request has no evidence for it and some for another routed
+agent: "Book a flight from San Jose to Seattle" skips the hotel agent. The callback then answers for
+the agent with the reply it would give ("No hotel booking was requested.") and the agent's model is
+never called. Negations are not interpreted, any mention counts as evidence, so "no hotel needed" or
+"no room upgrade" runs the hotel agent too, and a request without evidence for any agent, like "Plan
+my trip to Boston", runs every agent.
+"""
+import re
+from collections import Counter
+from typing import Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.genai import types
+
+FLIGHT_RULE = re.compile(r"\b(?:flights?|fly|flying|plane|airfares?|airlines?|airports?|tickets?|round[- ]trip|one[- ]way|"
+                         r"layovers?|non-?stop)\b", re.I)
+HOTEL_RULE = re.compile(r"\b(?:hotels?|stays?|rooms?|suites?|accommodations?|lodging|resorts?|inns?|motels?|hostels?|"
+                        r"nights?|check[- ]?(?:in|out)|place to stay|hilton|hyatt|marriott|ritz|sheraton|westin|"
+                        r"radisson|four seasons)\b", re.I)
+
+
+class RequestRouter:
+    """Decides per turn which booking agents run.
+
+    Args:
+        rules (dict): regex per agent name that matches evidence the request needs the agent.
+        skip_replies (dict): reply per agent name used when the agent is skipped.
+    """
+
+    def __init__(self, rules: Optional[dict[str, re.Pattern]] = None, skip_replies: Optional[dict[str, str]] = None):
+        self.rules = rules or {"adk_flight_booking_agent": FLIGHT_RULE, "adk_hotel_booking_agent": HOTEL_RULE}
+        self.skip_replies = skip_replies or {"adk_flight_booking_agent": "No flight booking was requested.",
+                                             "adk_hotel_booking_agent": "No hotel booking was requested."}
+        self.ran = Counter()
+        self.skipped = Counter()
+
+    def route(self, text: str) -> set[str]:
+        """Names of the routed agents the request has evidence for, every routed agent when it has none."""
+        needed = {agent_name for agent_name, rule in self.rules.items() if rule.search(text)}
+        return needed or set(self.rules)
+
+    def before_agent_callback(self, callback_context: CallbackContext) -> Optional[types.Content]:
+        agent_name = callback_context.agent_name
+        if agent_name not in self.rules:
+            return None
+        user_content = callback_context.user_content
+        text = "".join(part.text for part in (user_content.parts if user_content else None) or [] if part.text)
+        if agent_name in self.route(text):
+            self.ran[agent_name] += 1
+            return None
+        self.skipped[agent_name] += 1
+        return types.Content(role="model", parts=[types.Part(text=self.skip_replies.get(agent_name, "Not needed for this request."))])
+
+    def stats(self) -> dict:
+        return {**{f"ran_{name}": count for name, count in sorted(self.ran.items())},
+                **{f"skipped_{name}": count for name, count in sorted(self.skipped.items())}}
@@ -0,0 +1,244 @@
+"""Opt-in cache of model responses for repeated trip requests.
+
+ResponseCache plugs into an LlmAgent's before/after model callbacks. The key covers the agent name,
+model, system instruction, the generate_content_config and the conversation contents. Whitespace
+and case are normalized and function call IDs are dropped, so near-identical prompts share an entry.
+A hit returns the stored response from before_model_callback and skips the model call entirely.
+A cached function call is still executed by ADK, so tool side effects run on every request.
+
+Entries live in an in-memory LRU and, when disk_dir is set, in one JSON file per key, shared by every
+process using the same directory.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+# Request config fields that don't change what the model answers
+_IGNORED_CONFIG_FIELDS = {"system_instruction", "labels", "http_options"}
+
+
+@dataclass
+class ResponseCacheMetrics:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    expired: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    def as_dict(self) -> dict:
+        return {**asdict(self), "hits": self.hits}
+
+
+def _normalize_text(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+
+def _normalize_contents(contents) -> list:
+    normalized = []
+    for content in contents:
+        parts = []
+        for part in content.parts or []:
+            if part.text is not None:
+                parts.append({"text": _normalize_text(part.text)})
+            elif part.function_call:
+                parts.append({"function_call": {"name": part.function_call.name, "args": part.function_call.args}})
+            elif part.function_response:
+                parts.append({"function_response": {"name": part.function_response.name,
+                                                    "response": part.function_response.response}})
+            else:
+                parts.append(part.model_dump(mode="json", exclude_none=True))
+        normalized.append({"role": content.role, "parts": parts})
+    return normalized
+
+
+def cache_key(agent_name: str, llm_request: LlmRequest) -> str:
+    config = llm_request.config.model_dump(mode="json", exclude_none=True, exclude=_IGNORED_CONFIG_FIELDS) \
+        if llm_request.config else {}
+    instruction = llm_request.config.system_instruction if llm_request.config else None
+    payload = {
+        "agent": agent_name,
+        "model": llm_request.model,
+        "instruction": _normalize_text(str(instruction or "")),
+        "config": config,
+        "contents": _normalize_contents(llm_request.contents),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _strip_function_call_ids(response: LlmResponse) -> LlmResponse:
+    response = response.model_copy(deep=True, update={"usage_metadata": None})
+    for part in (response.content.parts if response.content else None) or []:
+        if part.function_call:
+            part.function_call.id = None
+    return response
+
+
+class PendingModelCalls:
+    """Keys of model calls in flight, so an after model callback can handle what the before callback noted.
+
+    A cancelled model call runs neither after callback, so each entry is also dropped once the task that
+    noted it ends. The entry's done callback is removed again when the call finishes, so a long-lived task
+    running many turns doesn't accumulate them.
+    """
+
+    def __init__(self):
+        self._entries: dict[tuple[str, str], tuple[str, asyncio.Task, Callable]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, callback_context: CallbackContext, key: str):
+        call = (callback_context.invocation_id, callback_context.agent_name)
+        self._release(self._entries.pop(call, None))
+        task = asyncio.current_task()
+        entry = (key, task, lambda _: self._abandon(call, entry))
+        task.add_done_callback(entry[2])
+        self._entries[call] = entry
+
+    def pop(self, callback_context: CallbackContext) -> Optional[str]:
+        entry = self._entries.pop((callback_context.invocation_id, callback_context.agent_name), None)
+        self._release(entry)
+        return entry[0] if entry else None
+
+    @staticmethod
+    def _release(entry: Optional[tuple[str, asyncio.Task, Callable]]):
+        if entry is not None:
+            entry[1].remove_done_callback(entry[2])
+
+    def _abandon(self, call: tuple[str, str], entry: tuple[str, asyncio.Task, Callable]):
+        if self._entries.get(call) is entry:
+            del self._entries[call]
+
+
+class ResponseCache:
+    """LRU cache of model responses with an optional on-disk tier.
+
+    Args:
+        max_entries (int): responses kept in memory.
+        ttl_seconds (float): lifetime of an entry in both tiers, 0 keeps entries until evicted.
+        disk_dir (str): directory for the on-disk tier, None to keep responses in memory only.
+        clock: wall clock time source, injectable for tests.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600, disk_dir: Optional[str] = None,
+                 clock: Callable[[], float] = time.time):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = disk_dir
+        self.metrics = ResponseCacheMetrics()
+        self._clock = clock
+        self._memory: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+        # Keys of model calls in flight, so after_model_callback can store what before_model_callback missed
+        self._pending = PendingModelCalls()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    async def before_model_callback(self, callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+        key = cache_key(callback_context.agent_name, llm_request)
+        cached = self._get_memory(key)
+        if cached is not None:
+            self.metrics.memory_hits += 1
+        elif self.disk_dir:
+            cached = await asyncio.to_thread(self._get_disk, key)
+            if cached is not None:
+                self.metrics.disk_hits += 1
+                self._put_memory(key, *cached)
+        if cached is not None:
+            return LlmResponse.model_validate_json(cached[1])
+        self.metrics.misses += 1
+        self._pending.add(callback_context, key)
+        return None
+
+    async def after_model_callback(self, callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
+        if llm_response.partial:
+            return None
+        key = self._pending.pop(callback_context)
+        if key is None or llm_response.error_code or not llm_response.content:
+            return None
+        expires_at = self._clock() + self.ttl_seconds if self.ttl_seconds else float("inf")
+        value = _strip_function_call_ids(llm_response).model_dump_json(exclude_none=True)
+        self._put_memory(key, expires_at, value)
+        if self.disk_dir:
+            await asyncio.to_thread(self._put_disk, key, expires_at, value)
+        self.metrics.stores += 1
+        return None
+
+    def on_model_error_callback(self, callback_context: CallbackContext, llm_request: LlmRequest, error: Exception) -> Optional[LlmResponse]:
+        self._pending.pop(callback_context)
+        return None
+
+    def callbacks(self) -> dict[str, Any]:
+        """Keyword arguments that plug the cache into an LlmAgent."""
+        return {"before_model_callback": self.before_model_callback, "after_model_callback": self.after_model_callback,
+                "on_model_error_callback": self.on_model_error_callback}
+
+    def stats(self) -> dict:
+        return {**self.metrics.as_dict(), "memory_entries": len(self._memory)}
+
+    def clear(self):
+        self._memory.clear()
+        if self.disk_dir:
+            for name in os.listdir(self.disk_dir):
+                if name.endswith(".json"):
+                    os.remove(os.path.join(self.disk_dir, name))
+
+    def _get_memory(self, key: str) -> Optional[tuple[float, str]]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= self._clock():
+            del self._memory[key]
+            self.metrics.expired += 1
+            return None
+        self._memory.move_to_end(key)
+        return entry
+
+    def _put_memory(self, key: str, expires_at: float, value: str):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _get_disk(self, key: str) -> Optional[tuple[float, str]]:
+        try:
+            with open(self._disk_path(key), encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable response cache entry %s: %s", key, e)
+            return None
+        expires_at = entry["expires_at"] if entry["expires_at"] is not None else float("inf")
+        if expires_at <= self._clock():
+            self.metrics.expired += 1
+            return None
+        return expires_at, entry["response"]
+
+    def _put_disk(self, key: str, expires_at: float, value: str):
+        entry = {"expires_at": expires_at if expires_at != float("inf") else None, "response": value}
+        # Write to a temporary file and rename, so concurrent readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, self._disk_path(key))
@@ -0,0 +1,234 @@
+"""Long-lived HTTP front end for the travel booking agent.
+
+Module import, telemetry setup and agent construction happen once per process, in create_app.
+Every request then runs on the shared runner of that TravelApp.
+
+    POST /book          {"prompt": "...", "session_id": optional} -> {"session_id", "response", "latency_ms"}
+    POST /book/stream   same body, streams progress events as JSON lines (see stream_agent)
+    GET  /healthz       200 while serving, 503 while draining
+    GET  /metrics       Prometheus text format
+
+At most ADK_SERVER_MAX_IN_FLIGHT turns run at once; requests beyond that get 429 with Retry-After
+instead of queueing. On SIGTERM/SIGINT the server stops taking new turns (503) and waits up to
+ADK_SERVER_DRAIN_SECONDS for in-flight turns to finish before exiting.
+
+    python server.py --host 0.0.0.0 --port 8080
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import Optional
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+import adk_travel_agent as travel_agent
+
+logger = logging.getLogger(__name__)
+
+ADK_SERVER_MAX_IN_FLIGHT = int(os.getenv("ADK_SERVER_MAX_IN_FLIGHT", "64"))
+ADK_SERVER_DRAIN_SECONDS = float(os.getenv("ADK_SERVER_DRAIN_SECONDS", "30"))
+# Idle keep-alive so clients reuse connections between bookings
+ADK_SERVER_KEEP_ALIVE_SECONDS = int(os.getenv("ADK_SERVER_KEEP_ALIVE_SECONDS", "75"))
+
+
+class ServerState:
+    """In-flight accounting, drain flag and request counters shared by the routes."""
+
+    def __init__(self, max_in_flight: int):
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.draining = False
+        self.requests = Counter()
+        self.latency_seconds_sum = 0.0
+        self.latency_count = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    def try_acquire(self) -> bool:
+        if self.draining or self.in_flight >= self.max_in_flight:
+            return False
+        self.in_flight += 1
+        self._idle.clear()
+        return True
+
+    def release(self, started: float):
+        self.in_flight -= 1
+        self.latency_seconds_sum += time.perf_counter() - started
+        self.latency_count += 1
+        if self.in_flight == 0:
+            self._idle.set()
+
+    async def drain(self, timeout: float) -> bool:
+        """Stops admitting turns and waits for the running ones, False if the timeout hit first."""
+        self.draining = True
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+async def _read_booking(request: Request) -> tuple[str, str]:
+    try:
+        body = await request.json()
+    except ValueError:
+        body = None
+    if not isinstance(body, dict) or not isinstance(body.get("prompt"), str) or not body["prompt"].strip():
+        raise ValueError("Request body must be a JSON object with a non-empty 'prompt'.")
+    return body["prompt"], body.get("session_id") or travel_agent.generate_session_id()
+
+
+def _rejected(state: ServerState, route: str) -> Response:
+    if state.draining:
+        state.requests[(route, 503)] += 1
+        return JSONResponse({"error": "Server is shutting down."}, status_code=503)
+    state.requests[(route, 429)] += 1
+    return JSONResponse({"error": "Too many bookings in flight, retry shortly."}, status_code=429, headers={"Retry-After": "1"})
+
+
+class _SlotStreamingResponse(StreamingResponse):
+    """Streams the body and releases the in-flight slot once the response ends, however it ends.
+
+    A client that disconnects before the body is iterated never runs the generator's finally, and
+    Starlette skips background tasks on a disconnect, so the slot is released here.
+    """
+
+    def __init__(self, content, release, **kwargs):
+        super().__init__(content, **kwargs)
+        self._release = release
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._release()
+
+
+def create_app(max_in_flight: int = ADK_SERVER_MAX_IN_FLIGHT, drain_seconds: float = ADK_SERVER_DRAIN_SECONDS,
+               travel_app: Optional[travel_agent.TravelApp] = None) -> Starlette:
+    """Builds the HTTP app, serving travel_app or the default app from adk_travel_agent.get_app()."""
+    state = ServerState(max_in_flight)
+    travel_app = travel_app or travel_agent.get_app()
+
+    async def book(request: Request) -> Response:
+        try:
+            prompt, session_id = await _read_booking(request)
+        except ValueError as e:
+            state.requests[("/book", 400)] += 1
+            return JSONResponse({"error": str(e)}, status_code=400)
+        if not state.try_acquire():
+            return _rejected(state, "/book")
+        started = time.perf_counter()
+        try:
+            response = await travel_agent.run_turn(prompt, session_id=session_id, app=travel_app)
+        except Exception as e:
+            logger.exception("Booking failed")
+            state.requests[("/book", 500)] += 1
+            return JSONResponse({"session_id": session_id, "error": f"{type(e).__name__}: {e}"}, status_code=500)
+        finally:
+            state.release(started)
+        state.requests[("/book", 200)] += 1
+        return JSONResponse({"session_id": session_id, "response": response,
+                             "latency_ms": round((time.perf_counter() - started) * 1000, 3)})
+
+    async def book_stream(request: Request) -> Response:
+        try:
+            prompt, session_id = await _read_booking(request)
+        except ValueError as e:
+            state.requests[("/book/stream", 400)] += 1
+            return JSONResponse({"error": str(e)}, status_code=400)
+        if not state.try_acquire():
+            return _rejected(state, "/book/stream")
+        started = time.perf_counter()
+        state.requests[("/book/stream", 200)] += 1
+
+        async def lines():
+            try:
+                async for progress in travel_agent.stream_agent(prompt, session_id=session_id, app=travel_app):
+                    yield json.dumps(progress.to_dict()) + "\n"
+            except Exception as e:
+                logger.exception("Streaming booking failed")
+                yield json.dumps({"type": "error", "error": f"{type(e).__name__}: {e}"}) + "\n"
+
+        # The in-flight slot is held until the stream ends or the client goes away
+        return _SlotStreamingResponse(lines(), lambda: state.release(started), media_type="application/x-ndjson",
+                                      headers={"X-Session-Id": session_id})
+
+    async def healthz(request: Request) -> Response:
+        status = "draining" if state.draining else "ok"
+        return JSONResponse({"status": status, "in_flight": state.in_flight}, status_code=503 if state.draining else 200)
+
+    async def metrics(request: Request) -> Response:
+        lines = [
+            "# TYPE adk_http_requests_total counter",
+            *(f'adk_http_requests_total{{route="{route}",status="{status}"}} {count}'
+              for (route, status), count in sorted(state.requests.items())),
+            "# TYPE adk_http_in_flight gauge",
+            f"adk_http_in_flight {state.in_flight}",
+            "# TYPE adk_http_max_in_flight gauge",
+            f"adk_http_max_in_flight {state.max_in_flight}",
+            "# TYPE adk_turn_latency_seconds summary",
+            f"adk_turn_latency_seconds_sum {state.latency_seconds_sum:.6f}",
+            f"adk_turn_latency_seconds_count {state.latency_count}",
+        ]
+        stores = {"session_store": travel_app.session_service, "response_cache": travel_app.response_cache,
+                  "booking_backend": travel_app.booking_backend, "tool_idempotency": travel_app.tool_idempotency,
+                  "token_usage": travel_app.token_usage, "router": travel_app.router,
+                  "summarizer": travel_app.summarizer, "telemetry": travel_agent.span_processor}
+        for prefix, store in stores.items():
+            if store is not None and hasattr(store, "stats"):
+                lines += [f"adk_{prefix}_{name} {value}" for name, value in store.stats().items()]
+        pipeline = travel_app.metrics.render_prometheus() if travel_app.metrics is not None else ""
+        return PlainTextResponse("\n".join(lines) + "\n" + pipeline, media_type="text/plain; version=0.0.4")
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette):
+        yield
+        if not await state.drain(drain_seconds):
+            logger.warning("Shutting down with %d bookings still in flight", state.in_flight)
+        await travel_app.close()
+        await travel_agent.flush_telemetry()
+
+    app = Starlette(routes=[
+        Route("/book", book, methods=["POST"]),
+        Route("/book/stream", book_stream, methods=["POST"]),
+        Route("/healthz", healthz, methods=["GET"]),
+        Route("/metrics", metrics, methods=["GET"]),
+    ], lifespan=lifespan)
+    app.state.server = state
+    return app
+
+
+class DrainingServer(uvicorn.Server):
+    """Flags the app as draining as soon as a shutdown signal arrives, before connections close."""
+
+    def __init__(self, config: uvicorn.Config, state: ServerState):
+        super().__init__(config)
+        self.app_state = state
+
+    def handle_exit(self, sig, frame):
+        self.app_state.draining = True
+        super().handle_exit(sig, frame)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="HTTP server for the travel booking agent.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-in-flight", type=int, default=ADK_SERVER_MAX_IN_FLIGHT)
+    args = parser.parse_args()
+
+    app = create_app(max_in_flight=args.max_in_flight)
+    config = uvicorn.Config(app, host=args.host, port=args.port, timeout_keep_alive=ADK_SERVER_KEEP_ALIVE_SECONDS,
+                            timeout_graceful_shutdown=int(ADK_SERVER_DRAIN_SECONDS), log_level="info")
+    asyncio.run(DrainingServer(config, app.state.server).serve())
@@ -0,0 +1,476 @@
+"""Session stores for long-running workers.
+
+InMemorySessionService keeps every session and its full event history forever. BoundedSessionService
+keeps the same interface and storage, and evicts sessions that have not been used for ttl_seconds.
+When max_sessions or max_bytes is exceeded, it evicts the least recently used sessions, so resident
+memory stays flat under sustained load.
+
+SqliteSessionService persists sessions in a local SQLite database, so they survive restarts and can
+be shared between worker processes.
+"""
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Optional
+
+from google.adk.errors.already_exists_error import AlreadyExistsError
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, InMemorySessionService, Session, State, _session_util
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+
+logger = logging.getLogger(__name__)
+
+SessionKey = tuple[str, str, str]
+
+
+@dataclass
+class SessionStoreMetrics:
+    resident_sessions: int = 0
+    resident_bytes: int = 0
+    evictions_lru: int = 0
+    evictions_ttl: int = 0
+    evictions_bytes: int = 0
+
+    @property
+    def evictions(self) -> int:
+        return self.evictions_lru + self.evictions_ttl + self.evictions_bytes
+
+    def as_dict(self) -> dict:
+        return {**asdict(self), "evictions": self.evictions}
+
+
+@dataclass
+class _Entry:
+    size: int
+    last_access: float
+
+
+def _event_size(event: Event) -> int:
+    # Serialized size is an estimate of the resident size, but it grows with it
+    return len(event.model_dump_json(exclude_none=True))
+
+
+class BoundedSessionService(InMemorySessionService):
+    """InMemorySessionService with LRU/TTL eviction and max-sessions/max-bytes caps.
+
+    Args:
+        max_sessions (int): sessions kept before the least recently used is evicted, 0 for no cap.
+        max_bytes (int): approximate serialized size of all sessions before LRU eviction, 0 for no cap.
+        ttl_seconds (float): idle time after which a session is evicted, 0 to keep idle sessions.
+        clock: monotonic time source, injectable for tests.
+    """
+
+    def __init__(self, max_sessions: int = 0, max_bytes: int = 0, ttl_seconds: float = 0,
+                 clock: Callable[[], float] = time.monotonic):
+        super().__init__()
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.metrics = SessionStoreMetrics()
+        self._clock = clock
+        # Least recently used first
+        self._entries: "OrderedDict[SessionKey, _Entry]" = OrderedDict()
+
+    async def create_session(self, *, app_name: str, user_id: str, state: Optional[dict[str, Any]] = None,
+                             session_id: Optional[str] = None) -> Session:
+        self._expire()
+        session = await super().create_session(app_name=app_name, user_id=user_id, state=state, session_id=session_id)
+        key = (app_name, user_id, session.id)
+        self._entries[key] = _Entry(size=len(session.model_dump_json(exclude_none=True)), last_access=self._clock())
+        self.metrics.resident_bytes += self._entries[key].size
+        self.metrics.resident_sessions = len(self._entries)
+        self._enforce_caps(keep=key)
+        return session
+
+    async def get_session(self, *, app_name: str, user_id: str, session_id: str,
+                          config: Optional[GetSessionConfig] = None) -> Optional[Session]:
+        self._expire()
+        key = (app_name, user_id, session_id)
+        if key in self._entries:
+            self._touch(key)
+        return await super().get_session(app_name=app_name, user_id=user_id, session_id=session_id, config=config)
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        await super().delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
+        self._forget((app_name, user_id, session_id))
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        event = await super().append_event(session=session, event=event)
+        key = (session.app_name, session.user_id, session.id)
+        entry = self._entries.get(key)
+        if entry is not None and not event.partial:
+            size = _event_size(event)
+            entry.size += size
+            self.metrics.resident_bytes += size
+            self._touch(key)
+            self._enforce_caps(keep=key)
+        return event
+
+    def stats(self) -> dict:
+        return self.metrics.as_dict()
+
+    def _touch(self, key: SessionKey):
+        self._entries[key].last_access = self._clock()
+        self._entries.move_to_end(key)
+
+    def _expire(self):
+        if not self.ttl_seconds:
+            return
+        deadline = self._clock() - self.ttl_seconds
+        # Entries are ordered by last access, so expired sessions are all at the front
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry.last_access > deadline:
+                break
+            self._evict(key, "ttl")
+
+    def _enforce_caps(self, keep: SessionKey):
+        """Evicts least recently used sessions until under the caps, never the session in use."""
+        while self.max_sessions and len(self._entries) > self.max_sessions:
+            if not self._evict_lru(keep, "lru"):
+                break
+        while self.max_bytes and self.metrics.resident_bytes > self.max_bytes:
+            if not self._evict_lru(keep, "bytes"):
+                break
+
+    def _evict_lru(self, keep: SessionKey, reason: str) -> bool:
+        for key in self._entries:
+            if key != keep:
+                self._evict(key, reason)
+                return True
+        return False
+
+    def _evict(self, key: SessionKey, reason: str):
+        app_name, user_id, session_id = key
+        user_sessions = self.sessions.get(app_name, {}).get(user_id, {})
+        user_sessions.pop(session_id, None)
+        # Drop the now empty per-user map too, otherwise one dict per user id would leak
+        if not user_sessions:
+            self.sessions.get(app_name, {}).pop(user_id, None)
+        self._forget(key)
+        setattr(self.metrics, f"evictions_{reason}", getattr(self.metrics, f"evictions_{reason}") + 1)
+        logger.debug("Evicted session %s (%s)", session_id, reason)
+
+    def _forget(self, key: SessionKey):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.metrics.resident_bytes -= entry.size
+        self.metrics.resident_sessions = len(self._entries)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    create_time REAL NOT NULL,
+    update_time REAL NOT NULL,
+    version INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (app_name, user_id, id)
+);
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    event TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_by_session ON events (app_name, user_id, session_id, seq);
+CREATE TABLE IF NOT EXISTS app_states (
+    app_name TEXT PRIMARY KEY,
+    state TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS user_states (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    PRIMARY KEY (app_name, user_id)
+);
+"""
+
+
+@dataclass
+class SqliteSessionMetrics:
+    cache_hits: int = 0
+    cache_misses: int = 0
+    transactions: int = 0
+    events_written: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class SqliteSessionService(BaseSessionService):
+    """Session service persisted in a local SQLite database in WAL mode.
+
+    Sessions survive restarts and can be shared by processes on the same host. Events appended
+    during one invocation are buffered and written in a single transaction. The buffer is flushed
+    when the next invocation starts, when max_batch_events is reached, or on flush()/close().
+    Callers that drive Runner directly should `await flush()` after each turn; run_turn does.
+    Reads are served from an in-process LRU cache of cache_size sessions. Every write bumps the
+    session's row version, and a cached session is reloaded when the version changed since it was
+    cached, i.e. another process has written to it. Event timestamps can't tell, another host's
+    clock may be behind.
+
+    Args:
+        db_path (str): SQLite database file, created if missing.
+        cache_size (int): sessions kept in the hot cache.
+        max_batch_events (int): buffered events per session that force a flush.
+    """
+
+    def __init__(self, db_path: str, cache_size: int = 1024, max_batch_events: int = 256):
+        self.db_path = db_path
+        self.cache_size = cache_size
+        self.max_batch_events = max_batch_events
+        self.metrics = SqliteSessionMetrics()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(_SCHEMA)
+        if "version" not in {row[1] for row in self._conn.execute("PRAGMA table_info(sessions)")}:
+            # Created before sessions had a row version
+            self._conn.execute("ALTER TABLE sessions ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        # One connection shared by the worker threads, so statements are serialized
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[SessionKey, Session]" = OrderedDict()
+        # Row version of each cached session, as of the last load or own write
+        self._versions: dict[SessionKey, int] = {}
+        self._pending: dict[SessionKey, list[Event]] = {}
+        self._app_state: dict[str, dict[str, Any]] = {}
+        self._user_state: dict[tuple[str, str], dict[str, Any]] = {}
+
+    async def create_session(self, *, app_name: str, user_id: str, state: Optional[dict[str, Any]] = None,
+                             session_id: Optional[str] = None) -> Session:
+        session_id = session_id.strip() if session_id and session_id.strip() else str(uuid.uuid4())
+        deltas = _session_util.extract_state_delta(state)
+        session = Session(app_name=app_name, user_id=user_id, id=session_id, state=deltas["session"],
+                          last_update_time=time.time())
+        await self._run(self._insert_session, session, deltas["app"], deltas["user"])
+        self._cache_put((app_name, user_id, session_id), session, 0)
+        return self._merged_copy(session)
+
+    async def get_session(self, *, app_name: str, user_id: str, session_id: str,
+                          config: Optional[GetSessionConfig] = None) -> Optional[Session]:
+        key = (app_name, user_id, session_id)
+        version = await self._run(self._select_version, key)
+        if version is None:
+            self._uncache(key)
+            self._pending.pop(key, None)
+            return None
+        session = self._cache.get(key)
+        if session is not None and self._versions.get(key) == version:
+            self.metrics.cache_hits += 1
+            self._cache.move_to_end(key)
+        else:
+            self.metrics.cache_misses += 1
+            await self.flush(key)
+            session, version = await self._run(self._load_session, key)
+            if session is None:
+                return None  # Deleted since its version was read
+            self._cache_put(key, session, version)
+
+        copied = self._merged_copy(session)
+        if config:
+            if config.num_recent_events:
+                copied.events = copied.events[-config.num_recent_events:]
+            if config.after_timestamp:
+                copied.events = [event for event in copied.events if event.timestamp >= config.after_timestamp]
+        return copied
+
+    async def list_sessions(self, *, app_name: str, user_id: Optional[str] = None) -> ListSessionsResponse:
+        rows = await self._run(self._select_sessions, app_name, user_id)
+        sessions = [Session(app_name=app_name, user_id=row_user_id, id=row_id, state=json.loads(state),
+                            last_update_time=update_time) for row_user_id, row_id, state, update_time in rows]
+        return ListSessionsResponse(sessions=[self._merged_copy(session) for session in sessions])
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        key = (app_name, user_id, session_id)
+        self._uncache(key)
+        self._pending.pop(key, None)
+        await self._run(self._delete_session, key)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        event = await super().append_event(session=session, event=event)
+        session.last_update_time = event.timestamp
+        key = (session.app_name, session.user_id, session.id)
+
+        # The runner appends to its own copy, keep the cached session in step with it
+        deltas = _session_util.extract_state_delta(event.actions.state_delta if event.actions else None)
+        cached = self._cache.get(key)
+        if cached is not None and cached is not session:
+            cached.events.append(event)
+            cached.state.update(deltas["session"])
+            cached.last_update_time = event.timestamp
+        self._app_state.setdefault(session.app_name, {}).update(deltas["app"])
+        self._user_state.setdefault((session.app_name, session.user_id), {}).update(deltas["user"])
+
+        pending = self._pending.get(key)
+        if pending and pending[-1].invocation_id != event.invocation_id:
+            await self.flush(key)
+        self._pending.setdefault(key, []).append(event)
+        if len(self._pending[key]) >= self.max_batch_events:
+            await self.flush(key)
+        return event
+
+    async def flush(self, key: Optional[SessionKey] = None):
+        """Writes buffered events of one session, or of all sessions, one transaction per session."""
+        keys = [key] if key is not None else list(self._pending)
+        for pending_key in keys:
+            events = self._pending.pop(pending_key, None)
+            if not events:
+                continue
+            versions = await self._run(self._write_events, pending_key, events)
+            if versions is not None and self._versions.get(pending_key) == versions[0]:
+                # The cached session already holds these events
+                self._versions[pending_key] = versions[1]
+            else:
+                # Another process wrote since the session was cached, reload it on the next read
+                self._versions.pop(pending_key, None)
+
+    async def close(self):
+        await self.flush()
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> dict:
+        return {**self.metrics.as_dict(), "cached_sessions": len(self._cache),
+                "pending_events": sum(len(events) for events in self._pending.values())}
+
+    async def _run(self, fn, *args):
+        return await asyncio.to_thread(self._locked, fn, *args)
+
+    def _locked(self, fn, *args):
+        with self._lock:
+            return fn(*args)
+
+    def _cache_put(self, key: SessionKey, session: Session, version: int):
+        self._cache[key] = session
+        self._versions[key] = version
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._uncache(next(iter(self._cache)))
+
+    def _uncache(self, key: SessionKey):
+        self._cache.pop(key, None)
+        self._versions.pop(key, None)
+
+    def _merged_copy(self, session: Session) -> Session:
+        copied = session.model_copy(deep=True)
+        for name, value in self._app_state.get(session.app_name, {}).items():
+            copied.state[State.APP_PREFIX + name] = value
+        for name, value in self._user_state.get((session.app_name, session.user_id), {}).items():
+            copied.state[State.USER_PREFIX + name] = value
+        return copied
+
+    def _insert_session(self, session: Session, app_delta: dict, user_delta: dict):
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            if self._conn.execute("SELECT 1 FROM sessions WHERE app_name=? AND user_id=? AND id=?",
+                                  (session.app_name, session.user_id, session.id)).fetchone():
+                raise AlreadyExistsError(f"Session with id {session.id} already exists.")
+            self._conn.execute("INSERT INTO sessions (app_name, user_id, id, state, create_time, update_time) "
+                               "VALUES (?, ?, ?, ?, ?, ?)",
+                               (session.app_name, session.user_id, session.id, json.dumps(session.state),
+                                session.last_update_time, session.last_update_time))
+            self._merge_shared_state(session.app_name, session.user_id, app_delta, user_delta)
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self.metrics.transactions += 1
+
+    def _write_events(self, key: SessionKey, events: list[Event]) -> Optional[tuple[int, int]]:
+        """Writes the events in one transaction, returns the session's row version before and after."""
+        app_name, user_id, session_id = key
+        session_delta, app_delta, user_delta = {}, {}, {}
+        for event in events:
+            deltas = _session_util.extract_state_delta(event.actions.state_delta if event.actions else None)
+            session_delta.update(deltas["session"])
+            app_delta.update(deltas["app"])
+            user_delta.update(deltas["user"])
+
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._conn.execute("SELECT state, version FROM sessions WHERE app_name=? AND user_id=? AND id=?", key).fetchone()
+            if row is None:
+                # Deleted while the events were buffered
+                self._conn.execute("ROLLBACK")
+                return None
+            self._conn.executemany(
+                "INSERT INTO events (app_name, user_id, session_id, event) VALUES (?, ?, ?, ?)",
+                [(app_name, user_id, session_id, event.model_dump_json(exclude_none=True)) for event in events])
+            self._conn.execute(
+                "UPDATE sessions SET state=?, update_time=MAX(update_time, ?), version=version + 1 "
+                "WHERE app_name=? AND user_id=? AND id=?",
+                (json.dumps({**json.loads(row[0]), **session_delta}), events[-1].timestamp, *key))
+            self._merge_shared_state(app_name, user_id, app_delta, user_delta)
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self.metrics.transactions += 1
+        self.metrics.events_written += len(events)
+        return row[1], row[1] + 1
+
+    def _merge_shared_state(self, app_name: str, user_id: str, app_delta: dict, user_delta: dict):
+        if app_delta:
+            row = self._conn.execute("SELECT state FROM app_states WHERE app_name=?", (app_name,)).fetchone()
+            self._conn.execute("INSERT OR REPLACE INTO app_states VALUES (?, ?)",
+                               (app_name, json.dumps({**(json.loads(row[0]) if row else {}), **app_delta})))
+        if user_delta:
+            row = self._conn.execute("SELECT state FROM user_states WHERE app_name=? AND user_id=?", (app_name, user_id)).fetchone()
+            self._conn.execute("INSERT OR REPLACE INTO user_states VALUES (?, ?, ?)",
+                               (app_name, user_id, json.dumps({**(json.loads(row[0]) if row else {}), **user_delta})))
+
+    def _select_version(self, key: SessionKey) -> Optional[int]:
+        row = self._conn.execute("SELECT version FROM sessions WHERE app_name=? AND user_id=? AND id=?", key).fetchone()
+        return row[0] if row else None
+
+    def _load_session(self, key: SessionKey) -> tuple[Optional[Session], Optional[int]]:
+        """The session and its row version, read in one transaction."""
+        app_name, user_id, session_id = key
+        self._conn.execute("BEGIN")
+        try:
+            row = self._conn.execute("SELECT state, update_time, version FROM sessions WHERE app_name=? AND user_id=? AND id=?",
+                                     key).fetchone()
+            if row is None:
+                return None, None
+            events = [Event.model_validate_json(event) for (event,) in self._conn.execute(
+                "SELECT event FROM events WHERE app_name=? AND user_id=? AND session_id=? ORDER BY seq", key)]
+            self._load_shared_state(app_name, user_id)
+        finally:
+            self._conn.execute("COMMIT")
+        return Session(app_name=app_name, user_id=user_id, id=session_id, state=json.loads(row[0]),
+                       events=events, last_update_time=row[1]), row[2]
+
+    def _load_shared_state(self, app_name: str, user_id: str):
+        row = self._conn.execute("SELECT state FROM app_states WHERE app_name=?", (app_name,)).fetchone()
+        self._app_state[app_name] = json.loads(row[0]) if row else {}
+        row = self._conn.execute("SELECT state FROM user_states WHERE app_name=? AND user_id=?", (app_name, user_id)).fetchone()
+        self._user_state[(app_name, user_id)] = json.loads(row[0]) if row else {}
+
+    def _select_sessions(self, app_name: str, user_id: Optional[str]) -> list[tuple]:
+        if user_id is None:
+            return self._conn.execute("SELECT user_id, id, state, update_time FROM sessions WHERE app_name=?", (app_name,)).fetchall()
+        return self._conn.execute("SELECT user_id, id, state, update_time FROM sessions WHERE app_name=? AND user_id=?",
+                                  (app_name, user_id)).fetchall()
+
+    def _delete_session(self, key: SessionKey):
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.execute("DELETE FROM events WHERE app_name=? AND user_id=? AND session_id=?", key)
+            self._conn.execute("DELETE FROM sessions WHERE app_name=? AND user_id=? AND id=?", key)
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
@@ -0,0 +1,110 @@
+"""Runs monocle test cases concurrently, each in its own session.
+
+MonocleValidator.monocle_testcase runs one case at a time: every case shares the validator's in-memory
+span exporter, which it validates and clears after each case. run_test_cases instead starts every case
+in its own asyncio task, with a fresh session ID and its own Monocle test scope and mock tools, at most
+`concurrency` at a time. Once all have finished, the exported spans are split by their scope.test_name
+attribute. Each case's spans are then put back in the validator's emptied exporter on their own, and
+validated and exported with its test status as monocle_testcase would. Combined with a replaying
+ModelCassette (model_cassette.py) no case waits on the network.
+"""
+import asyncio
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional, Union
+
+from session_ids import generate_session_id
+
+if TYPE_CHECKING:
+    from monocle_test_tools import MonocleValidator, TestCase
+
+
+@dataclass
+class CaseResult:
+    """Outcome of one test case, error is the first exception or failed assertion."""
+    name: str
+    test_case: "TestCase"
+    session_id: str
+    output: Optional[str] = None
+    error: Optional[BaseException] = None
+    seconds: float = 0.0
+    spans: list = field(default_factory=list, repr=False)
+
+    @property
+    def passed(self) -> bool:
+        return self.error is None
+
+    def check(self):
+        """Raises the case's error, so a pytest test fails with the original assertion."""
+        if self.error is not None:
+            raise self.error
+
+
+def case_name(index: int, test_case: "TestCase") -> str:
+    return f"{test_case.test_name}_{index}"
+
+
+async def run_test_cases(agent, test_cases: list[Union["TestCase", dict]], concurrency: int = 8,
+                         agent_type: str = "google_adk", validator: Optional["MonocleValidator"] = None) -> list[CaseResult]:
+    """Runs the test cases against agent concurrently and validates each against its own spans.
+
+    Args:
+        agent: the agent under test, shared by every case.
+        test_cases (list): TestCase objects or dicts, as for MonocleValidator.monocle_testcase.
+        concurrency (int): cases in flight at once.
+        agent_type (str): monocle agent runner, e.g. "google_adk".
+        validator (MonocleValidator): defaults to the process wide validator.
+
+    Returns:
+        list[CaseResult]: one result per case, in the order of test_cases.
+    """
+    from monocle_apptrace import stop_scope
+    from monocle_test_tools import MonocleValidator, TestCase
+    from monocle_test_tools.constants import TEST_SCOPE_NAME
+
+    validator = validator or MonocleValidator()
+    cases = [TestCase.model_validate(case) if isinstance(case, dict) else case for case in test_cases]
+    results = [CaseResult(case_name(index, case), case, generate_session_id()) for index, case in enumerate(cases)]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(result: CaseResult):
+        async with semaphore:
+            # Each task attaches its own scope and mock tools, asyncio tasks don't share the context they attach
+            token = validator.pre_test_run_setup(result.name, result.test_case.mock_tools)
+            start = time.perf_counter()
+            try:
+                result.output = await MonocleValidator.run_agent_async(agent, agent_type, *result.test_case.test_input,
+                                                                       session_id=result.session_id)
+            except Exception as e:
+                if not result.test_case.expect_errors:
+                    result.error = e
+            finally:
+                result.seconds = time.perf_counter() - start
+                stop_scope(token)
+
+    validator.cleanup()
+    try:
+        await asyncio.gather(*(run(result) for result in results))
+        spans_by_case = defaultdict(list)
+        for span in validator.memory_exporter.get_finished_spans():
+            spans_by_case[span.attributes.get(f"scope.{TEST_SCOPE_NAME}")].append(span)
+        for result in results:
+            result.spans = spans_by_case[result.name]
+            _validate_and_export(validator, result)
+    finally:
+        validator.cleanup()
+    return results
+
+
+def _validate_and_export(validator: "MonocleValidator", result: CaseResult):
+    # The validator checks and exports the spans its memory exporter holds, so it holds this case's spans only
+    validator.cleanup()
+    validator.memory_exporter.export(result.spans)
+    try:
+        if result.error is None:
+            validator.validate_result(result.test_case, result.output)
+        validator.validate(result.test_case)
+    except Exception as e:
+        result.error = result.error or e
+    validator.flush_to_exporters(result.name, not result.passed, None if result.passed else str(result.error))
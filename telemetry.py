@@ -0,0 +1,241 @@
+"""Tracing profiles, with head/tail sampling and batched export off the request path.
+
+The "full" profile is Monocle's default: every span of every turn goes to every exporter. The
+"sampled" profile hands Monocle a SampledBatchSpanProcessor instead:
+
+    head   a fixed share of traces (sample_rate, decided from the trace id) is kept as spans end
+    tail   the other traces are held until their root span ends, then kept only when a span
+           failed or the turn took at least slow_turn_seconds, and dropped otherwise
+
+Kept spans go to a bounded in-memory queue that a background thread exports in batches. The
+request path only appends to a list under a lock, it never waits for an exporter. When the queue
+is full, new spans are dropped and counted rather than blocking the turn. flush() exports
+everything queued so far, so tests can await it instead of sleeping. "off" doesn't set up tracing.
+"""
+import asyncio
+import logging
+import threading
+from collections import OrderedDict, deque
+from dataclasses import asdict, dataclass
+from typing import Optional, Sequence
+
+from opentelemetry.context import Context
+from opentelemetry.sdk.trace import ReadableSpan, Span, SpanProcessor
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+from opentelemetry.trace import StatusCode
+
+logger = logging.getLogger(__name__)
+
+TELEMETRY_PROFILES = ("full", "sampled", "off")
+
+
+@dataclass
+class TelemetryMetrics:
+    queued: int = 0
+    exported: int = 0
+    dropped: int = 0
+    sampled_out: int = 0
+    export_errors: int = 0
+    batches: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class SampledBatchSpanProcessor(SpanProcessor):
+    """Samples traces and exports the kept spans in batches from a background thread.
+
+    Args:
+        exporters (list): SpanExporters every batch is sent to.
+        sample_rate (float): share of traces kept regardless of errors and latency, 0 to 1.
+        slow_turn_seconds (float): traces whose root span took at least this long are kept.
+        max_queue_size (int): spans waiting for export, spans beyond it are dropped.
+        max_batch_size (int): spans per export call.
+        schedule_delay_seconds (float): longest time a span waits in the queue before export.
+        max_pending_traces (int): unsampled traces held for the tail decision, oldest are dropped first.
+    """
+
+    def __init__(self, exporters: Sequence[SpanExporter], sample_rate: float = 0.1, slow_turn_seconds: float = 2.0,
+                 max_queue_size: int = 2048, max_batch_size: int = 512, schedule_delay_seconds: float = 5.0,
+                 max_pending_traces: int = 1024):
+        if not 0 <= sample_rate <= 1:
+            raise ValueError(f"sample_rate must be between 0 and 1, got {sample_rate}.")
+        self.exporters = list(exporters)
+        self.sample_rate = sample_rate
+        self.slow_turn_seconds = slow_turn_seconds
+        self.max_queue_size = max_queue_size
+        self.max_batch_size = max_batch_size
+        self.schedule_delay_seconds = schedule_delay_seconds
+        self.max_pending_traces = max_pending_traces
+        self.metrics = TelemetryMetrics()
+        self._head_bound = int(sample_rate * 2 ** 64)
+        self._pending: "OrderedDict[int, list[ReadableSpan]]" = OrderedDict()
+        # Tail decisions of recent traces, for spans that end after their root
+        self._decided: "OrderedDict[int, bool]" = OrderedDict()
+        self._queue: deque = deque()
+        self._condition = threading.Condition()
+        self._exporting = False
+        self._flush_waiters = 0
+        self._shutdown = False
+        self._worker = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._worker.start()
+
+    def head_sampled(self, trace_id: int) -> bool:
+        """Whether the trace is kept up front, the same answer for every span of the trace."""
+        return (trace_id & 0xFFFFFFFFFFFFFFFF) < self._head_bound
+
+    def tail_sampled(self, spans: list[ReadableSpan], root: ReadableSpan) -> bool:
+        """Whether a trace the head didn't keep is kept once its root span ended."""
+        if any(span.status.status_code == StatusCode.ERROR for span in spans):
+            return True
+        return (root.end_time - root.start_time) / 1e9 >= self.slow_turn_seconds
+
+    def on_start(self, span: Span, parent_context: Optional[Context] = None):
+        pass
+
+    def on_end(self, span: ReadableSpan):
+        trace_id = span.context.trace_id
+        if self.head_sampled(trace_id):
+            self._enqueue([span])
+            return
+        with self._condition:
+            decided = self._decided.get(trace_id)
+            if decided is None:
+                spans = self._pending.pop(trace_id, [])
+                spans.append(span)
+                if span.parent is not None and not span.parent.is_remote:
+                    self._pending[trace_id] = spans
+                    while len(self._pending) > self.max_pending_traces:
+                        _, evicted = self._pending.popitem(last=False)
+                        self.metrics.dropped += len(evicted)
+                    return
+                decided = self._decided[trace_id] = self.tail_sampled(spans, span)
+                while len(self._decided) > self.max_pending_traces:
+                    self._decided.popitem(last=False)
+            else:
+                spans = [span]
+            if not decided:
+                self.metrics.sampled_out += len(spans)
+                return
+        self._enqueue(spans)
+
+    def _enqueue(self, spans: list[ReadableSpan]):
+        with self._condition:
+            room = self.max_queue_size - len(self._queue) if not self._shutdown else 0
+            if room < len(spans):
+                self.metrics.dropped += len(spans) - max(room, 0)
+                spans = spans[:max(room, 0)]
+            self._queue.extend(spans)
+            self.metrics.queued += len(spans)
+            if len(self._queue) >= self.max_batch_size:
+                self._condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._shutdown or len(self._queue) >= self.max_batch_size
+                                         or (self._flush_waiters and self._queue), self.schedule_delay_seconds)
+                if self._shutdown and not self._queue:
+                    self._condition.notify_all()
+                    return
+                batch = [self._queue.popleft() for _ in range(min(len(self._queue), self.max_batch_size))]
+                self._exporting = bool(batch)
+            if batch:
+                self._export(batch)
+            with self._condition:
+                self._exporting = False
+                self._condition.notify_all()
+
+    def _export(self, batch: list[ReadableSpan]):
+        # Spans count as exported only once every exporter accepted them, each exporter that didn't is an error
+        errors = 0
+        for exporter in self.exporters:
+            try:
+                result = exporter.export(batch)
+            except Exception:
+                logger.exception("Span exporter %s failed", type(exporter).__name__)
+                errors += 1
+                continue
+            if result != SpanExportResult.SUCCESS:
+                logger.warning("Span exporter %s returned %s", type(exporter).__name__, result)
+                errors += 1
+        with self._condition:
+            if not errors:
+                self.metrics.exported += len(batch)
+            self.metrics.export_errors += errors
+            self.metrics.batches += 1
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        """Exports every queued span and flushes the exporters, False when the timeout ran out first."""
+        with self._condition:
+            if self._shutdown:
+                # shutdown() already exported what was queued
+                return not self._queue
+            self._flush_waiters += 1
+            self._condition.notify_all()
+            drained = self._condition.wait_for(lambda: not self._queue and not self._exporting, timeout_millis / 1000)
+            self._flush_waiters -= 1
+        for exporter in self.exporters:
+            if hasattr(exporter, "force_flush"):
+                exporter.force_flush(timeout_millis)
+        return drained
+
+    async def flush(self, timeout_seconds: float = 30.0) -> bool:
+        """force_flush without blocking the event loop."""
+        return await asyncio.to_thread(self.force_flush, int(timeout_seconds * 1000))
+
+    def shutdown(self):
+        """Exports the queued spans and stops the worker, spans that end afterwards are dropped."""
+        with self._condition:
+            if self._shutdown:
+                return
+            self._shutdown = True
+            self._condition.notify_all()
+        self._worker.join()
+        for exporter in self.exporters:
+            exporter.shutdown()
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {**self.metrics.as_dict(), "queue_size": len(self._queue), "pending_traces": len(self._pending)}
+
+
+def build_exporters(exporters: str, trace_dir: str = ".monocle", segment_bytes: int = 64 * 2 ** 20,
+                    segment_seconds: float = 3600.0) -> list[SpanExporter]:
+    """Monocle's exporters by name, plus "ndjson" for trace_files.NdjsonSpanExporter segments in trace_dir."""
+    from monocle_apptrace.exporters.monocle_exporters import get_monocle_exporter
+    names = [name.strip() for name in exporters.split(",") if name.strip()]
+    built = get_monocle_exporter(",".join(name for name in names if name != "ndjson")) \
+        if any(name != "ndjson" for name in names) else []
+    if "ndjson" in names:
+        from trace_files import NdjsonSpanExporter
+        built.append(NdjsonSpanExporter(trace_dir, segment_bytes=segment_bytes, segment_seconds=segment_seconds))
+    return built
+
+
+def setup_telemetry(workflow_name: str, profile: str = "full", exporters: str = "file,okahu", sample_rate: float = 0.1,
+                    slow_turn_seconds: float = 2.0, max_queue_size: int = 2048, trace_dir: str = ".monocle",
+                    segment_bytes: int = 64 * 2 ** 20, segment_seconds: float = 3600.0) -> Optional[SampledBatchSpanProcessor]:
+    """Sets up Monocle tracing for the profile.
+
+    Returns:
+        SampledBatchSpanProcessor: the processor of the "sampled" profile, None for the others.
+    """
+    if profile not in TELEMETRY_PROFILES:
+        raise ValueError(f"Unknown telemetry profile {profile!r}, expected one of {TELEMETRY_PROFILES}.")
+    if profile == "off":
+        return None
+    from monocle_apptrace import setup_monocle_telemetry
+    if profile == "full" and "ndjson" not in exporters:
+        setup_monocle_telemetry(workflow_name=workflow_name, monocle_exporters_list=exporters)
+        return None
+    built = build_exporters(exporters, trace_dir=trace_dir, segment_bytes=segment_bytes, segment_seconds=segment_seconds)
+    if profile == "full":
+        # What Monocle sets up for its own exporters, one batch processor per exporter
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        setup_monocle_telemetry(workflow_name=workflow_name, span_processors=[BatchSpanProcessor(exporter) for exporter in built])
+        return None
+    processor = SampledBatchSpanProcessor(built, sample_rate=sample_rate, slow_turn_seconds=slow_turn_seconds,
+                                          max_queue_size=max_queue_size)
+    setup_monocle_telemetry(workflow_name=workflow_name, span_processors=[processor])
+    return processor
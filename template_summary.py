@@ -0,0 +1,100 @@
+"""Trip summary built from the booking tool results, without a model call.
+
+TemplateSummarizer plugs into the summary agent's before_model_callback. The booking tools return
+{"status", "message"} dicts and record_tool_result keeps them in session state, so a complete turn
+can be summarized by joining the booking messages: "Flight booked from San Jose to Seattle.
+Successfully booked a stay at Hyatt in Seattle." The callback answers with that text, the summary
+agent's model is never called, and the reply is saved under booking_summary and ends the turn like
+a model reply would.
+
+The summarizer falls back to the model when the turn's results are incomplete or ambiguous:
+
+    no_results    no booking tool ran this turn
+    failed        a result isn't a success with a message
+    unanswered    a booking agent called a tool that has no recorded result
+    question      a booking agent's reply asks the user something, e.g. for a missing date
+
+Every summary marks the current span with adk.summary.source=template|model. stats() reports the
+counters.
+"""
+from dataclasses import asdict, dataclass
+from typing import Any, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+from opentelemetry import trace
+
+from context_policy import turn_tool_results
+
+SPAN_ATTRIBUTE = "adk.summary.source"
+
+
+@dataclass
+class TemplateSummaryMetrics:
+    templated: int = 0
+    fallback_no_results: int = 0
+    fallback_failed: int = 0
+    fallback_unanswered: int = 0
+    fallback_question: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def _text(content: Optional[types.Content]) -> str:
+    return "".join(part.text for part in (content.parts if content else None) or [] if part.text)
+
+
+def _mark_span(source: str):
+    trace.get_current_span().set_attribute(SPAN_ATTRIBUTE, source)
+
+
+class TemplateSummarizer:
+    """Answers for the summary agent when every booking of the turn has a clean result."""
+
+    def __init__(self):
+        self.metrics = TemplateSummaryMetrics()
+
+    def summarize(self, results: list[dict]) -> str:
+        """The booking messages in the order the tools ran, repeated messages once."""
+        return " ".join(dict.fromkeys(result["result"]["message"].strip() for result in results))
+
+    def fallback_reason(self, callback_context: CallbackContext, results: list[dict]) -> Optional[str]:
+        """Why the turn needs the model, None when the template covers it."""
+        if not results:
+            return "no_results"
+        for result in results:
+            value = result["result"]
+            if not (isinstance(value, dict) and value.get("status") == "success"
+                    and isinstance(value.get("message"), str) and value["message"].strip()):
+                return "failed"
+        calls = 0
+        for event in callback_context.session.events:
+            if event.invocation_id != callback_context.invocation_id or event.author in ("user", callback_context.agent_name):
+                continue
+            calls += len(event.get_function_calls())
+            if event.is_final_response() and _text(event.content).rstrip().endswith("?"):
+                return "question"
+        if calls > len(results):
+            return "unanswered"
+        return None
+
+    def before_model_callback(self, callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+        results = turn_tool_results(callback_context.state, callback_context.invocation_id)
+        reason = self.fallback_reason(callback_context, results)
+        if reason is not None:
+            setattr(self.metrics, f"fallback_{reason}", getattr(self.metrics, f"fallback_{reason}") + 1)
+            _mark_span("model")
+            return None
+        self.metrics.templated += 1
+        _mark_span("template")
+        return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=self.summarize(results))]),
+                           turn_complete=True)
+
+    def callbacks(self) -> dict[str, Any]:
+        """Keyword arguments that plug the summarizer into the summary LlmAgent."""
+        return {"before_model_callback": self.before_model_callback}
+
+    def stats(self) -> dict:
+        return self.metrics.as_dict()
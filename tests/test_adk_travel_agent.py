@@ -1,12 +1,12 @@
-from asyncio import sleep
+import asyncio
 import os
-import sys
-import pytest, pytest_asyncio
+import pytest
 import logging
 from dotenv import load_dotenv
 
-from adk_travel_agent import root_agent, generate_session_id
+from adk_travel_agent import root_agent, generate_session_id, flush_telemetry
 from monocle_test_tools import TestCase, MonocleValidator
+from suite_runner import run_test_cases
 
 
 
@@ -14,14 +14,9 @@ OKAHU_API_KEY = os.environ.get('OKAHU_API_KEY')
 logging.basicConfig(level=logging.WARN)
 load_dotenv()
 
-session_id = None
-
-@pytest_asyncio.fixture(scope="session", autouse=True)
-async def setup_session():
-    """Set up the session."""
-    global session_id
-    if session_id is None:
-        session_id = generate_session_id()
+# Cases in flight at once. Above 1 the cases run together with suite_runner, pair it with ADK_CASSETTE to replay
+# recorded model responses instead of calling the model
+ADK_TEST_CONCURRENCY = int(os.getenv("ADK_TEST_CONCURRENCY", "1"))
 
 agent_test_cases:list[TestCase] = [
     {
@@ -208,11 +203,22 @@ agent_test_cases:list[TestCase] = [
     },
 ]
 
+@pytest.mark.skipif(ADK_TEST_CONCURRENCY > 1, reason="The cases run in test_run_agents_concurrently")
 @MonocleValidator().monocle_testcase(agent_test_cases)
 async def test_run_agents(my_test_case: TestCase):
 #    await MonocleValidator().test_agent_async(root_agent, "google_adk", my_test_case)
-   await MonocleValidator().test_agent_async(root_agent, "google_adk", my_test_case, session_id=session_id)
-   await sleep(2) # Ensure all telemetry is flushed
+   # A session per case, so cases share no history or deduped bookings
+   await MonocleValidator().test_agent_async(root_agent, "google_adk", my_test_case, session_id=generate_session_id())
+   await flush_telemetry() # Export the spans of this case before the next one starts
+
+@pytest.fixture(scope="module")
+def concurrent_results():
+    return asyncio.run(run_test_cases(root_agent, agent_test_cases, concurrency=ADK_TEST_CONCURRENCY))
+
+@pytest.mark.skipif(ADK_TEST_CONCURRENCY <= 1, reason="Set ADK_TEST_CONCURRENCY above 1 to run the cases concurrently")
+@pytest.mark.parametrize("case_index", range(len(agent_test_cases)))
+def test_run_agents_concurrently(concurrent_results, case_index: int):
+    concurrent_results[case_index].check()
 
 if __name__ == "__main__":
     pytest.main([__file__]) 
\ No newline at end of file
@@ -0,0 +1,72 @@
+import asyncio
+import io
+import json
+
+import pytest
+
+import adk_travel_agent
+
+
+@pytest.fixture
+def fake_turns(monkeypatch):
+    """Replaces the model-backed turn with one that sleeps for the number of ms in the prompt."""
+    in_flight = {"now": 0, "max": 0}
+
+    async def run_turn(test_message, session_id=None, app=None):
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        try:
+            if test_message == "fail":
+                raise RuntimeError("booking failed")
+            await asyncio.sleep(int(test_message) / 1000)
+            return f"done {test_message}"
+        finally:
+            in_flight["now"] -= 1
+
+    monkeypatch.setattr(adk_travel_agent, "run_turn", run_turn)
+    return in_flight
+
+
+@pytest.mark.asyncio
+async def test_run_agents_yields_in_completion_order(fake_turns):
+    results = [result async for result in adk_travel_agent.run_agents(["30", "10", "20"], concurrency=3)]
+    assert [result["response"] for result in results] == ["done 10", "done 20", "done 30"]
+    assert [result["index"] for result in results] == [1, 2, 0]
+    assert all(result["latency_ms"] > 0 and result["error"] is None for result in results)
+    assert len({result["session_id"] for result in results}) == 3
+
+
+@pytest.mark.asyncio
+async def test_run_agents_bounds_concurrency(fake_turns):
+    results = [result async for result in adk_travel_agent.run_agents(["5"] * 20, concurrency=4)]
+    assert len(results) == 20
+    assert fake_turns["max"] == 4
+
+
+@pytest.mark.asyncio
+async def test_run_agents_captures_errors(fake_turns):
+    results = [result async for result in adk_travel_agent.run_agents([{"id": "a", "prompt": "fail"}, {"id": "b"}])]
+    errors = {result["id"]: result["error"] for result in results}
+    assert errors == {"a": "RuntimeError: booking failed", "b": "ValueError: Batch request has no 'prompt'."}
+
+
+@pytest.mark.asyncio
+async def test_run_batch_reads_and_writes_jsonl(fake_turns):
+    input_file = io.StringIO('"1"\n\n{"id": 7, "prompt": "2"}\n')
+    output_file = io.StringIO()
+    await adk_travel_agent.run_batch(input_file, output_file, concurrency=1)
+    results = [json.loads(line) for line in output_file.getvalue().splitlines()]
+    assert [(result["id"], result["response"]) for result in results] == [(None, "done 1"), (7, "done 2")]
+
+
+@pytest.mark.asyncio
+async def test_malformed_lines_are_reported_and_the_batch_keeps_going(fake_turns):
+    input_file = io.StringIO('"1"\n{"prompt": "2"\n5\n["3"]\n{"id": 9, "prompt": "4"}\n')
+    output_file = io.StringIO()
+    await adk_travel_agent.run_batch(input_file, output_file, concurrency=1)
+    results = {result["index"]: result for result in map(json.loads, output_file.getvalue().splitlines())}
+    assert [results[index]["response"] for index in range(5)] == ["done 1", None, None, None, "done 4"]
+    assert results[1]["error"].startswith("JSONDecodeError: ")
+    assert results[2]["error"] == "ValueError: Batch request must be a string or an object, got int."
+    assert results[3]["error"] == "ValueError: Batch request must be a string or an object, got list."
+    assert results[4]["id"] == 9
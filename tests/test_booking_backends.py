@@ -0,0 +1,198 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+import adk_travel_agent
+from booking_backends import (BookingError, BookingRejectedError, CircuitBreaker, CircuitOpenError, HttpBookingBackend,
+                              ThreadPoolBookingBackend, booking_tools)
+from fake_booking_server import FakeInventory, create_app
+
+REQUEST = "Book a flight from San Jose to Seattle for 27th Nov 2025. Book a stay at Hyatt in Seattle for 2 nights."
+
+
+def http_backend(inventory: FakeInventory, **policy) -> HttpBookingBackend:
+    policy.setdefault("backoff_seconds", 0)
+    return HttpBookingBackend("http://inventory", transport=httpx.ASGITransport(app=create_app(inventory)), **policy)
+
+
+def test_circuit_breaker_opens_and_lets_one_trial_through():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=10, clock=lambda: now[0])
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+    now[0] = 10
+    assert breaker.allow()
+    assert not breaker.allow()  # Only one trial call while half open
+    breaker.record_failure(trial=True)
+    assert breaker.state == "open"
+    now[0] = 20
+    assert breaker.allow()
+    breaker.record_success(trial=True)
+    assert breaker.state == "closed"
+
+
+def test_only_the_trial_outcome_ends_the_trial():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=10, clock=lambda: now[0])
+    breaker.record_failure()
+    now[0] = 10
+    assert breaker.allow()
+    breaker.record_failure()  # A call started before the circuit opened
+    now[0] = 20
+    assert not breaker.allow()  # The trial is still in flight
+    breaker.record_success(trial=True)
+    assert breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_http_backend_retries_with_the_same_idempotency_key():
+    inventory = FakeInventory()
+    inventory.fail_next = 2
+    backend = http_backend(inventory, retries=2)
+    result = await backend.book_flight("San Jose", "Seattle")
+    await backend.close()
+    assert result == {"status": "success", "message": "Flight booked from San Jose to Seattle."}
+    assert backend.metrics.retries == 2
+    assert inventory.counts["failures"] == 2 and inventory.counts["flights"] == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_of_a_timed_out_booking_waits_for_the_original():
+    inventory = FakeInventory(latency_ms=100)
+    backend = http_backend(inventory, timeout_seconds=0.06, retries=2)
+    result = await backend.book_flight("San Jose", "Seattle")
+    await backend.close()
+    assert result == {"status": "success", "message": "Flight booked from San Jose to Seattle."}
+    assert backend.metrics.timeouts == 1
+    assert inventory.counts["flights"] == 1 and inventory.counts["duplicates"] == 1
+
+
+@pytest.mark.asyncio
+async def test_http_backend_gives_up_and_opens_the_circuit():
+    inventory = FakeInventory(failure_rate=1.0)
+    backend = http_backend(inventory, retries=1, breaker=CircuitBreaker(failure_threshold=2, reset_seconds=60))
+    for _ in range(2):
+        with pytest.raises(BookingError):
+            await backend.book_hotel("Hyatt", "Seattle")
+    with pytest.raises(CircuitOpenError):
+        await backend.book_hotel("Hyatt", "Seattle")
+    await backend.close()
+    assert inventory.counts["failures"] == 4  # The rejected call never reached the service
+    assert backend.stats()["rejected"] == 1 and backend.stats()["circuit_open"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_trial_call_lets_the_next_call_try():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=10, clock=lambda: now[0])
+    breaker.record_failure()
+    now[0] = 10
+    backend = http_backend(FakeInventory(latency_ms=200), breaker=breaker)
+    trial = asyncio.create_task(backend.book_flight("San Jose", "Seattle"))
+    await asyncio.sleep(0.05)
+    trial.cancel()
+    await asyncio.gather(trial, return_exceptions=True)
+    assert await backend.book_flight("San Jose", "Seattle") == {"status": "success", "message": "Flight booked from San Jose to Seattle."}
+    await backend.close()
+    assert breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_client_errors_and_malformed_bodies_are_booking_errors():
+    bodies = iter([httpx.Response(400, text="unknown airport")] * 3 + [httpx.Response(200, text="<html>")])
+    backend = HttpBookingBackend("http://inventory", transport=httpx.MockTransport(lambda request: next(bodies)),
+                                 breaker=CircuitBreaker(failure_threshold=2))
+    for _ in range(3):
+        with pytest.raises(BookingRejectedError):
+            await backend.book_flight("San Jose", "Nowhere")
+    assert backend.breaker.state == "closed"  # The service answered, a client error doesn't open the circuit
+    with pytest.raises(BookingError, match="malformed body"):
+        await backend.book_flight("San Jose", "Seattle")
+    await backend.close()
+    assert backend.metrics.failures == 4 and backend.metrics.retries == 0
+
+
+@pytest.mark.asyncio
+async def test_breaker_is_checked_once_a_slot_is_free():
+    inventory = FakeInventory(latency_ms=50, failure_rate=1.0)
+    backend = http_backend(inventory, max_concurrency=1, retries=0, breaker=CircuitBreaker(failure_threshold=1))
+    results = await asyncio.gather(backend.book_hotel("Hyatt", "Seattle"), backend.book_hotel("Hyatt", "Seattle"),
+                                   return_exceptions=True)
+    await backend.close()
+    assert [type(result) for result in results] == [BookingError, CircuitOpenError]
+    assert inventory.counts["failures"] == 1
+
+
+@pytest.mark.asyncio
+async def test_timeouts_are_retried_and_reported_to_the_model():
+    backend = http_backend(FakeInventory(latency_ms=200), timeout_seconds=0.02, retries=1)
+    book_flight, _ = booking_tools(backend, adk_travel_agent.adk_book_flight, adk_travel_agent.adk_book_hotel)
+    result = await book_flight(from_airport="San Jose", to_airport="Seattle")
+    await backend.close()
+    assert result["status"] == "error"
+    assert result["message"].startswith("Flight booking failed")
+    assert backend.metrics.timeouts == 2
+
+
+@pytest.mark.asyncio
+async def test_sync_backend_does_not_block_the_event_loop():
+    def slow_flight(from_airport, to_airport):
+        time.sleep(0.2)
+        return {"status": "success", "message": f"Flight booked from {from_airport} to {to_airport}."}
+
+    backend = ThreadPoolBookingBackend(slow_flight, adk_travel_agent.adk_book_hotel, max_workers=4)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    results = await asyncio.gather(*(backend.book_flight("San Jose", "Seattle") for _ in range(4)))
+    task.cancel()
+    await backend.close()
+    assert all(result["status"] == "success" for result in results)
+    assert ticks >= 10  # The loop kept running while four bookings slept in parallel threads
+
+
+@pytest.mark.asyncio
+async def test_sync_backend_does_not_retry_a_timed_out_booking():
+    calls = []
+
+    def slow_flight(from_airport, to_airport):
+        calls.append(from_airport)
+        time.sleep(0.1)
+        return {"status": "success", "message": f"Flight booked from {from_airport} to {to_airport}."}
+
+    backend = ThreadPoolBookingBackend(slow_flight, adk_travel_agent.adk_book_hotel, timeout_seconds=0.02, retries=2)
+    with pytest.raises(BookingError):
+        await backend.book_flight("San Jose", "Seattle")
+    await asyncio.sleep(0.15)
+    await backend.close()
+    assert calls == ["San Jose"]  # The thread still booked, a retry would have booked again
+    assert backend.metrics.timeouts == 1 and backend.metrics.retries == 0
+
+
+def test_tools_keep_names_and_declarations():
+    backend = ThreadPoolBookingBackend(adk_travel_agent.adk_book_flight, adk_travel_agent.adk_book_hotel)
+    book_flight, book_hotel = booking_tools(backend, adk_travel_agent.adk_book_flight, adk_travel_agent.adk_book_hotel)
+    assert (book_flight.__name__, book_hotel.__name__) == ("adk_book_flight", "adk_book_hotel")
+    assert book_flight.__doc__ == adk_travel_agent.adk_book_flight.__doc__
+    assert asyncio.iscoroutinefunction(book_hotel)
+
+
+@pytest.mark.asyncio
+async def test_turn_books_through_the_fake_server():
+    inventory = FakeInventory()
+    app = adk_travel_agent.build_app(model="fake-travel", booking_backend=http_backend(inventory))
+    response = await adk_travel_agent.run_turn(REQUEST, app=app)
+    await app.close()
+    assert "Flight booked from San Jose to Seattle." in response
+    assert "Successfully booked a stay at Hyatt in Seattle." in response
+    assert inventory.counts["flights"] == 1 and inventory.counts["hotels"] == 1
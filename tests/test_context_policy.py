@@ -0,0 +1,87 @@
+import pytest
+from google.genai import types
+
+import adk_travel_agent
+from context_policy import TOOL_RESULTS_PREFIX, ContextPolicy, parse_context_policies
+from token_usage import TokenUsageTracker
+
+REQUEST = "Book a flight from San Jose to Seattle for 27th Nov 2025. Book a stay at Hyatt in Seattle for 2 nights."
+FOLLOW_UP = "Book a flight from Seattle to Boston for 30th Nov 2025."
+
+
+def user(text: str) -> types.Content:
+    return types.Content(role="user", parts=[types.Part(text=text)])
+
+
+def call(name: str) -> types.Content:
+    return types.Content(role="model", parts=[types.Part(function_call=types.FunctionCall(name=name, args={}))])
+
+
+def response(name: str) -> types.Content:
+    return types.Content(role="user", parts=[types.Part(function_response=types.FunctionResponse(name=name, response={}))])
+
+
+HISTORY = [user(REQUEST), call("adk_book_flight"), response("adk_book_flight"),
+           user("For context: [adk_hotel_booking_agent] said: Booked."), user(FOLLOW_UP), call("adk_book_flight"),
+           response("adk_book_flight")]
+
+
+def test_last_n_starts_at_a_user_message():
+    assert ContextPolicy("last_n", last_n=2).trim(HISTORY) == HISTORY[4:]
+    assert ContextPolicy("last_n", last_n=100).trim(HISTORY) == HISTORY
+
+
+def test_own_drops_other_agents():
+    assert ContextPolicy("own").trim(HISTORY) == HISTORY[:3] + HISTORY[4:]
+
+
+def test_parse_context_policies():
+    policies = parse_context_policies("own, adk_trip_summary_agent=state", last_n=3)
+    assert policies["*"].mode == "own" and policies["adk_trip_summary_agent"].mode == "state"
+    with pytest.raises(ValueError):
+        parse_context_policies("adk_trip_summary_agent=everything")
+
+
+async def run_session(policies) -> tuple[str, TokenUsageTracker]:
+    tracker = TokenUsageTracker()
+    app = adk_travel_agent.build_app(model="fake-travel", context_policies=policies, token_usage=tracker)
+    await adk_travel_agent.run_turn(REQUEST, session_id="session-1", app=app)
+    summary = await adk_travel_agent.run_turn(FOLLOW_UP, session_id="session-1", app=app)
+    await app.close()
+    return summary, tracker
+
+
+@pytest.mark.asyncio
+async def test_state_policy_summarizes_the_current_turn_with_fewer_tokens():
+    full_summary, full = await run_session(None)
+    summary, trimmed = await run_session({"adk_flight_booking_agent": ContextPolicy("own"),
+                                          "adk_hotel_booking_agent": ContextPolicy("own"),
+                                          "adk_trip_summary_agent": ContextPolicy("state")})
+    assert summary == "Flight booked from Seattle to Boston."
+    assert "Flight booked from San Jose to Seattle." in full_summary  # The full history repeats the first turn
+    for agent_name in ("adk_flight_booking_agent", "adk_trip_summary_agent"):
+        assert trimmed.turn_usage("session-1")[agent_name]["input_tokens"] < full.turn_usage("session-1")[agent_name]["input_tokens"]
+
+
+@pytest.mark.asyncio
+async def test_token_usage_per_agent_per_turn():
+    _, tracker = await run_session(None)
+    usage = tracker.turn_usage("session-1")
+    assert set(usage) == {"adk_flight_booking_agent", "adk_hotel_booking_agent", "adk_trip_summary_agent"}
+    assert usage["adk_flight_booking_agent"]["model_calls"] == 2  # The tool call, then the reply to its result
+    assert usage["adk_trip_summary_agent"]["output_tokens"] > 0
+    assert usage["adk_trip_summary_agent"]["cost_usd"] > 0
+    # Turn one: two calls per booking agent and one summary, turn two has no hotel to book
+    assert tracker.stats()["model_calls"] == 5 + 4
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("policies, recorded", [(None, False), ({"*": ContextPolicy("own")}, False),
+                                                ({"adk_trip_summary_agent": ContextPolicy("state")}, True)])
+async def test_tool_results_are_recorded_only_when_read(policies, recorded):
+    app = adk_travel_agent.build_app(model="fake-travel", context_policies=policies)
+    await adk_travel_agent.run_turn(REQUEST, session_id="session-1", app=app)
+    session = await app.session_service.get_session(app_name=adk_travel_agent.APP_NAME, user_id=adk_travel_agent.USER_ID,
+                                                    session_id="session-1")
+    await app.close()
+    assert any(key.startswith(TOOL_RESULTS_PREFIX) for key in session.state) == recorded
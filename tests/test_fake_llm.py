@@ -0,0 +1,53 @@
+import pytest
+from google.adk.models.registry import LLMRegistry
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from adk_travel_agent import PIPELINE_MODES, USER_ID, build_root_agent, generate_session_id
+from fake_llm import FakeTravelLlm, parse_flights, parse_hotels
+
+BOOKING_REQUEST = "Book a flight from San Francisco to Mumbai for 26th April 2026. Book a two queen room at Marriott Intercontinental at Central Mumbai for 27th April 2026 for 4 nights."
+
+
+async def run(mode: str, prompt: str) -> tuple[list, str]:
+    session_service = InMemorySessionService()
+    runner = Runner(agent=build_root_agent(mode, model="fake-travel"), app_name="test_fake_llm", session_service=session_service)
+    session_id = generate_session_id()
+    await session_service.create_session(app_name="test_fake_llm", user_id=USER_ID, session_id=session_id)
+    tool_calls, final = [], None
+    async for event in runner.run_async(user_id=USER_ID, session_id=session_id,
+                                        new_message=types.Content(role="user", parts=[types.Part(text=prompt)])):
+        tool_calls += [(event.author, call.name, call.args) for call in event.get_function_calls()]
+        if event.is_final_response() and event.author == "adk_trip_summary_agent":
+            final = event.content.parts[0].text
+    return tool_calls, final
+
+
+def test_fake_models_resolve_through_registry():
+    assert LLMRegistry.resolve("fake-travel") is FakeTravelLlm
+
+
+def test_parses_booking_requests():
+    assert parse_flights(BOOKING_REQUEST) == [{"from_airport": "San Francisco", "to_airport": "Mumbai"}]
+    assert parse_hotels(BOOKING_REQUEST) == [{"hotel_name": "Marriott Intercontinental", "city": "Central Mumbai"}]
+    assert parse_hotels("Then book a hotel room in Paris for 5th Jan 2026.") == [{"hotel_name": "Hilton", "city": "Paris"}]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", PIPELINE_MODES)
+async def test_pipeline_runs_offline(mode):
+    tool_calls, summary = await run(mode, BOOKING_REQUEST)
+    assert sorted(tool_calls) == [
+        ("adk_flight_booking_agent", "adk_book_flight", {"from_airport": "San Francisco", "to_airport": "Mumbai"}),
+        ("adk_hotel_booking_agent", "adk_book_hotel", {"hotel_name": "Marriott Intercontinental", "city": "Central Mumbai"}),
+    ]
+    assert "Flight booked from San Francisco to Mumbai." in summary
+    assert "Successfully booked a stay at Marriott Intercontinental in Central Mumbai." in summary
+
+
+@pytest.mark.asyncio
+async def test_flight_only_request_skips_hotel_tool():
+    tool_calls, summary = await run("sequential", "Book a flight from San Jose to Seattle for 27th Nov 2025.")
+    assert [name for _, name, _ in tool_calls] == ["adk_book_flight"]
+    assert summary == "Flight booked from San Jose to Seattle."
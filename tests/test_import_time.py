@@ -0,0 +1,52 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# Cold import budget in ms, generous so slow CI machines pass while a regression to eager ADK imports (~2s) fails
+IMPORT_BUDGET_MS = float(os.getenv("ADK_IMPORT_BUDGET_MS", "500"))
+HEAVY_MODULES = ["google.adk", "google.genai", "monocle_apptrace", "opentelemetry"]
+
+PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+import adk_travel_agent
+elapsed_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({{"ms": elapsed_ms, "loaded": [name for name in {HEAVY_MODULES!r} if name in sys.modules]}}))
+"""
+
+
+def probe_import() -> dict:
+    result = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_import_does_not_load_adk_or_telemetry():
+    assert probe_import()["loaded"] == []
+
+
+def test_import_time_within_budget():
+    # Best of three, so one slow run on a busy machine doesn't fail the test
+    assert min(probe_import()["ms"] for _ in range(3)) < IMPORT_BUDGET_MS
+
+
+FIRST_USE_PROBE = """
+import asyncio, json, sys
+import adk_travel_agent
+unbuilt = adk_travel_agent._app is None and "google.adk" not in sys.modules
+root_agent = adk_travel_agent.root_agent
+app = adk_travel_agent.get_app()
+print(json.dumps({"unbuilt": unbuilt, "same_app": root_agent is app.root_agent and app.runner.agent is root_agent,
+                  "summary_agent": adk_travel_agent.trip_summary_agent.name}))
+asyncio.run(app.close())
+"""
+
+
+def test_app_is_built_on_first_use(tmp_path):
+    # A fresh interpreter, so the default app isn't already built, run outside the repo so it writes nothing there
+    env = {**os.environ, "PYTHONPATH": ROOT, "GOOGLE_GENAI_MODEL": "fake-travel", "ADK_TELEMETRY": "off"}
+    result = subprocess.run([sys.executable, "-c", FIRST_USE_PROBE], cwd=tmp_path, env=env, capture_output=True,
+                            text=True, check=True)
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == {"unbuilt": True, "same_app": True,
+                                                                  "summary_agent": "adk_trip_summary_agent"}
@@ -0,0 +1,83 @@
+import pytest
+
+import adk_travel_agent
+from booking_backends import BookingError, ThreadPoolBookingBackend
+from fake_llm import FakeTravelLlm
+from pipeline_metrics import Histogram, MetricsRegistry, PipelineMetrics
+
+REQUEST = "Book a flight from San Jose to Seattle for 27th Nov 2025. Book a stay at Hyatt in Seattle for 2 nights."
+FLIGHT = "adk_flight_booking_agent"
+HOTEL = "adk_hotel_booking_agent"
+SUMMARY = "adk_trip_summary_agent"
+
+
+def test_histogram_quantiles_and_prometheus_text():
+    histogram = Histogram(buckets=(0.1, 0.2, 0.5))
+    for value in (0.05, 0.15, 0.15, 0.3):
+        histogram.observe(value)
+    assert histogram.quantile(0.5) == pytest.approx(0.15)
+    assert histogram.quantile(1.0) == pytest.approx(0.5)
+    registry = MetricsRegistry()
+    registry.inc("adk_pipeline_llm_calls_total", agent=FLIGHT)
+    registry.observe("adk_pipeline_agent_seconds", 0.3, agent=FLIGHT)
+    text = registry.render_prometheus()
+    assert 'adk_pipeline_llm_calls_total{agent="adk_flight_booking_agent"} 1' in text
+    assert 'adk_pipeline_agent_seconds_bucket{agent="adk_flight_booking_agent",le="0.5"} 1' in text
+    assert 'adk_pipeline_agent_seconds_bucket{agent="adk_flight_booking_agent",le="+Inf"} 1' in text
+    assert 'adk_pipeline_agent_seconds_count{agent="adk_flight_booking_agent"} 1' in text
+
+
+@pytest.mark.asyncio
+async def test_turn_records_every_stage():
+    metrics = PipelineMetrics()
+    app = adk_travel_agent.build_app(model=FakeTravelLlm(latency_ms=20), metrics=metrics)
+    await adk_travel_agent.run_turn(REQUEST, app=app)
+    await app.close()
+    registry = metrics.registry
+    assert registry.histogram("adk_pipeline_turn_seconds").count == 1
+    for agent_name in ("adk_supervisor_agent", FLIGHT, HOTEL, SUMMARY):
+        assert registry.histogram("adk_pipeline_agent_seconds", agent=agent_name).count == 1
+    # The tool call and the reply to its result, then a single summary call
+    assert [registry.counter("adk_pipeline_llm_calls_total", agent=name) for name in (FLIGHT, HOTEL, SUMMARY)] == [2, 2, 1]
+    assert registry.histogram("adk_pipeline_llm_seconds", agent=SUMMARY).sum >= 0.02
+    assert registry.counter("adk_pipeline_llm_input_tokens_total", agent=SUMMARY) > 0
+    assert registry.counter("adk_pipeline_llm_output_tokens_total", agent=SUMMARY) > 0
+    assert registry.histogram("adk_pipeline_tool_seconds", agent=FLIGHT, tool="adk_book_flight").count == 1
+    assert registry.histogram("adk_pipeline_agent_seconds", agent=FLIGHT).sum >= 0.04
+    summary = metrics.summary().splitlines()
+    assert summary[1].startswith("turn") and any(line.startswith(FLIGHT) for line in summary)
+
+
+@pytest.mark.asyncio
+async def test_errors_are_counted_by_agent_and_stage(monkeypatch):
+    def book_flight(from_airport: str, to_airport: str) -> dict:
+        raise BookingError("inventory unavailable")
+
+    metrics = PipelineMetrics()
+    backend = ThreadPoolBookingBackend(book_flight, adk_travel_agent.adk_book_hotel, retries=0)
+    app = adk_travel_agent.build_app(model="fake-travel", booking_backend=backend, metrics=metrics)
+    await adk_travel_agent.run_turn(REQUEST, app=app)
+    assert metrics.registry.counter("adk_pipeline_errors_total", agent=FLIGHT, stage="tool") == 1
+    assert metrics.registry.counter("adk_pipeline_errors_total", agent=HOTEL, stage="tool") == 0
+
+    async def unavailable(self, llm_request, stream=False):
+        raise RuntimeError("model unavailable")
+        yield
+
+    monkeypatch.setattr(FakeTravelLlm, "generate_content_async", unavailable)
+    with pytest.raises(RuntimeError):
+        await adk_travel_agent.run_turn(REQUEST, app=app)
+    await app.close()
+    assert metrics.registry.counter("adk_pipeline_errors_total", agent=FLIGHT, stage="model") == 1
+    assert metrics.registry.counter("adk_pipeline_turn_errors_total") == 1
+    assert metrics.registry.histogram("adk_pipeline_turn_seconds").count == 2
+
+
+@pytest.mark.asyncio
+async def test_streamed_turns_are_timed():
+    metrics = PipelineMetrics()
+    app = adk_travel_agent.build_app(model="fake-travel", metrics=metrics)
+    events = [event async for event in adk_travel_agent.stream_agent(REQUEST, app=app)]
+    await app.close()
+    assert isinstance(events[-1], adk_travel_agent.SummaryDone)
+    assert metrics.registry.histogram("adk_pipeline_turn_seconds").count == 1
@@ -0,0 +1,27 @@
+import pytest
+from google.adk.agents import ParallelAgent
+
+from adk_travel_agent import PIPELINE_MODES, build_root_agent
+
+AGENT_NAMES = ["adk_flight_booking_agent", "adk_hotel_booking_agent", "adk_trip_summary_agent"]
+
+
+@pytest.mark.parametrize("mode", PIPELINE_MODES)
+def test_pipeline_keeps_agent_names(mode):
+    root = build_root_agent(mode)
+    assert root.name == "adk_supervisor_agent"
+    for name in AGENT_NAMES:
+        assert root.find_agent(name) is not None
+    assert root.sub_agents[-1].name == "adk_trip_summary_agent"
+
+
+def test_parallel_mode_fans_out_booking_agents():
+    root = build_root_agent("parallel")
+    fanout = root.sub_agents[0]
+    assert isinstance(fanout, ParallelAgent)
+    assert [agent.name for agent in fanout.sub_agents] == AGENT_NAMES[:2]
+
+
+def test_unknown_pipeline_mode():
+    with pytest.raises(ValueError):
+        build_root_agent("fanout")
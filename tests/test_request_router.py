@@ -0,0 +1,58 @@
+import pytest
+
+import adk_travel_agent
+from fake_llm import FakeTravelLlm
+from request_router import RequestRouter
+from token_usage import TokenUsageTracker
+
+FLIGHT = "adk_flight_booking_agent"
+HOTEL = "adk_hotel_booking_agent"
+SUMMARY = "adk_trip_summary_agent"
+
+
+def test_route_skips_agents_without_evidence():
+    router = RequestRouter()
+    assert router.route("Book a flight from San Jose to Seattle for 27th Nov 2025.") == {FLIGHT}
+    assert router.route("Book a stay at Hyatt in Seattle for 2 nights.") == {HOTEL}
+    assert router.route("Book a two queen room at Marriott Intercontinental at Mumbai for 27th April 2026 for 4 nights.") == {HOTEL}
+    assert router.route("Book a flight to Boston and a room at the Hilton.") == {FLIGHT, HOTEL}
+    # No evidence for either agent, so every agent runs rather than missing a booking
+    assert router.route("Plan my trip to Boston.") == {FLIGHT, HOTEL}
+
+
+@pytest.mark.parametrize("request_text", [
+    "Book me a Hilton in Seattle and a ticket to Boston.",
+    "Book a flight from San Francisco to New York and reserve the Marriott Marquis for 3 days.",
+    "Fly me to Paris on Friday and get me a place at the Ritz.",
+    # Negations aren't interpreted, a nearby "only" or "no" never drops a booking
+    "Book a flight from SFO to JFK and a Hilton in Manhattan, no room upgrade needed.",
+    "Book a flight from SFO to JFK, no plane changes please, and a hotel in Manhattan.",
+    "Book a hotel in Paris and a flight from London, just a flight with no layovers.",
+    "Book a flight to Boston, no hotel needed.",
+])
+def test_mixed_requests_run_every_agent(request_text):
+    assert RequestRouter().route(request_text) == {FLIGHT, HOTEL}
+
+
+@pytest.mark.asyncio
+async def test_router_skips_the_hotel_agent():
+    tracker = TokenUsageTracker()
+    router = RequestRouter()
+    app = adk_travel_agent.build_app(model="fake-travel", token_usage=tracker, router=router)
+    summary = await adk_travel_agent.run_turn("Book a flight from San Jose to Seattle for 27th Nov 2025.",
+                                              session_id="session-1", app=app)
+    await app.close()
+    assert summary == "Flight booked from San Jose to Seattle."
+    assert set(tracker.turn_usage("session-1")) == {FLIGHT, SUMMARY}
+    assert router.stats() == {f"ran_{FLIGHT}": 1, f"skipped_{HOTEL}": 1}
+
+
+def test_per_agent_models_and_configs():
+    summary_model = FakeTravelLlm(latency_ms=0)
+    app = adk_travel_agent.build_app(model="fake-travel", agent_models={SUMMARY: summary_model},
+                                     agent_configs={SUMMARY: {"temperature": 0.2, "max_output_tokens": 256}})
+    summary_agent = app.root_agent.find_agent(SUMMARY)
+    assert summary_agent.model is summary_model
+    assert summary_agent.generate_content_config.temperature == 0.2
+    assert summary_agent.generate_content_config.max_output_tokens == 256
+    assert app.root_agent.find_agent(FLIGHT).model is not summary_model
@@ -0,0 +1,128 @@
+import asyncio
+
+import pytest
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from adk_travel_agent import USER_ID, build_root_agent, generate_session_id
+from fake_llm import FakeTravelLlm
+from response_cache import ResponseCache
+
+APP_NAME = "test_response_cache"
+REQUEST = "Book a flight from San Jose to Seattle for 27th Nov 2025."
+
+
+class CountingLlm(FakeTravelLlm):
+    calls: int = 0
+
+    async def generate_content_async(self, llm_request, stream=False):
+        self.calls += 1
+        async for response in super().generate_content_async(llm_request, stream):
+            yield response
+
+
+async def run(cache: ResponseCache, model: CountingLlm, prompt: str) -> tuple[list, str]:
+    session_service = InMemorySessionService()
+    runner = Runner(agent=build_root_agent(model=model, response_cache=cache), app_name=APP_NAME, session_service=session_service)
+    session_id = generate_session_id()
+    await session_service.create_session(app_name=APP_NAME, user_id=USER_ID, session_id=session_id)
+    tool_results, final = [], None
+    async for event in runner.run_async(user_id=USER_ID, session_id=session_id,
+                                        new_message=types.Content(role="user", parts=[types.Part(text=prompt)])):
+        tool_results += [response.response for response in event.get_function_responses()]
+        if event.is_final_response():
+            final = event.content.parts[0].text
+    return tool_results, final
+
+
+@pytest.mark.asyncio
+async def test_repeated_request_skips_the_model_but_runs_tools():
+    cache, model = ResponseCache(), CountingLlm()
+    first = await run(cache, model, REQUEST)
+    calls = model.calls
+    second = await run(cache, model, "  book a FLIGHT from San Jose to Seattle   for 27th Nov 2025. ")
+    assert model.calls == calls
+    assert second == first
+    assert second[0] == [{"status": "success", "message": "Flight booked from San Jose to Seattle."}]
+    assert cache.stats()["memory_hits"] == calls
+
+
+@pytest.mark.asyncio
+async def test_different_request_misses():
+    cache, model = ResponseCache(), CountingLlm()
+    await run(cache, model, REQUEST)
+    calls = model.calls
+    await run(cache, model, "Book a flight from San Jose to Portland for 27th Nov 2025.")
+    assert model.calls == 2 * calls
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_is_shared_between_caches(tmp_path):
+    model = CountingLlm()
+    await run(ResponseCache(disk_dir=str(tmp_path)), model, REQUEST)
+    calls = model.calls
+    cache = ResponseCache(disk_dir=str(tmp_path))
+    await run(cache, model, REQUEST)
+    assert model.calls == calls
+    assert cache.stats()["disk_hits"] == calls
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_after_ttl():
+    now = [0.0]
+    cache, model = ResponseCache(ttl_seconds=60, clock=lambda: now[0]), CountingLlm()
+    await run(cache, model, REQUEST)
+    calls = model.calls
+    now[0] = 61
+    await run(cache, model, REQUEST)
+    assert model.calls == 2 * calls
+    assert cache.stats()["expired"] == calls
+
+
+@pytest.mark.asyncio
+async def test_cancelled_model_call_leaves_nothing_pending():
+    cache = ResponseCache()
+    turn = asyncio.create_task(run(cache, FakeTravelLlm(latency_ms=1000), REQUEST))
+    while not cache._pending:
+        await asyncio.sleep(0.01)
+    turn.cancel()
+    await asyncio.gather(turn, return_exceptions=True)
+    assert len(cache._pending) == 0
+    assert cache.stats()["stores"] == 0
+
+
+class TrackedTask(asyncio.Task):
+    """Task that keeps its pending done callbacks inspectable."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.done_callbacks = []
+
+    def add_done_callback(self, fn, *, context=None):
+        self.done_callbacks.append(fn)
+        super().add_done_callback(fn, context=context)
+
+    def remove_done_callback(self, fn):
+        self.done_callbacks = [callback for callback in self.done_callbacks if callback != fn]
+        return super().remove_done_callback(fn)
+
+
+@pytest.mark.asyncio
+async def test_turns_on_a_long_lived_task_leave_no_done_callbacks():
+    cache, model = ResponseCache(), CountingLlm()
+
+    async def turns() -> int:
+        before = len(asyncio.current_task().done_callbacks)
+        for day in range(1, 4):
+            await run(cache, model, f"Book a flight from San Jose to Seattle for {day} Nov 2025.")
+        return len(asyncio.current_task().done_callbacks) - before
+
+    loop = asyncio.get_running_loop()
+    loop.set_task_factory(lambda loop, coro, **kwargs: TrackedTask(coro, loop=loop, **kwargs))
+    try:
+        left = await asyncio.ensure_future(turns())
+    finally:
+        loop.set_task_factory(None)
+    assert cache.stats()["misses"] > 0
+    assert left == 0 and len(cache._pending) == 0
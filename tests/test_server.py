@@ -0,0 +1,100 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+import adk_travel_agent
+from server import create_app
+
+REQUEST = "Book a flight from San Jose to Seattle for 27th Nov 2025."
+
+
+@pytest.fixture
+def travel_app():
+    return adk_travel_agent.build_app(model="fake-travel")
+
+
+def client(app) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+@pytest.mark.asyncio
+async def test_book_returns_summary(travel_app):
+    async with client(create_app(travel_app=travel_app)) as http:
+        response = await http.post("/book", json={"prompt": REQUEST})
+    assert response.status_code == 200
+    assert response.json()["response"] == "Flight booked from San Jose to Seattle."
+    assert response.json()["session_id"]
+
+
+@pytest.mark.asyncio
+async def test_book_stream_returns_json_lines(travel_app):
+    async with client(create_app(travel_app=travel_app)) as http:
+        response = await http.post("/book/stream", json={"prompt": REQUEST})
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert events[0]["type"] == "flight_booked"
+    assert events[-1] == {"type": "summary_done", "text": "Flight booked from San Jose to Seattle."}
+
+
+@pytest.mark.asyncio
+async def test_rejects_invalid_body(travel_app):
+    async with client(create_app(travel_app=travel_app)) as http:
+        response = await http.post("/book", json={"text": REQUEST})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_backpressure_and_drain(monkeypatch, travel_app):
+    release = asyncio.Event()
+
+    async def slow_turn(prompt, session_id=None, app=None):
+        await release.wait()
+        return "done"
+
+    monkeypatch.setattr(adk_travel_agent, "run_turn", slow_turn)
+    app = create_app(max_in_flight=1, travel_app=travel_app)
+    state = app.state.server
+    async with client(app) as http:
+        first = asyncio.create_task(http.post("/book", json={"prompt": REQUEST}))
+        while state.in_flight == 0:
+            await asyncio.sleep(0.01)
+        rejected = await http.post("/book", json={"prompt": REQUEST})
+        assert rejected.status_code == 429
+        assert rejected.headers["Retry-After"] == "1"
+
+        drained = asyncio.create_task(state.drain(timeout=5))
+        await asyncio.sleep(0.01)
+        assert (await http.get("/healthz")).status_code == 503
+        assert (await http.post("/book", json={"prompt": REQUEST})).status_code == 503
+        release.set()
+        assert (await first).json()["response"] == "done"
+        assert await drained
+
+        metrics = (await http.get("/metrics")).text
+    assert 'adk_http_requests_total{route="/book",status="429"} 1' in metrics
+    assert "adk_http_in_flight 0" in metrics
+
+
+@pytest.mark.asyncio
+async def test_stream_slot_is_released_when_the_client_leaves_before_the_body(travel_app):
+    app = create_app(max_in_flight=1, travel_app=travel_app)
+    body = json.dumps({"prompt": REQUEST}).encode()
+    scope = {"type": "http", "asgi": {"version": "3.0", "spec_version": "2.4"}, "http_version": "1.1", "method": "POST",
+             "scheme": "http", "path": "/book/stream", "raw_path": b"/book/stream", "query_string": b"",
+             "root_path": "", "headers": [(b"content-type", b"application/json")], "server": ("test", 80),
+             "client": ("test", 1234), "state": {}}
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        raise OSError("client went away")  # Before the response starts
+
+    for _ in range(3):
+        with pytest.raises(Exception):
+            await app(scope, receive, send)
+    assert app.state.server.in_flight == 0
+    async with client(app) as http:
+        response = await http.post("/book/stream", json={"prompt": REQUEST})
+    assert response.status_code == 200
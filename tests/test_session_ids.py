@@ -0,0 +1,56 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ThreadPoolExecutor
+from uuid import UUID
+
+import pytest
+
+from session_ids import generate_session_id, session_id_time, uuid7
+
+
+def generate_many(count: int) -> list[str]:
+    return [generate_session_id() for _ in range(count)]
+
+
+def test_uuid7_layout():
+    value = uuid7()
+    assert value.version == 7
+    assert value.variant == "specified in RFC 4122"
+    assert abs(session_id_time(str(value)) - time.time()) < 1
+
+
+def test_ids_increase_within_a_process():
+    ids = generate_many(20000)
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+
+
+def test_unique_across_threads():
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        batches = list(pool.map(generate_many, [5000] * 16))
+    ids = [session_id for batch in batches for session_id in batch]
+    assert len(set(ids)) == len(ids)
+    assert all(batch == sorted(batch) for batch in batches)
+
+
+@pytest.mark.asyncio
+async def test_unique_across_tasks():
+    async def generate_with_yields(count: int) -> list[str]:
+        ids = []
+        for _ in range(count):
+            ids.append(generate_session_id())
+            await asyncio.sleep(0)
+        return ids
+
+    batches = await asyncio.gather(*(generate_with_yields(500) for _ in range(50)))
+    ids = [session_id for batch in batches for session_id in batch]
+    assert len(set(ids)) == len(ids)
+
+
+def test_unique_across_processes():
+    with multiprocessing.get_context("fork").Pool(4) as pool:
+        batches = pool.map(generate_many, [5000] * 4)
+    ids = [session_id for batch in batches for session_id in batch]
+    assert len(set(ids)) == len(ids)
+    assert all(UUID(session_id).version == 7 for session_id in ids)
@@ -0,0 +1,87 @@
+import pytest
+from google.adk.events import Event
+from google.adk.runners import Runner
+from google.genai import types
+
+from adk_travel_agent import USER_ID, build_root_agent, generate_session_id
+from session_store import BoundedSessionService
+
+APP_NAME = "test_session_store"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+async def create(service, session_id):
+    return await service.create_session(app_name=APP_NAME, user_id=USER_ID, session_id=session_id)
+
+
+async def exists(service, session_id):
+    return await service.get_session(app_name=APP_NAME, user_id=USER_ID, session_id=session_id) is not None
+
+
+@pytest.mark.asyncio
+async def test_evicts_least_recently_used_over_max_sessions():
+    service = BoundedSessionService(max_sessions=2)
+    await create(service, "a")
+    await create(service, "b")
+    assert await exists(service, "a")  # a is now more recent than b
+    await create(service, "c")
+    assert [await exists(service, sid) for sid in "abc"] == [True, False, True]
+    assert service.stats()["evictions_lru"] == 1
+    assert service.stats()["resident_sessions"] == 2
+
+
+@pytest.mark.asyncio
+async def test_evicts_idle_sessions_after_ttl():
+    clock = FakeClock()
+    service = BoundedSessionService(ttl_seconds=10, clock=clock)
+    await create(service, "a")
+    clock.now = 5
+    await create(service, "b")
+    clock.now = 12
+    assert not await exists(service, "a")
+    assert await exists(service, "b")
+    assert service.stats()["evictions_ttl"] == 1
+
+
+@pytest.mark.asyncio
+async def test_max_bytes_never_evicts_session_in_use():
+    service = BoundedSessionService(max_bytes=1)
+    await create(service, "a")
+    session = await create(service, "b")
+    assert not await exists(service, "a")
+    await service.append_event(session, Event(author="user", content=types.Content(role="user", parts=[types.Part(text="hi")])))
+    assert await exists(service, "b")
+    assert service.stats()["evictions_bytes"] == 1
+
+
+@pytest.mark.asyncio
+async def test_resident_size_tracks_events_and_deletes():
+    service = BoundedSessionService()
+    session = await create(service, "a")
+    created = service.stats()["resident_bytes"]
+    await service.append_event(session, Event(author="user", content=types.Content(role="user", parts=[types.Part(text="hi")])))
+    assert service.stats()["resident_bytes"] > created
+    await service.delete_session(app_name=APP_NAME, user_id=USER_ID, session_id="a")
+    assert service.stats()["resident_bytes"] == 0
+    assert service.stats()["resident_sessions"] == 0
+
+
+@pytest.mark.asyncio
+async def test_resident_sessions_stay_flat_under_load():
+    service = BoundedSessionService(max_sessions=5)
+    runner = Runner(agent=build_root_agent(model="fake-travel"), app_name=APP_NAME, session_service=service)
+    content = types.Content(role="user", parts=[types.Part(text="Book a flight from San Jose to Seattle for 27th Nov 2025.")])
+    for _ in range(20):
+        session_id = generate_session_id()
+        await create(service, session_id)
+        async for _event in runner.run_async(user_id=USER_ID, session_id=session_id, new_message=content):
+            pass
+    assert service.stats()["resident_sessions"] == 5
+    assert service.stats()["evictions"] == 15
@@ -0,0 +1,121 @@
+import pytest
+from google.adk.errors.already_exists_error import AlreadyExistsError
+from google.adk.events import Event, EventActions
+from google.adk.runners import Runner
+from google.genai import types
+
+from adk_travel_agent import USER_ID, build_root_agent, generate_session_id
+from session_store import SqliteSessionService
+
+APP_NAME = "test_sqlite_session_store"
+
+
+def event(invocation_id: str, text: str, state_delta=None) -> Event:
+    return Event(author="user", invocation_id=invocation_id, actions=EventActions(state_delta=state_delta or {}),
+                 content=types.Content(role="user", parts=[types.Part(text=text)]))
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "sessions.db")
+
+
+@pytest.mark.asyncio
+async def test_batches_events_of_one_invocation(db_path):
+    service = SqliteSessionService(db_path)
+    session = await service.create_session(app_name=APP_NAME, user_id=USER_ID, session_id="s1")
+    for text in ["one", "two", "three"]:
+        await service.append_event(session, event("inv-1", text))
+    assert service.stats()["events_written"] == 0
+    await service.append_event(session, event("inv-2", "four"))
+    assert service.stats()["events_written"] == 3
+    await service.flush()
+    assert service.metrics.transactions == 3  # create, invocation 1, invocation 2
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_sessions_survive_restart(db_path):
+    service = SqliteSessionService(db_path)
+    session = await service.create_session(app_name=APP_NAME, user_id=USER_ID, session_id="s1", state={"user:name": "Ada"})
+    await service.append_event(session, event("inv-1", "hello", {"booking_summary": "done", "app:region": "us"}))
+    await service.close()
+
+    reopened = SqliteSessionService(db_path)
+    loaded = await reopened.get_session(app_name=APP_NAME, user_id=USER_ID, session_id="s1")
+    assert [e.content.parts[0].text for e in loaded.events] == ["hello"]
+    assert loaded.state == {"booking_summary": "done", "app:region": "us", "user:name": "Ada"}
+    assert [s.id for s in (await reopened.list_sessions(app_name=APP_NAME, user_id=USER_ID)).sessions] == ["s1"]
+    with pytest.raises(AlreadyExistsError):
+        await reopened.create_session(app_name=APP_NAME, user_id=USER_ID, session_id="s1")
+    await reopened.delete_session(app_name=APP_NAME, user_id=USER_ID, session_id="s1")
+    assert await reopened.get_session(app_name=APP_NAME, user_id=USER_ID, session_id="s1") is None
+    await reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_reads_hit_cache_until_another_process_writes(db_path):
+    service = SqliteSessionService(db_path)
+    other = SqliteSessionService(db_path)
+    await service.create_session(app_name=APP_NAME, user_id=USER_ID, session_id="s1")
+    await service.get_session(app_name=APP_NAME, user_id=USER_ID, session_id="s1")
+    assert service.stats()["cache_hits"] == 1
+
+    session = await other.get_session(app_name=APP_NAME, user_id=USER_ID, session_id="s1")
+    await other.append_event(session, event("inv-1", "from other"))
+    await other.flush()
+    loaded = await service.get_session(app_name=APP_NAME, user_id=USER_ID, session_id="s1")
+    assert [e.content.parts[0].text for e in loaded.events] == ["from other"]
+    assert service.stats()["cache_misses"] == 1
+    await service.close()
+    await other.close()
+
+
+@pytest.mark.asyncio
+async def test_write_with_an_older_timestamp_is_seen(db_path):
+    service = SqliteSessionService(db_path)
+    other = SqliteSessionService(db_path)
+    await service.create_session(app_name=APP_NAME, user_id=USER_ID, session_id="s1")
+    session = await other.get_session(app_name=APP_NAME, user_id=USER_ID, session_id="s1")
+    # The other process's clock is behind
+    late = event("inv-1", "from a slow clock")
+    late.timestamp = session.last_update_time - 60
+    await other.append_event(session, late)
+    await other.flush()
+    loaded = await service.get_session(app_name=APP_NAME, user_id=USER_ID, session_id="s1")
+    assert [e.content.parts[0].text for e in loaded.events] == ["from a slow clock"]
+    await service.append_event(loaded, event("inv-2", "own write"))
+    await service.flush()
+    assert (await service.get_session(app_name=APP_NAME, user_id=USER_ID, session_id="s1")).events[-1].content.parts[0].text == "own write"
+    assert service.stats()["cache_hits"] == 1 and service.stats()["cache_misses"] == 1
+    await service.close()
+    await other.close()
+
+
+@pytest.mark.asyncio
+async def test_app_close_closes_the_database(db_path):
+    import sqlite3
+
+    import adk_travel_agent
+
+    service = SqliteSessionService(db_path)
+    app = adk_travel_agent.build_app(model="fake-travel", session_service=service)
+    await app.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        service._conn.execute("SELECT 1")
+
+
+@pytest.mark.asyncio
+async def test_runner_turn_is_persisted(db_path):
+    service = SqliteSessionService(db_path)
+    runner = Runner(agent=build_root_agent(model="fake-travel"), app_name=APP_NAME, session_service=service)
+    session_id = generate_session_id()
+    await service.create_session(app_name=APP_NAME, user_id=USER_ID, session_id=session_id)
+    content = types.Content(role="user", parts=[types.Part(text="Book a flight from San Jose to Seattle for 27th Nov 2025.")])
+    async for _event in runner.run_async(user_id=USER_ID, session_id=session_id, new_message=content):
+        pass
+    await service.close()
+
+    loaded = await SqliteSessionService(db_path).get_session(app_name=APP_NAME, user_id=USER_ID, session_id=session_id)
+    assert loaded.state["booking_summary"] == "Flight booked from San Jose to Seattle."
+    assert loaded.events[-1].author == "adk_trip_summary_agent"
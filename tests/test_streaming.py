@@ -0,0 +1,31 @@
+import pytest
+
+from adk_travel_agent import FlightBooked, HotelBooked, SummaryDelta, SummaryDone, build_app, stream_agent
+
+REQUEST = "Book a flight from San Francisco to Mumbai for 26th April 2026. Book a two queen room at Marriott Intercontinental at Mumbai for 27th April 2026 for 4 nights."
+
+
+@pytest.fixture
+def app():
+    return build_app(model="fake-travel")
+
+
+@pytest.mark.asyncio
+async def test_streams_bookings_then_summary_chunks(app):
+    events = [event async for event in stream_agent(REQUEST, app=app)]
+    assert [type(event) for event in events[:2]] == [FlightBooked, HotelBooked]
+    assert events[0].args == {"from_airport": "San Francisco", "to_airport": "Mumbai"}
+    assert events[0].result["status"] == "success"
+    deltas = [event.text for event in events if isinstance(event, SummaryDelta)]
+    assert len(deltas) > 1
+    assert isinstance(events[-1], SummaryDone)
+    assert "".join(deltas) == events[-1].text
+    assert "Flight booked from San Francisco to Mumbai." in events[-1].text
+
+
+@pytest.mark.asyncio
+async def test_progress_events_serialize_with_type(app):
+    events = [event.to_dict() async for event in stream_agent("Book a flight from San Jose to Seattle for 27th Nov 2025.", app=app)]
+    assert events[0] == {"type": "flight_booked", "args": {"from_airport": "San Jose", "to_airport": "Seattle"},
+                         "result": {"status": "success", "message": "Flight booked from San Jose to Seattle."}}
+    assert events[-1] == {"type": "summary_done", "text": "Flight booked from San Jose to Seattle."}
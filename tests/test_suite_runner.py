@@ -0,0 +1,113 @@
+import time
+from collections import defaultdict
+
+import pytest
+
+import adk_travel_agent
+from fake_llm import FakeTravelLlm
+from model_cassette import CassetteMissError, ModelCassette
+from response_cache import ResponseCache
+from suite_runner import run_test_cases
+
+FLIGHT = "Book a flight from San Francisco to Mumbai for 26th March 2026."
+HOTEL = "Book a stay at Hyatt in Seattle for 2 nights."
+
+
+def tool_span(tool: str, agent: str, **expected) -> dict:
+    return {"span_type": "agentic.tool.invocation",
+            "entities": [{"type": "tool", "name": tool}, {"type": "agent", "name": agent}], **expected}
+
+
+FLIGHT_CASE = {"test_input": [FLIGHT], "test_spans": [tool_span("adk_book_flight", "adk_flight_booking_agent")]}
+HOTEL_CASE = {"test_input": [HOTEL], "test_spans": [tool_span("adk_book_hotel", "adk_hotel_booking_agent")]}
+MOCKED_FLIGHT_CASE = {
+    "test_input": [FLIGHT],
+    "mock_tools": [{"name": "adk_book_flight", "type": "tool.adk",
+                    "response": {"status": "success", "message": "Mocked flight to {{to_airport}}."}}],
+    "test_spans": [tool_span("adk_book_flight", "adk_flight_booking_agent",
+                             output="{'status': 'success', 'message': 'Mocked flight to Mumbai.'}")],
+}
+# Fails: a flight request books no hotel
+WRONG_CASE = {"test_input": [FLIGHT], "test_spans": [tool_span("adk_book_hotel", "adk_hotel_booking_agent")]}
+
+
+@pytest.mark.asyncio
+async def test_cases_run_concurrently_each_against_its_own_spans():
+    app = adk_travel_agent.build_app(model=FakeTravelLlm(latency_ms=100))
+    cases = [FLIGHT_CASE, HOTEL_CASE, MOCKED_FLIGHT_CASE, WRONG_CASE] * 2
+    start = time.perf_counter()
+    results = await run_test_cases(app.root_agent, cases, concurrency=len(cases))
+    elapsed = time.perf_counter() - start
+    await app.close()
+    assert [result.passed for result in results] == [True, True, True, False] * 2
+    assert "adk_book_hotel" in str(results[3].error)
+    assert len({result.session_id for result in results}) == len(cases)
+    # Every case has its own turn, and only the mocked cases saw the mocked tool
+    for result in results:
+        assert sum(span.attributes.get("span.type") == "agentic.turn" for span in result.spans) == 1
+    assert elapsed < sum(result.seconds for result in results) / 2
+    with pytest.raises(AssertionError):
+        results[3].check()
+
+
+@pytest.mark.asyncio
+async def test_each_case_is_exported_with_its_own_status(monkeypatch):
+    from monocle_test_tools import MonocleValidator
+    from monocle_test_tools.constants import TEST_ASSERTION_ATTRIBUTE, TEST_SCOPE_NAME, TEST_STATUS_ATTRIBUTE
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+    validator, exporter = MonocleValidator(), InMemorySpanExporter()
+    monkeypatch.setattr(validator, "exporters", [exporter])
+    monkeypatch.setattr(validator, "export_failed_tests_only", False)
+    app = adk_travel_agent.build_app(model=FakeTravelLlm())
+    results = await run_test_cases(app.root_agent, [FLIGHT_CASE, WRONG_CASE], validator=validator)
+    await app.close()
+    exported = defaultdict(list)
+    for span in exporter.get_finished_spans():
+        exported[span.attributes.get(f"scope.{TEST_SCOPE_NAME}")].append(span)
+    for result in results:
+        assert len(exported[result.name]) == len(result.spans) > 0
+    assert {span.attributes[TEST_STATUS_ATTRIBUTE] for span in exported[results[0].name]} == {"passed"}
+    assert {span.attributes[TEST_STATUS_ATTRIBUTE] for span in exported[results[1].name]} == {"failed"}
+    assert {span.attributes[TEST_ASSERTION_ATTRIBUTE] for span in exported[results[1].name]} == {str(results[1].error)}
+    assert not validator.spans
+
+
+@pytest.mark.asyncio
+async def test_cassette_records_a_live_run_and_replays_it_offline(tmp_path, monkeypatch):
+    path = tmp_path / "cassettes" / "travel.ndjson"
+    recorder = ModelCassette(path, mode="record")
+    app = adk_travel_agent.build_app(model="fake-travel", cassette=recorder)
+    recorded = [await adk_travel_agent.run_turn(request, app=app) for request in (FLIGHT, HOTEL)]
+    await app.close()
+    assert recorder.metrics.recorded == len(path.read_text().splitlines()) == 8
+
+    async def offline(self, llm_request, stream=False):
+        raise ConnectionError("no network")
+        yield
+
+    monkeypatch.setattr(FakeTravelLlm, "generate_content_async", offline)
+    player = ModelCassette(path)
+    app = adk_travel_agent.build_app(model="fake-travel", cassette=player)
+    assert [await adk_travel_agent.run_turn(request, app=app) for request in (FLIGHT, HOTEL)] == recorded
+    results = await run_test_cases(app.root_agent, [FLIGHT_CASE, HOTEL_CASE] * 4, concurrency=4)
+    assert all(result.passed for result in results)
+    assert player.stats() == {"replayed": 40, "recorded": 0, "misses": 0, "responses": 8}
+    with pytest.raises(CassetteMissError):
+        await adk_travel_agent.run_turn("Book a flight from Paris to Rome.", app=app)
+    await app.close()
+
+
+@pytest.mark.asyncio
+async def test_replayed_responses_bypass_the_response_cache(tmp_path):
+    path = tmp_path / "travel.ndjson"
+    app = adk_travel_agent.build_app(model="fake-travel", cassette=ModelCassette(path, mode="record"))
+    await adk_travel_agent.run_turn(FLIGHT, app=app)
+    await app.close()
+    cache = ResponseCache()
+    app = adk_travel_agent.build_app(model="fake-travel", cassette=ModelCassette(path), response_cache=cache)
+    for _ in range(3):
+        await adk_travel_agent.run_turn(FLIGHT, app=app)
+    await app.close()
+    assert len(cache._pending) == 0
+    assert cache.stats()["misses"] == cache.stats()["stores"] == 0
@@ -0,0 +1,92 @@
+import threading
+
+import pytest
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SpanExportResult
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import Status, StatusCode, set_span_in_context
+
+from telemetry import SampledBatchSpanProcessor
+
+
+def tracer_for(processor: SampledBatchSpanProcessor):
+    provider = TracerProvider()
+    provider.add_span_processor(processor)
+    return provider.get_tracer(__name__)
+
+
+def run_turn(tracer, seconds: float = 0.1, error: bool = False):
+    """One trace: a root span of `seconds` with a child span."""
+    root = tracer.start_span("turn", start_time=0)
+    with tracer.start_as_current_span("tool", context=set_span_in_context(root)) as child:
+        if error:
+            child.set_status(Status(StatusCode.ERROR))
+    root.end(end_time=int(seconds * 1e9))
+
+
+@pytest.mark.asyncio
+async def test_flush_exports_without_waiting_for_the_schedule():
+    exporter = InMemorySpanExporter()
+    processor = SampledBatchSpanProcessor([exporter], sample_rate=1.0, schedule_delay_seconds=60)
+    tracer = tracer_for(processor)
+    for _ in range(3):
+        run_turn(tracer)
+    assert await processor.flush(timeout_seconds=5)
+    assert len(exporter.get_finished_spans()) == 6
+    assert processor.stats()["exported"] == 6 and processor.stats()["queue_size"] == 0
+    processor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_failed_exports_are_counted_as_errors():
+    class FailingExporter(InMemorySpanExporter):
+        def export(self, spans):
+            return SpanExportResult.FAILURE
+
+    processor = SampledBatchSpanProcessor([InMemorySpanExporter(), FailingExporter()], sample_rate=1.0,
+                                          schedule_delay_seconds=60)
+    run_turn(tracer_for(processor))
+    assert await processor.flush(timeout_seconds=5)
+    stats = processor.stats()
+    assert stats["exported"] == 0 and stats["export_errors"] == 1 and stats["batches"] == 1
+    processor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_tail_sampling_keeps_failed_and_slow_turns():
+    exporter = InMemorySpanExporter()
+    processor = SampledBatchSpanProcessor([exporter], sample_rate=0.0, slow_turn_seconds=2.0)
+    tracer = tracer_for(processor)
+    run_turn(tracer)
+    run_turn(tracer, error=True)
+    run_turn(tracer, seconds=3.0)
+    await processor.flush(timeout_seconds=5)
+    spans = exporter.get_finished_spans()
+    assert len(spans) == 4  # Both spans of the failed turn and of the slow turn
+    assert len({span.context.trace_id for span in spans}) == 2
+    assert processor.stats()["sampled_out"] == 2 and processor.stats()["pending_traces"] == 0
+    processor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_full_queue_drops_instead_of_blocking():
+    exporting, release = threading.Event(), threading.Event()
+
+    class BlockingExporter(InMemorySpanExporter):
+        def export(self, spans):
+            exporting.set()
+            release.wait(5)
+            return super().export(spans)
+
+    exporter = BlockingExporter()
+    processor = SampledBatchSpanProcessor([exporter], sample_rate=1.0, max_queue_size=2, max_batch_size=1)
+    tracer = tracer_for(processor)
+    tracer.start_span("first").end()
+    assert exporting.wait(5)
+    for _ in range(3):
+        tracer.start_span("queued").end()  # Returns at once although the exporter is stuck
+    assert processor.stats()["dropped"] == 1
+    release.set()
+    await processor.flush(timeout_seconds=5)
+    assert len(exporter.get_finished_spans()) == 3
+    processor.shutdown()
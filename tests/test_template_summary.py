@@ -0,0 +1,71 @@
+from types import SimpleNamespace
+
+import pytest
+from google.adk.events import Event
+from google.genai import types
+
+import adk_travel_agent
+from booking_backends import BookingError, ThreadPoolBookingBackend
+from template_summary import TemplateSummarizer
+from token_usage import TokenUsageTracker
+
+REQUEST = "Book a flight from San Jose to Seattle for 27th Nov 2025. Book a stay at Hyatt in Seattle for 2 nights."
+SUMMARY = "adk_trip_summary_agent"
+
+
+async def run(request: str, summarizer: TemplateSummarizer, **kwargs) -> tuple[str, TokenUsageTracker, dict]:
+    tracker = TokenUsageTracker()
+    app = adk_travel_agent.build_app(model="fake-travel", token_usage=tracker, summarizer=summarizer, **kwargs)
+    summary = await adk_travel_agent.run_turn(request, session_id="session-1", app=app)
+    session = await app.session_service.get_session(app_name=adk_travel_agent.APP_NAME,
+                                                    user_id=adk_travel_agent.USER_ID, session_id="session-1")
+    await app.close()
+    return summary, tracker, session.state
+
+
+@pytest.mark.asyncio
+async def test_template_summary_skips_the_summary_model():
+    summarizer = TemplateSummarizer()
+    summary, tracker, state = await run(REQUEST, summarizer)
+    # Same text the summary model gives, so the turn output doesn't change
+    assert summary == "Flight booked from San Jose to Seattle. Successfully booked a stay at Hyatt in Seattle."
+    assert state["booking_summary"] == summary
+    assert SUMMARY not in tracker.turn_usage("session-1")
+    assert summarizer.stats()["templated"] == 1
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_the_model_without_results():
+    summarizer = TemplateSummarizer()
+    summary, tracker, _ = await run("Plan my trip to Boston.", summarizer)
+    assert summary == "No bookings were made."
+    assert tracker.turn_usage("session-1")[SUMMARY]["model_calls"] == 1
+    assert summarizer.stats() == {"templated": 0, "fallback_no_results": 1, "fallback_failed": 0,
+                                  "fallback_unanswered": 0, "fallback_question": 0}
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_the_model_on_a_failed_booking():
+    def book_flight(from_airport: str, to_airport: str) -> dict:
+        raise BookingError("inventory unavailable")
+
+    backend = ThreadPoolBookingBackend(book_flight, adk_travel_agent.adk_book_hotel, retries=0)
+    summarizer = TemplateSummarizer()
+    summary, tracker, _ = await run(REQUEST, summarizer, booking_backend=backend)
+    assert "Flight booking failed" in summary
+    assert tracker.turn_usage("session-1")[SUMMARY]["model_calls"] == 1
+    assert summarizer.stats()["fallback_failed"] == 1
+
+
+def test_falls_back_when_a_booking_agent_asks_a_question():
+    results = [{"agent": "adk_flight_booking_agent", "tool": "adk_book_flight", "args": {},
+                "result": {"status": "success", "message": "Flight booked from San Jose to Seattle."}}]
+    question = Event(invocation_id="turn-1", author="adk_hotel_booking_agent",
+                     content=types.Content(role="model", parts=[types.Part(text="Which city is the Hyatt in?")]))
+    context = SimpleNamespace(invocation_id="turn-1", agent_name=SUMMARY, session=SimpleNamespace(events=[question]))
+    summarizer = TemplateSummarizer()
+    assert summarizer.fallback_reason(context, results) == "question"
+    context.session.events = []
+    assert summarizer.fallback_reason(context, results) is None
+    assert summarizer.fallback_reason(context, results * 2) is None
+    assert summarizer.summarize(results * 2) == "Flight booked from San Jose to Seattle."
@@ -0,0 +1,122 @@
+import asyncio
+from collections import Counter
+from types import SimpleNamespace
+
+import pytest
+
+import adk_travel_agent
+from booking_backends import ThreadPoolBookingBackend
+from tool_idempotency import ToolIdempotencyCache
+
+REQUEST = "Book a flight from San Jose to Seattle for 27th Nov 2025. Book a stay at Hyatt in Seattle for 2 nights."
+FLIGHT = SimpleNamespace(name="adk_book_flight")
+
+
+def tool_context(call_id: str, session_id: str = "session-1", invocation_id: str = "turn-1"):
+    return SimpleNamespace(session=SimpleNamespace(user_id="user_123", id=session_id), invocation_id=invocation_id,
+                           function_call_id=call_id)
+
+
+def counting_app(calls: Counter):
+    def book_flight(from_airport, to_airport):
+        calls["flight"] += 1
+        return adk_travel_agent.adk_book_flight(from_airport, to_airport)
+
+    def book_hotel(hotel_name, city):
+        calls["hotel"] += 1
+        return adk_travel_agent.adk_book_hotel(hotel_name, city)
+
+    return adk_travel_agent.build_app(model="fake-travel", booking_backend=ThreadPoolBookingBackend(book_flight, book_hotel),
+                                      tool_idempotency=ToolIdempotencyCache())
+
+
+@pytest.mark.asyncio
+async def test_every_turn_books_again():
+    calls = Counter()
+    app = counting_app(calls)
+    await adk_travel_agent.run_turn(REQUEST, session_id="session-a", app=app)
+    # The tools take no date, so the same route in a later turn of the session can be another trip
+    repeat = await adk_travel_agent.run_turn(REQUEST, session_id="session-a", app=app)
+    await app.close()
+    assert calls == {"flight": 2, "hotel": 2}
+    assert "Flight booked from San Jose to Seattle." in repeat
+    assert app.tool_idempotency.stats()["hits"] == 0
+
+
+@pytest.mark.asyncio
+async def test_repeat_with_normalized_arguments_is_a_hit():
+    cache = ToolIdempotencyCache()
+    assert await cache.before_tool_callback(FLIGHT, {"from_airport": "San Jose", "to_airport": "Seattle"}, tool_context("1")) is None
+    result = {"status": "success", "message": "Flight booked from San Jose to Seattle."}
+    await cache.after_tool_callback(FLIGHT, {}, tool_context("1"), result)
+    repeat = await cache.before_tool_callback(FLIGHT, {"from_airport": " san  jose", "to_airport": "SEATTLE"}, tool_context("2"))
+    assert repeat == result
+    other_session = await cache.before_tool_callback(FLIGHT, {"from_airport": "San Jose", "to_airport": "Seattle"},
+                                                     tool_context("3", session_id="session-2"))
+    assert other_session is None
+    later_turn = await cache.before_tool_callback(FLIGHT, {"from_airport": "San Jose", "to_airport": "Seattle"},
+                                                  tool_context("4", invocation_id="turn-2"))
+    assert later_turn is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 3
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_calls_run_once():
+    cache = ToolIdempotencyCache()
+    args = {"from_airport": "San Jose", "to_airport": "Seattle"}
+    assert await cache.before_tool_callback(FLIGHT, args, tool_context("leader")) is None
+    waiters = [asyncio.create_task(cache.before_tool_callback(FLIGHT, args, tool_context(f"waiter-{i}"))) for i in range(3)]
+    await asyncio.sleep(0)
+    assert not any(waiter.done() for waiter in waiters)
+    result = {"status": "success", "message": "Flight booked from San Jose to Seattle."}
+    await cache.after_tool_callback(FLIGHT, args, tool_context("leader"), result)
+    assert await asyncio.gather(*waiters) == [result] * 3
+    assert cache.stats() == {"hits": 0, "coalesced": 3, "misses": 1, "stores": 1, "expired": 0, "entries": 1, "in_flight": 0}
+
+
+@pytest.mark.asyncio
+async def test_failed_call_is_not_stored_and_a_waiter_retries():
+    cache = ToolIdempotencyCache()
+    args = {"hotel_name": "Hyatt", "city": "Seattle"}
+    hotel = SimpleNamespace(name="adk_book_hotel")
+    assert await cache.before_tool_callback(hotel, args, tool_context("leader")) is None
+    waiter = asyncio.create_task(cache.before_tool_callback(hotel, args, tool_context("waiter")))
+    await asyncio.sleep(0)
+    await cache.after_tool_callback(hotel, args, tool_context("leader"), {"status": "error", "message": "Hotel booking failed"})
+    assert await waiter is None  # The waiter runs the tool itself
+    assert cache.stats()["stores"] == 0 and cache.stats()["in_flight"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_call_releases_its_waiters():
+    cache = ToolIdempotencyCache(in_flight_timeout_seconds=60)
+    args = {"from_airport": "San Jose", "to_airport": "Seattle"}
+    looked_up = {}
+
+    async def call(call_id: str):
+        # ADK runs the callbacks and the tool in one task per function call
+        looked_up[call_id] = await cache.before_tool_callback(FLIGHT, args, tool_context(call_id))
+        await asyncio.sleep(3600)  # The tool is still running
+
+    leader = asyncio.create_task(call("leader"))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(call("waiter"))
+    await asyncio.sleep(0)
+    leader.cancel()
+    await asyncio.sleep(0.1)
+    # The waiter runs the tool itself, without waiting out the in-flight timeout
+    assert looked_up == {"leader": None, "waiter": None}
+    assert list(cache._pending) == ["waiter"] and cache.stats()["in_flight"] == 1
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+    await asyncio.sleep(0)
+    assert cache._pending == {} and cache.stats()["in_flight"] == 0
+
+
+def test_expired_results_are_dropped():
+    now = [0.0]
+    cache = ToolIdempotencyCache(ttl_seconds=10, clock=lambda: now[0])
+    cache._put("key", {"status": "success"})
+    now[0] = 10
+    assert cache._get("key") is None
+    assert cache.metrics.expired == 1
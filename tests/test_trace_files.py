@@ -0,0 +1,72 @@
+import gzip
+import json
+
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+
+from trace_files import NdjsonSpanExporter, iter_spans, main, trace_file_paths
+
+SPAN_TYPES = ["agentic.turn", "agentic.invocation", "agentic.tool.invocation", "inference"]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def write_traces(exporter: NdjsonSpanExporter, traces: int, clock: Clock = None):
+    tracer = TracerProvider().get_tracer(__name__)
+    processor = SimpleSpanProcessor(exporter)
+    for turn in range(traces):
+        for span_type in SPAN_TYPES:
+            span = tracer.start_span(span_type, attributes={"span.type": span_type, "turn": turn})
+            span.end()
+            processor.on_end(span)
+        if clock:
+            clock.now += 60
+
+
+def test_segments_rotate_by_size_and_stream_back_in_order(tmp_path):
+    exporter = NdjsonSpanExporter(tmp_path, segment_bytes=2048)
+    write_traces(exporter, 50)
+    exporter.shutdown()
+    segments = trace_file_paths(tmp_path)
+    assert len(segments) > 1 and all(path.name.endswith(".ndjson.gz") for path in segments)
+    turns = list(iter_spans(tmp_path, span_types=["agentic.turn"]))
+    assert [span["attributes"]["turn"] for span in turns] == list(range(50))
+    assert sum(1 for _ in iter_spans(tmp_path)) == 50 * len(SPAN_TYPES)
+    tools = iter_spans(tmp_path, span_types=["agentic.tool.invocation", "inference"])
+    assert {span["name"] for span in tools} == {"agentic.tool.invocation", "inference"}
+
+
+def test_segments_rotate_by_age_and_prune_the_oldest(tmp_path):
+    clock = Clock()
+    exporter = NdjsonSpanExporter(tmp_path, segment_seconds=300, max_segments=3, clock=clock)
+    write_traces(exporter, 20, clock)  # A new segment every 5 traces
+    exporter.shutdown()
+    assert exporter.segments_written == 4
+    assert len(trace_file_paths(tmp_path)) == 3
+    assert [span["attributes"]["turn"] for span in iter_spans(tmp_path, ["agentic.turn"])] == list(range(5, 20))
+
+
+def test_reader_skips_a_segment_tail_that_is_still_being_written(tmp_path):
+    exporter = NdjsonSpanExporter(tmp_path)
+    write_traces(exporter, 2)
+    partial = gzip.compress(b'{"name": "cut"}\n{"name": "cut off mid')
+    with open(exporter.current_segment, "ab") as segment:
+        segment.write(partial[:len(partial) // 2])
+    assert sum(1 for _ in iter_spans(tmp_path)) == 2 * len(SPAN_TYPES)
+    exporter.shutdown()
+
+
+def test_reads_monocle_trace_files_and_counts_span_types(capsys):
+    turns = list(iter_spans(".monocle.example", span_types=["agentic.turn"]))
+    assert turns and all(span["attributes"]["span.type"] == "agentic.turn" for span in turns)
+    main([".monocle.example", "--count"])
+    counts = dict(line.split("\t") for line in capsys.readouterr().out.splitlines())
+    assert int(counts["agentic.turn"]) == len(turns)
+    main([".monocle.example", "--span-type", "agentic.turn"])
+    assert [json.loads(line) for line in capsys.readouterr().out.splitlines()] == turns
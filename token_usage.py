@@ -0,0 +1,110 @@
+"""Token, latency and cost accounting per agent per turn.
+
+TokenUsageTracker plugs into an LlmAgent's model callbacks and adds up the usage metadata of every
+model response by (session, invocation, agent). A turn is one invocation. Model calls served by
+the response cache never reach the tracker and cost nothing. Cost uses per-million-token prices,
+the defaults are the list prices of gemini-2.5-flash-lite.
+"""
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+
+
+@dataclass
+class AgentUsage:
+    model_calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    latency_seconds: float = 0.0
+    cost_usd: float = 0.0
+
+    def add(self, other: "AgentUsage"):
+        self.model_calls += other.model_calls
+        self.input_tokens += other.input_tokens
+        self.output_tokens += other.output_tokens
+        self.latency_seconds += other.latency_seconds
+        self.cost_usd += other.cost_usd
+
+    def as_dict(self) -> dict:
+        return {**asdict(self), "latency_seconds": round(self.latency_seconds, 6), "cost_usd": round(self.cost_usd, 8)}
+
+
+class TokenUsageTracker:
+    """Usage per agent for the most recent turns and totals since start.
+
+    Args:
+        input_price_per_mtok (float): USD per million prompt tokens.
+        output_price_per_mtok (float): USD per million output tokens.
+        max_turns (int): turns kept for turn_usage, oldest are dropped first.
+        clock: monotonic time source, injectable for tests.
+    """
+
+    def __init__(self, input_price_per_mtok: float = 0.10, output_price_per_mtok: float = 0.40, max_turns: int = 1024,
+                 clock: Callable[[], float] = time.perf_counter):
+        self.input_price_per_mtok = input_price_per_mtok
+        self.output_price_per_mtok = output_price_per_mtok
+        self.max_turns = max_turns
+        self.totals: dict[str, AgentUsage] = {}
+        self._clock = clock
+        self._turns: "OrderedDict[tuple[str, str], dict[str, AgentUsage]]" = OrderedDict()
+        self._last_turn: dict[str, str] = {}
+        self._started: dict[tuple[str, str], float] = {}
+
+    def before_model_callback(self, callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+        self._started[(callback_context.invocation_id, callback_context.agent_name)] = self._clock()
+        return None
+
+    def after_model_callback(self, callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
+        if llm_response.partial:
+            return None
+        started = self._started.pop((callback_context.invocation_id, callback_context.agent_name), None)
+        usage_metadata = llm_response.usage_metadata
+        input_tokens = (usage_metadata.prompt_token_count or 0) if usage_metadata else 0
+        output_tokens = ((usage_metadata.candidates_token_count or 0) + (usage_metadata.thoughts_token_count or 0)) \
+            if usage_metadata else 0
+        call = AgentUsage(
+            model_calls=1,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            latency_seconds=self._clock() - started if started is not None else 0.0,
+            cost_usd=(input_tokens * self.input_price_per_mtok + output_tokens * self.output_price_per_mtok) / 1_000_000,
+        )
+        self._record(callback_context.session.id, callback_context.invocation_id, callback_context.agent_name, call)
+        return None
+
+    def on_model_error_callback(self, callback_context: CallbackContext, llm_request: LlmRequest, error: Exception) -> Optional[LlmResponse]:
+        self._started.pop((callback_context.invocation_id, callback_context.agent_name), None)
+        return None
+
+    def callbacks(self) -> dict[str, Any]:
+        """Keyword arguments that plug the tracker into an LlmAgent."""
+        return {"before_model_callback": self.before_model_callback, "after_model_callback": self.after_model_callback,
+                "on_model_error_callback": self.on_model_error_callback}
+
+    def turn_usage(self, session_id: str, invocation_id: Optional[str] = None) -> dict[str, dict]:
+        """Usage by agent name of one turn, the session's latest turn when invocation_id is None."""
+        invocation_id = invocation_id or self._last_turn.get(session_id)
+        usage = self._turns.get((session_id, invocation_id), {})
+        return {agent_name: agent_usage.as_dict() for agent_name, agent_usage in usage.items()}
+
+    def stats(self) -> dict:
+        totals = AgentUsage()
+        for agent_usage in self.totals.values():
+            totals.add(agent_usage)
+        return totals.as_dict()
+
+    def _record(self, session_id: str, invocation_id: str, agent_name: str, call: AgentUsage):
+        turn = self._turns.get((session_id, invocation_id))
+        if turn is None:
+            turn = self._turns[(session_id, invocation_id)] = {}
+            self._last_turn[session_id] = invocation_id
+            while len(self._turns) > self.max_turns:
+                (old_session_id, old_invocation_id), _ = self._turns.popitem(last=False)
+                if self._last_turn.get(old_session_id) == old_invocation_id:
+                    del self._last_turn[old_session_id]
+        turn.setdefault(agent_name, AgentUsage()).add(call)
+        self.totals.setdefault(agent_name, AgentUsage()).add(call)
@@ -0,0 +1,180 @@
+"""Idempotent booking tool calls within a turn.
+
+ToolIdempotencyCache plugs into an LlmAgent's before/after tool callbacks. A call is keyed on the
+user, the session, the invocation (one turn), the tool name and its arguments, with string arguments
+whitespace and case normalized. A repeat of a call that already succeeded in the same turn, e.g. a
+model retrying the call, gets the stored result from before_tool_callback and the tool doesn't run
+again. A later turn books again: the booking tools take no date, so the same arguments in another
+turn can be another trip. Concurrent identical calls are coalesced
+(single-flight): the first runs the tool and the others wait for its result. Failed calls
+(a raised error or a {"status": "error"} result) are not stored, so a repeat books again.
+
+Every lookup marks the current span with adk.tool.idempotency=hit|coalesced|miss. stats()
+reports the counters.
+"""
+import asyncio
+import copy
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Optional
+
+from google.adk.tools import BaseTool, ToolContext
+from opentelemetry import trace
+
+_WHITESPACE = re.compile(r"\s+")
+SPAN_ATTRIBUTE = "adk.tool.idempotency"
+
+
+@dataclass
+class ToolIdempotencyMetrics:
+    hits: int = 0
+    coalesced: int = 0
+    misses: int = 0
+    stores: int = 0
+    expired: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return _WHITESPACE.sub(" ", value).strip().casefold()
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def tool_call_key(tool_name: str, args: dict, tool_context: ToolContext) -> str:
+    session = tool_context.session
+    payload = {"user": session.user_id, "session": session.id, "invocation": tool_context.invocation_id,
+               "tool": tool_name, "args": _normalize(args)}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _succeeded(result: Any) -> bool:
+    return bool(result) and not (isinstance(result, dict) and result.get("status") == "error")
+
+
+def _mark_span(outcome: str):
+    trace.get_current_span().set_attribute(SPAN_ATTRIBUTE, outcome)
+
+
+class ToolIdempotencyCache:
+    """Results of successful tool calls per turn, plus the calls currently running.
+
+    Args:
+        max_entries (int): results kept, least recently used are dropped first.
+        ttl_seconds (float): lifetime of a stored result, 0 keeps results until evicted.
+        in_flight_timeout_seconds (float): how long a coalesced call waits for the running one
+            before running the tool itself, in case that turn was cancelled.
+        clock: wall clock time source, injectable for tests.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 3600, in_flight_timeout_seconds: float = 60,
+                 clock: Callable[[], float] = time.time):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.in_flight_timeout_seconds = in_flight_timeout_seconds
+        self.metrics = ToolIdempotencyMetrics()
+        self._clock = clock
+        self._results: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._in_flight: dict[str, asyncio.Future] = {}
+        # Keys of the calls this cache let through, by function call ID, to settle in after_tool_callback
+        self._pending: dict[str, str] = {}
+
+    async def before_tool_callback(self, tool: BaseTool, args: dict, tool_context: ToolContext) -> Optional[dict]:
+        key = tool_call_key(tool.name, args, tool_context)
+        while True:
+            stored = self._get(key)
+            if stored is not None:
+                self.metrics.hits += 1
+                _mark_span("hit")
+                return copy.deepcopy(stored)
+            running = self._in_flight.get(key)
+            if running is None:
+                break
+            try:
+                result = await asyncio.wait_for(asyncio.shield(running), self.in_flight_timeout_seconds)
+            except asyncio.TimeoutError:
+                break
+            if result is not None:
+                self.metrics.coalesced += 1
+                _mark_span("coalesced")
+                return copy.deepcopy(result)
+            # The running call failed, look again: another waiter may already be retrying it
+        self.metrics.misses += 1
+        _mark_span("miss")
+        running = self._in_flight[key] = asyncio.get_running_loop().create_future()
+        call_id = tool_context.function_call_id
+        self._pending[call_id] = key
+        # A cancelled call runs neither after_tool_callback nor on_tool_error_callback, so release its
+        # waiters once the task running the tool ends
+        asyncio.current_task().add_done_callback(lambda _: self._abandon(call_id, key, running))
+        return None
+
+    async def after_tool_callback(self, tool: BaseTool, args: dict, tool_context: ToolContext, tool_response: Any) -> Optional[dict]:
+        key = self._pending.pop(tool_context.function_call_id, None)
+        if key is None:
+            return None  # A hit or a coalesced call, nothing ran
+        if _succeeded(tool_response):
+            self._put(key, tool_response)
+            self._settle(key, tool_response)
+        else:
+            self._settle(key, None)
+        return None
+
+    async def on_tool_error_callback(self, tool: BaseTool, args: dict, tool_context: ToolContext, error: Exception) -> Optional[dict]:
+        key = self._pending.pop(tool_context.function_call_id, None)
+        if key is not None:
+            self._settle(key, None)
+        return None
+
+    def callbacks(self) -> dict[str, Any]:
+        """Keyword arguments that plug the cache into an LlmAgent."""
+        return {"before_tool_callback": self.before_tool_callback, "after_tool_callback": self.after_tool_callback,
+                "on_tool_error_callback": self.on_tool_error_callback}
+
+    def stats(self) -> dict:
+        return {**self.metrics.as_dict(), "entries": len(self._results), "in_flight": len(self._in_flight)}
+
+    def clear(self):
+        self._results.clear()
+
+    def _abandon(self, call_id: str, key: str, running: asyncio.Future):
+        if self._pending.get(call_id) == key:
+            del self._pending[call_id]
+        if self._in_flight.get(key) is running:
+            del self._in_flight[key]
+        if not running.done():
+            running.set_result(None)
+
+    def _settle(self, key: str, result: Any):
+        running = self._in_flight.pop(key, None)
+        if running is not None and not running.done():
+            running.set_result(copy.deepcopy(result))
+
+    def _get(self, key: str) -> Any:
+        entry = self._results.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= self._clock():
+            del self._results[key]
+            self.metrics.expired += 1
+            return None
+        self._results.move_to_end(key)
+        return entry[1]
+
+    def _put(self, key: str, result: Any):
+        expires_at = self._clock() + self.ttl_seconds if self.ttl_seconds else float("inf")
+        self._results[key] = (expires_at, copy.deepcopy(result))
+        self._results.move_to_end(key)
+        self.metrics.stores += 1
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
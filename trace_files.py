@@ -0,0 +1,193 @@
+"""Compact trace files: rotating, gzip-compressed NDJSON segments and a streaming reader.
+
+Monocle's file exporter writes one pretty-printed JSON document per trace. NdjsonSpanExporter
+instead appends one span per line, in the same JSON shape, to a segment file named
+<prefix>_<opened at>_<pid>_<seq>.ndjson.gz. Every export call appends its spans as one gzip
+member, so a segment is readable while it is still being written and after a crash. A segment is
+closed once it holds segment_bytes of compressed data or is segment_seconds old, and the oldest
+segments beyond max_segments are deleted.
+
+iter_spans streams spans from segments, plain .ndjson files and Monocle's .json trace files one
+line at a time, optionally only spans of some span types (agentic.turn, agentic.invocation,
+agentic.tool.invocation, ...), so memory stays bounded however many traces a directory holds:
+
+    python trace_files.py .monocle --span-type agentic.turn
+    python trace_files.py .monocle --count
+"""
+import argparse
+import gzip
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Sequence, Union
+
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+SEGMENT_SUFFIX = ".ndjson.gz"
+READABLE_SUFFIXES = (SEGMENT_SUFFIX, ".ndjson", ".json")
+
+
+class NdjsonSpanExporter(SpanExporter):
+    """Appends spans to size and time rotated gzip NDJSON segments.
+
+    Args:
+        out_dir (str): directory of the segments, created when missing.
+        file_prefix (str): segment file name prefix.
+        segment_bytes (int): compressed size at which a segment is closed.
+        segment_seconds (float): age at which a segment is closed.
+        max_segments (int): segments kept in out_dir with this prefix, oldest are deleted first, None keeps all.
+        compresslevel (int): gzip level, lower is faster.
+        clock: wall time source, injectable for tests.
+    """
+
+    def __init__(self, out_dir: str = ".monocle", file_prefix: str = "monocle_spans", segment_bytes: int = 64 * 2 ** 20,
+                 segment_seconds: float = 3600.0, max_segments: Optional[int] = None, compresslevel: int = 6,
+                 clock=time.time):
+        self.out_dir = Path(out_dir)
+        self.file_prefix = file_prefix
+        self.segment_bytes = segment_bytes
+        self.segment_seconds = segment_seconds
+        self.max_segments = max_segments
+        self.compresslevel = compresslevel
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._file = None
+        self._path: Optional[Path] = None
+        self._opened_at = 0.0
+        self._sequence = 0
+        self.segments_written = 0
+
+    @property
+    def current_segment(self) -> Optional[Path]:
+        return self._path
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        if not spans:
+            return SpanExportResult.SUCCESS
+        payload = "".join(span.to_json(indent=None) + "\n" for span in spans).encode()
+        try:
+            with self._lock:
+                self._rotate_if_due()
+                self._file.write(gzip.compress(payload, compresslevel=self.compresslevel))
+                self._file.flush()
+        except OSError:
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+    def _rotate_if_due(self):
+        if self._file is not None and (self._file.tell() >= self.segment_bytes
+                                       or self._clock() - self._opened_at >= self.segment_seconds):
+            self._close_segment()
+        if self._file is None:
+            self._open_segment()
+
+    def _open_segment(self):
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self._opened_at = self._clock()
+        self._sequence += 1
+        opened = time.strftime("%Y-%m-%d_%H.%M.%S", time.localtime(self._opened_at))
+        self._path = self.out_dir / f"{self.file_prefix}_{opened}_{os.getpid()}_{self._sequence:04d}{SEGMENT_SUFFIX}"
+        self._file = open(self._path, "ab")
+        self.segments_written += 1
+        self._prune()
+
+    def _close_segment(self):
+        self._file.close()
+        self._file = None
+
+    def _prune(self):
+        if self.max_segments is None:
+            return
+        segments = sorted(self.out_dir.glob(f"{self.file_prefix}_*{SEGMENT_SUFFIX}"), key=lambda path: path.stat().st_mtime)
+        for path in segments[:max(0, len(segments) - self.max_segments)]:
+            if path != self._path:
+                path.unlink(missing_ok=True)
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True  # Every export is written and flushed before it returns
+
+    def shutdown(self):
+        with self._lock:
+            if self._file is not None:
+                self._close_segment()
+
+
+def trace_file_paths(source: Union[str, os.PathLike, Iterable]) -> list[Path]:
+    """Readable trace files of a file, a directory or several of them, oldest first within a directory."""
+    if not isinstance(source, (str, os.PathLike)):
+        return [path for item in source for path in trace_file_paths(item)]
+    path = Path(source)
+    if path.is_dir():
+        return sorted((child for child in path.iterdir() if child.name.endswith(READABLE_SUFFIXES)),
+                      key=lambda child: (child.stat().st_mtime, child.name))
+    return [path]
+
+
+def span_type(span: dict) -> Optional[str]:
+    return (span.get("attributes") or {}).get("span.type")
+
+
+def _lines(path: Path) -> Iterator[str]:
+    if path.name.endswith(".gz"):
+        with gzip.open(path, "rt", encoding="utf-8") as lines:
+            try:
+                for line in lines:
+                    if not line.endswith("\n"):
+                        return  # Cut off mid-line, the last member of a segment is still being written
+                    yield line
+            except EOFError:
+                return
+    elif path.name.endswith(".ndjson"):
+        with open(path, encoding="utf-8") as lines:
+            yield from lines
+    else:
+        # Monocle's file exporter writes one JSON array per trace, small enough to load at once
+        with open(path, encoding="utf-8") as document:
+            for span in json.load(document):
+                yield json.dumps(span)
+
+
+def iter_spans(source: Union[str, os.PathLike, Iterable], span_types: Optional[Iterable[str]] = None) -> Iterator[dict]:
+    """Streams the spans of trace files as dicts, only those of span_types when given.
+
+    Args:
+        source: a trace file, a directory of trace files, or a list of either.
+        span_types (list): span.type values to keep, e.g. ["agentic.turn"], None keeps every span.
+    """
+    wanted = set(span_types) if span_types else None
+    # Skip parsing lines that can't match, most spans of a trace aren't turns. Monocle's patched
+    # to_json writes compact separators, the SDK's writes spaces, so allow both.
+    prefilter = re.compile(r'"span\.type"\s*:\s*"(?:%s)"' % "|".join(map(re.escape, wanted))) if wanted else None
+    for path in trace_file_paths(source):
+        for line in _lines(path):
+            if not line.strip() or (prefilter and not prefilter.search(line)):
+                continue
+            span = json.loads(line)
+            if wanted is None or span_type(span) in wanted:
+                yield span
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("sources", nargs="+", help="Trace files or directories.")
+    parser.add_argument("--span-type", action="append", dest="span_types", help="Keep only this span.type, repeatable.")
+    parser.add_argument("--count", action="store_true", help="Print the number of spans per span.type instead.")
+    args = parser.parse_args(argv)
+    spans = iter_spans(args.sources, args.span_types)
+    if args.count:
+        counts = Counter(span_type(span) for span in spans)
+        for name, count in sorted(counts.items(), key=lambda item: str(item[0])):
+            print(f"{name or '-'}\t{count}")
+        return
+    for span in spans:
+        sys.stdout.write(json.dumps(span) + "\n")
+
+
+if __name__ == "__main__":
+    main()